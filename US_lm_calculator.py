@@ -1,20 +1,26 @@
 import streamlit as st
-import requests
 import pandas as pd
 from streamlit_searchbox import st_searchbox  # pip install streamlit-searchbox
 import time
-from math import ceil
 from datetime import datetime
 from heyprimo import heyprimo_api
 from exfreight import exfreight_api
 from jbhunt import jbhunt_api
-import os
-
-LOG_FILE = r"Logs/transport_rates_log.xlsx"
+from log_store import append_records
+from cargo import TRANSPORT_FIELDS, cargo_totals, loose_pallets
+from tariff_cache import LAST_MILE_PATH, read_sheet
+from zip_index import search_addresses
+
+LOG_NAME = "transport_rates"
+# Indicative palletization cost shown on the form, USD per loose cargo pallet
+PALLETIZATION_PER_PALLET = 20
+# Pause in typing (ms) before the route pickers search, so a remote lookup
+# for a term the local index misses is not fired on every keystroke
+SEARCH_DEBOUNCE_MS = 400
 
 def log_trans_rates(data, results):
     """
-    Append input/output data of trans_rates into an Excel log file.
+    Append input/output data of trans_rates to the transport rates log.
     """
     try:
         # Flatten main fields for readability
@@ -25,57 +31,24 @@ def log_trans_rates(data, results):
             "DataType": data.get("DataType", ""),
             "Totals_Weight": data.get("Totals", {}).get("Weight", ""),
             "Totals_VolumeCBM": data.get("Totals", {}).get("VolumeCBM", ""),
-            "CargoDetails": str(data.get("CargoDetails", "")),   # save as string
-            "Toggles": str(data.get("Toggles", "")),             # save as string
-            "LTL": str(results.get("LTL", {})),
-            "FTL": str(results.get("FTL", {})),
-            "FTL53": str(results.get("FTL53", {})),
-            "Drayage": str(results.get("Drayage", {})),
+            "CargoDetails": data.get("CargoDetails", []),
+            "Toggles": data.get("Toggles", {}),
+            "LTL": results.get("LTL", {}),
+            "FTL": results.get("FTL", {}),
+            "FTL53": results.get("FTL53", {}),
+            "Drayage": results.get("Drayage", {}),
             "Errors": "; ".join(results.get("errors", []))
         }
 
-        df_new = pd.DataFrame([log_entry])
-
-        if os.path.exists(LOG_FILE):
-            # Append to existing log
-            with pd.ExcelWriter(LOG_FILE, engine="openpyxl", mode="a", if_sheet_exists="overlay") as writer:
-                # Find existing rows to append correctly
-                existing = pd.read_excel(LOG_FILE)
-                startrow = len(existing) + 1
-                df_new.to_excel(writer, index=False, header=False, startrow=startrow, sheet_name="Logs")
-        else:
-            # Create new file with headers
-            df_new.to_excel(LOG_FILE, index=False, sheet_name="Logs")
+        append_records(LOG_NAME, log_entry)
 
     except Exception as e:
         print(f"❌ Failed to log data: {e}")
 
 
 def get_address(zip_code: str):
-    if not zip_code:
-        return []
-
-    url = f"https://office-dev.agraga.com/api/api/v1/location/fetchfulladdress2/{zip_code},"
-    try:
-        response = requests.get(url, timeout=30)
-        response.raise_for_status()
-        data = response.json()
-
-        if isinstance(data, list) and len(data) > 0:
-            results, new_rows = [], []
-            for entry in data:
-                city = entry.get('city', '')
-                state = entry.get('state', '')
-                state_code = entry.get('stateCode', '')
-                country = entry.get('country', '')
-                zip_val = entry.get('pin', zip_code)
-
-                results.append(f"{zip_val}, {city}, {state}, {state_code}, {country}")
-
-            return results
-        return []
-    except requests.exceptions.RequestException:
-        return []
+    """st_searchbox search function; answered from the local ZIP index when it can be."""
+    return search_addresses(zip_code)
     
 # --- Check if origin/destination is in the US ---
 def is_us_location(location: str) -> bool:
@@ -86,7 +59,7 @@ def is_us_location(location: str) -> bool:
 
 def ltl_rate(fpod_city, fpod_st_code, fpod_zip, fba_code, fba_city, fba_st_code, fba_zip, qty, weight,quote_id,unique_id,toggels):
     # Read offline last mile rates
-    lm = pd.read_excel(r"Data/Last Mile Rates (no api).xlsx", "Last Mile Rates (no api)")
+    lm = read_sheet(LAST_MILE_PATH, "Last Mile Rates (no api)")
     lm = lm[lm['Delivery Type'] == "LTL"]
 
     fba = toggels.get("FBA",False)
@@ -222,44 +195,14 @@ def trans_rates(data):
             totals = data.get("Totals", {})
             weight = float(totals.get("Weight",0.0))
             cbm = float(totals.get("VolumeCBM",0.0))
-            total_pallet_count = ceil(cbm / 1.8) if cbm > 0 else 0
+            total_pallet_count = int(loose_pallets(cbm)) if cbm > 0 else 0
 
         elif datatype == "CargoDetails":
-            qty = 0
-            weight = 0.0
-            pallets = 0
-            loose_cbm = 0.0
-            total_cbm = 0.0
-            # --- Cargo loop ---
-            for item in cargo_details:
-                try:
-                    package = str(item.get("package_type", "")).strip()
-                    item_qty = int(item.get("qty", 0))
-                    item_wtppack = float(item.get("weight", 0.0))
-                    item_weight = item_qty * item_wtppack
-
-                    length = float(item.get("L", 0.0))
-                    width = float(item.get("W", 0.0))
-                    height = float(item.get("H", 0.0))
-                    vol = (length * width * height) / 1000000
-                    item_cbm = item_qty * vol
-
-                    qty += item_qty
-                    weight += item_weight
-                    total_cbm += item_cbm
-
-                    if package.lower() == "pallets":
-                        pallets += item_qty
-                    else:
-                        loose_cbm += item_cbm
-
-                except Exception as e:
-                    errors.append(f"❌ Error parsing cargo row {item}: {e}")
-                    continue
-
-            # --- Palletization ---
-            loose_as_pallets = ceil(loose_cbm / 1.8) if loose_cbm > 0 else 0
-            total_pallet_count = pallets + loose_as_pallets
+            cargo = cargo_totals(cargo_details, TRANSPORT_FIELDS)
+            for row_no in cargo["Invalid Rows"]:
+                errors.append(f"❌ Error parsing cargo row {cargo_details[row_no - 1]}: non-numeric value")
+            weight = cargo["Weight"]
+            total_pallet_count = cargo["Total Pallets"]
 
         # --- Unique request ID ---
         dt_str = datetime.now().strftime("%Y%m%d%H%M%S")
@@ -289,6 +232,120 @@ def trans_rates(data):
     return results
 
 
+# ----------------- Form Sections -----------------
+# Each section is a fragment: changing one of its inputs reruns only that
+# section. On a full run (Get Rates) they return their current values.
+PACKAGE_TYPES = ["Loose Cartons", "Pallets"]
+EMPTY_CARGO_ROW = {"package_type": "Loose Cartons", "qty": 0, "weight": 0.0, "L": 0.0, "W": 0.0, "H": 0.0}
+
+CARGO_COLUMN_CONFIG = {
+    "package_type": st.column_config.SelectboxColumn("Package Type*", options=PACKAGE_TYPES,
+                                                     default="Loose Cartons", required=True),
+    "qty": st.column_config.NumberColumn("Quantity *", min_value=0, step=1, default=0),
+    "weight": st.column_config.NumberColumn("Weight per package * (Kgs)", min_value=0.0, step=1.0, default=0.0),
+    "L": st.column_config.NumberColumn("L (cm)", min_value=0.0, step=1.0, default=0.0),
+    "W": st.column_config.NumberColumn("W (cm)", min_value=0.0, step=1.0, default=0.0),
+    "H": st.column_config.NumberColumn("H (cm)", min_value=0.0, step=1.0, default=0.0),
+}
+
+
+def editor_rows(edited):
+    """Cargo rows from the editor; cells left blank on a new row read as the defaults."""
+    rows = []
+    for record in edited.to_dict("records"):
+        row = {}
+        for col, default in EMPTY_CARGO_ROW.items():
+            value = record.get(col)
+            row[col] = default if value is None or pd.isna(value) else value
+        row["qty"] = int(row["qty"])
+        rows.append(row)
+    return rows
+
+
+@st.fragment
+def toggles_section():
+    # FBA toggle (default ON)
+    fba_toggle = st.toggle("FBA", value=True, key="fba_toggle")
+
+    liftgate_required, residential_delivery = False, False
+    if not fba_toggle:
+        # Liftgate Required toggle
+        liftgate_required = st.toggle("Liftgate Required?", value=False, key="liftgate_toggle")
+
+        # If Liftgate is ON → Residential auto ON and disabled
+        if liftgate_required:
+            residential_delivery = True
+            st.toggle("Residential Delivery?", value=True, disabled=True, key="residential_toggle_locked")
+        else:
+            residential_delivery = st.toggle("Residential Delivery?", value=False, key="residential_toggle_free")
+
+    return fba_toggle, liftgate_required, residential_delivery
+
+
+@st.fragment
+def cargo_section():
+    """All cargo rows in one data_editor (add and delete rows in place) plus their totals."""
+    # The editor keeps its edits relative to this frame, so it is never replaced
+    if "cargo_base" not in st.session_state:
+        st.session_state.cargo_base = pd.DataFrame([EMPTY_CARGO_ROW])
+
+    edited = st.data_editor(
+        st.session_state.cargo_base,
+        num_rows="dynamic",
+        column_config=CARGO_COLUMN_CONFIG,
+        use_container_width=True,
+        hide_index=True,
+        key="cargo_editor"
+    )
+    rows = editor_rows(edited)
+    st.session_state.cargo_rows = rows
+
+    cargo = cargo_totals(rows, TRANSPORT_FIELDS)
+    total_pallets = cargo["Total Pallets"]
+    total_palletization = cargo["Loose Pallets"] * PALLETIZATION_PER_PALLET
+
+    st.markdown(
+        f"""
+        <div style="font-size:16px; margin-top:10px; display:flex; gap:30px;">
+            <div><b style="color:orange;">Grand Total Weight:</b> {cargo["Weight"]} Kgs</div>
+            <div><b style="color:orange;">Grand Total Volume:</b> {cargo["CBM"]:.2f} CBM</div>
+            <div><b style="color:orange;">Total Pallets:</b> {total_pallets}</div>
+            <div><b style="color:orange;">Palletization Cost:</b> ${total_palletization:.2f}</div>
+        </div>
+        """,
+        unsafe_allow_html=True
+    )
+    return rows, cargo
+
+
+@st.fragment
+def totals_section():
+    tcol1, tcol2, tcol3, tcol4 = st.columns([2,1,1,1])
+    with tcol1:
+        tpackage_type = st.selectbox(
+            "Package Type*",
+            ["Loose Cartons"],
+            key=f"tpkg",
+            index=0)
+
+    with tcol2:
+        tqty = st.number_input("Total Quantity *", min_value=0, step=1, key="tqty")
+    with tcol3:
+        tweight = st.number_input("Total Weight (Kgs)", min_value=0.0, step=1.0, key="twt")
+    with tcol4:
+        tvolume = st.number_input("Total Volume (CBM)", min_value=0.0, step=0.01, key="tvolume")
+
+
+    tpallets = int(loose_pallets(tvolume)) if tvolume > 0 else 0
+    tpalletization = tpallets * PALLETIZATION_PER_PALLET
+
+    st.markdown(f""" <div style="font-size:16px; margin-top:10px;"> 
+                <b style="color:orange;">Total Pallets:</b> {tpallets} &nbsp;&nbsp;&nbsp;&nbsp; 
+                <b style="color:orange;">Palletization Cost:</b> ${tpalletization:.2f} </div> """, unsafe_allow_html=True) 
+
+    return tpackage_type, tqty, tweight, tvolume
+
+
 def trans_cal():
     with st.container():
         # ---- Two main columns: Left (origin/dest) | Right (cargo details) ---- #
@@ -302,6 +359,7 @@ def trans_cal():
                     label="Select Origin *",
                     search_function=get_address,
                     placeholder="Choose Origin",
+                    debounce=SEARCH_DEBOUNCE_MS,
                     key="origin_key"
                 )
 
@@ -309,112 +367,21 @@ def trans_cal():
                     label="Select Destination *",
                     search_function=get_address,
                     placeholder="Choose Destination",
+                    debounce=SEARCH_DEBOUNCE_MS,
                     key="dest_key"
                 )
 
             # ---- Toggles ---- #
             with st.container(border=True):
-
-                # FBA toggle (default ON)
-                fba_toggle = st.toggle("FBA", value=True, key="fba_toggle")
-
-                liftgate_required, residential_delivery = False, False
-                if not fba_toggle:
-                    # Liftgate Required toggle
-                    liftgate_required = st.toggle("Liftgate Required?", value=False, key="liftgate_toggle")
-
-                    # If Liftgate is ON → Residential auto ON and disabled
-                    if liftgate_required:
-                        residential_delivery = True
-                        st.toggle("Residential Delivery?", value=True, disabled=True, key="residential_toggle_locked")
-                    else:
-                        residential_delivery = st.toggle("Residential Delivery?", value=False, key="residential_toggle_free")
+                fba_toggle, liftgate_required, residential_delivery = toggles_section()
 
         # ================= RIGHT SIDE ================= #
         with right:
             st.subheader("📦 Cargo Details")
             with st.container(border=True):
-                if "cargo_rows" not in st.session_state:
-                    st.session_state.cargo_rows = [
-                        {"package_type": "Loose Cartons", "qty": 0, "weight": 0, "L": 0, "W": 0, "H": 0}
-                    ]
-
-                rows = st.session_state.cargo_rows
-                new_rows = []
-
-                for i, row in enumerate(rows):
-                    col1, col2, col3, col4, col5, col6, col7 = st.columns([2,1,2,1,1,1,1])
-
-                    with col1:
-                        package_type = st.selectbox(
-                            "Package Type*",
-                            ["Loose Cartons", "Pallets"],
-                            key=f"pkg_{i}",
-                            index=["Loose Cartons", "Pallets"].index(row["package_type"])
-                        )
-                    with col2:
-                        qty = st.number_input("Quantity *", min_value=0, step=1,
-                                            key=f"qty_{i}", value=int(row["qty"]))
-                    with col3:
-                        weight = st.number_input("Weight per package * (Kgs)", min_value=0.0, step=1.0,
-                                                key=f"wt_{i}", value=float(row["weight"]))
-                    with col4:
-                        L = st.number_input("L (in)", min_value=0.0, step=1.0,
-                                            key=f"L_{i}", value=float(row["L"]))
-                    with col5:
-                        W = st.number_input("W (in)", min_value=0.0, step=1.0,
-                                            key=f"W_{i}", value=float(row["W"]))
-                    with col6:
-                        H = st.number_input("H (in)", min_value=0.0, step=1.0,
-                                            key=f"H_{i}", value=float(row["H"]))
-                    with col7:
-                        if st.button("Delete", key=f"del_{i}"):
-                            st.session_state.cargo_rows.pop(i)
-                            st.rerun()
-
-                    new_rows.append({
-                        "package_type": package_type, "qty": qty, "weight": weight,
-                        "L": L, "W": W, "H": H
-                    })
-
-                st.session_state.cargo_rows = new_rows
-
-                if st.button("➕ Add Row"):
-                    st.session_state.cargo_rows.append(
-                        {"package_type": "Loose Cartons", "qty": 0, "weight": 0, "L": 0, "W": 0, "H": 0}
-                    )
-                    st.rerun()
-
-                total_weight = sum(r["qty"] * r["weight"] for r in st.session_state.cargo_rows)
-                total_volume_cbm = sum(
-                    r["qty"] * ((r["L"] * r["W"] * r["H"]) / 1000000)
-                    for r in st.session_state.cargo_rows
-                )
-
-                total_pallets = 0
-                total_palletization = 0
-                for r in st.session_state.cargo_rows:
-                    if r["package_type"] == "Loose Cartons":
-                        row_cbm = r["qty"] * ((r["L"] * r["W"] * r["H"]) / 1000000)
-                        pallets_for_row = ceil(row_cbm / 1.8) if row_cbm > 0 else 0
-                        total_pallets += pallets_for_row
-                        palletization = total_pallets * 20
-                        total_palletization += palletization
-                    elif r["package_type"] == "Pallets":
-                        total_pallets += r["qty"]   
-
-                st.markdown(
-                    f"""
-                    <div style="font-size:16px; margin-top:10px; display:flex; gap:30px;">
-                        <div><b style="color:orange;">Grand Total Weight:</b> {total_weight} Kgs</div>
-                        <div><b style="color:orange;">Grand Total Volume:</b> {total_volume_cbm:.2f} CBM</div>
-                        <div><b style="color:orange;">Total Pallets:</b> {total_pallets}</div>
-                        <div><b style="color:orange;">Palletization Cost:</b> ${total_palletization:.2f}</div>
-                    </div>
-                    """,
-                    unsafe_allow_html=True
-                )
-
+                cargo_rows, cargo = cargo_section()
+                total_weight = cargo["Weight"]
+                total_volume_cbm = cargo["CBM"]
 
             st.markdown(
                 "<div style='display:flex; justify-content:center; align-items:center; height:100%; font-weight:bold;'>OR</div>",
@@ -423,28 +390,7 @@ def trans_cal():
 
             # --- Totals section --- #
             with st.container(border=True):
-                tcol1, tcol2, tcol3, tcol4 = st.columns([2,1,1,1])
-                with tcol1:
-                    tpackage_type = st.selectbox(
-                        "Package Type*",
-                        ["Loose Cartons"],
-                        key=f"tpkg",
-                        index=0)
-                    
-                with tcol2:
-                    tqty = st.number_input("Total Quantity *", min_value=0, step=1, key="tqty")
-                with tcol3:
-                    tweight = st.number_input("Total Weight (Kgs)", min_value=0.0, step=1.0, key="twt")
-                with tcol4:
-                    tvolume = st.number_input("Total Volume (CBM)", min_value=0.0, step=0.01, key="tvolume")
-
-
-                tpallets = ceil(tvolume / 1.8) if tvolume > 0 else 0
-                tpalletization = tpallets * 20 if tpallets > 0 else 0
-
-                st.markdown(f""" <div style="font-size:16px; margin-top:10px;"> 
-                            <b style="color:orange;">Total Pallets:</b> {tpallets} &nbsp;&nbsp;&nbsp;&nbsp; 
-                            <b style="color:orange;">Palletization Cost:</b> ${tpalletization:.2f} </div> """, unsafe_allow_html=True) 
+                tpackage_type, tqty, tweight, tvolume = totals_section()
 
             # Action button
             submit = st.button("Get Rates", type="primary")
@@ -472,7 +418,7 @@ def trans_cal():
         
         detailed_used = any(
             r["qty"] > 0 or r["weight"] > 0 or r["L"] > 0 or r["W"] > 0 or r["H"] > 0
-            for r in st.session_state.cargo_rows
+            for r in cargo_rows
         )
         totals_used = (tqty > 0 or tweight > 0 or tvolume > 0)
 
@@ -499,7 +445,7 @@ def trans_cal():
 
         # --- If detailed used, validate ---
         if detailed_used:
-            for idx, r in enumerate(st.session_state.cargo_rows, start=1):
+            for idx, r in enumerate(cargo_rows, start=1):
                 if r["qty"] <= 0:
                     st.error(f"⚠️ Row {idx}: Quantity must be greater than zero.")
                     return
@@ -540,7 +486,7 @@ def trans_cal():
                     "DataType": "CargoDetails",
                     "Origin": origin_selection,
                     "Destination": dest_selection,
-                    "CargoDetails": st.session_state.cargo_rows,
+                    "CargoDetails": cargo_rows,
                     "Totals": {
                         "Weight": total_weight,
                         "VolumeCBM": round(total_volume_cbm, 2)
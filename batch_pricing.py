@@ -0,0 +1,251 @@
+"""
+Batch re-pricing of FBA quotations from the command line.
+
+    python batch_pricing.py quotes.txt --out Logs/batch --workers 8
+    python batch_pricing.py payloads.jsonl --out Logs/batch --pickup-inr 5000
+
+The input is either a text file with one Ag quote number per line, or a JSONL
+file with one object per line. An object holds either just a "quote_id", or a
+full payload with origin, multidest, shipment_scope, is_occ, is_dcc,
+pickup_charges_inr, console_type and service_modes.
+
+Quotes given by ID are fetched from MongoDB in paged bulk queries up front.
+Each quote is priced in a worker process, and all workers share one tariff
+snapshot taken when the batch starts. Workers summarize bookings without
+logging them. Every FLUSH_EVERY finished quotes the parent writes their bookings
+to the log store in one append per log, then their records (result, booking
+summaries and breakdowns) to <out>/results.jsonl. Re-running with the same
+--out skips quotes that are already in results.jsonl, so an interrupted batch
+carries on where it stopped.
+"""
+import argparse
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from datetime import datetime
+
+from json_safe import jsonable
+from tariff_cache import load_snapshot, snapshot
+
+RESULTS_FILE = "results.jsonl"
+
+# Finished quotes buffered before bookings and results are written
+FLUSH_EVERY = 50
+
+
+# ----------------- Input -----------------
+def read_entries(path):
+    """[(key, entry)] from a quote ID list or a JSONL of payloads."""
+    entries = []
+    with open(path, encoding="utf-8") as f:
+        for line_no, line in enumerate(f, start=1):
+            line = line.strip()
+            if not line:
+                continue
+            if path.endswith(".jsonl"):
+                entry = json.loads(line)
+            else:
+                entry = {"quote_id": line}
+            key = str(entry.get("quote_id") or f"line-{line_no}")
+            entries.append((key, entry))
+    return entries
+
+
+def finished_keys(results_path, retry_failed=False):
+    """Keys already in results.jsonl; failed ones too unless they are being retried."""
+    done = set()
+    if not os.path.exists(results_path):
+        return done
+    with open(results_path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue  # half written line from an interrupted run
+            if retry_failed and record.get("Status") != "Success":
+                done.discard(record["Key"])
+            else:
+                done.add(record["Key"])
+    return done
+
+
+def prefetch_quotes(pending):
+    """
+    Load every quote given only by ID with paged bulk fetches before the pool
+    starts. Quotes that fail here are fetched again by their worker, which
+    records the reason.
+    """
+    from data_fetch import fetch_quotes_bulk
+
+    ids = [entry["quote_id"] for _, entry in pending if "multidest" not in entry and entry.get("quote_id")]
+    if not ids:
+        return
+    started = time.perf_counter()
+    fetched = fetch_quotes_bulk(ids)
+    loaded = 0
+    for _, entry in pending:
+        quote_doc, _ = fetched.get(entry.get("quote_id"), (None, None))
+        if quote_doc and "multidest" not in entry:
+            entry["quote_data"] = quote_doc
+            loaded += 1
+    print(f"📥 {loaded}/{len(ids)} quotes fetched in {time.perf_counter() - started:.1f}s")
+
+
+# ----------------- Worker -----------------
+def _init_worker(tariffs):
+    load_snapshot(tariffs)
+
+
+def price_entry(key, entry, pickup_charges_inr=0.0, summarize=True):
+    """Fetch (if needed) and price one quotation. Runs in a worker process."""
+    from data_fetch import fetch_quote_data
+    from quote_pricing import booking_breakdowns, booking_records, price_quote, quote_inputs
+
+    started = time.perf_counter()
+    timing = {}
+    record = {"Key": key, "Quote ID": entry.get("quote_id", key)}
+
+    try:
+        if "multidest" in entry:
+            inputs = {
+                "origin": entry.get("origin", ""),
+                "multidest": entry["multidest"],
+                "shipment_scope": entry.get("shipment_scope", ""),
+                "is_occ": bool(entry.get("is_occ", False)),
+                "is_dcc": bool(entry.get("is_dcc", False)),
+            }
+        elif "quote_data" in entry:
+            inputs = quote_inputs(entry["quote_data"])
+        else:
+            quote_data, _ = fetch_quote_data(record["Quote ID"])
+            timing["Fetch (s)"] = round(time.perf_counter() - started, 3)
+            inputs = quote_inputs(quote_data)
+
+        result, errors, skipped_fba, elapsed = price_quote(
+            record["Quote ID"], inputs["origin"], inputs["multidest"], inputs["shipment_scope"],
+            inputs["is_occ"], inputs["is_dcc"], entry.get("pickup_charges_inr", pickup_charges_inr),
+            entry.get("console_type", "not selected"), entry.get("service_modes", [])
+        )
+        timing["Pricing (s)"] = round(elapsed, 3)
+
+        # Bookings go back to the parent, which logs the whole batch at once
+        bookings = {}
+        if summarize and result and not errors:
+            summarize_started = time.perf_counter()
+            bookings = booking_records(booking_breakdowns(record["Quote ID"], result, log=False))
+            timing["Summarization (s)"] = round(time.perf_counter() - summarize_started, 3)
+
+        unique_ids = [details.get("Unique ID") for consoles in result.values() for details in consoles.values()]
+        record.update({
+            "Unique ID": next((uid for uid in unique_ids if uid), ""),
+            "Status": "Success" if result and not errors else "Error",
+            "Errors": errors,
+            "Skipped FBA": skipped_fba,
+            "Destinations": len(result),
+            "Bookings": bookings,
+            "Result": result,
+        })
+    except Exception as e:
+        record.update({"Status": "Error", "Errors": [str(e)]})
+
+    timing["Total (s)"] = round(time.perf_counter() - started, 3)
+    record["Timing"] = timing
+    return record
+
+
+# ----------------- Output -----------------
+def booking_rows(records):
+    """bookings_summary and bookings_breakdown log rows for the bookings in a set of records."""
+    from pricing_calculation import booking_metadata
+
+    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    summary, breakdown = [], []
+    for record in records:
+        for grouped in record.get("Bookings", {}).values():
+            for booking, tables in grouped.items():
+                metadata = booking_metadata(booking, record["Quote ID"], record.get("Unique ID", ""), timestamp)
+                summary.extend({**row, **metadata} for row in tables["summary"])
+                breakdown.extend({**row, **metadata} for row in tables["breakdown"])
+    return summary, breakdown
+
+
+def flush(records, out):
+    """Log the bookings of finished quotes, then append their records to results.jsonl."""
+    if not records:
+        return
+    from log_store import append_records
+
+    # Bookings first: a quote in results.jsonl is never priced again on resume
+    summary, breakdown = booking_rows(records)
+    append_records("bookings_summary", summary)
+    append_records("bookings_breakdown", breakdown)
+    if summary:
+        print(f"✅ {len(summary)} bookings logged")
+
+    out.write("".join(json.dumps(jsonable(record)) + "\n" for record in records))
+    out.flush()
+    records.clear()
+
+
+# ----------------- Batch -----------------
+def run_batch(input_path, out_dir, workers=None, pickup_charges_inr=0.0, retry_failed=False, summarize=True):
+    os.makedirs(out_dir, exist_ok=True)
+    results_path = os.path.join(out_dir, RESULTS_FILE)
+
+    entries = read_entries(input_path)
+    done = finished_keys(results_path, retry_failed)
+    pending = [(key, entry) for key, entry in entries if key not in done]
+    print(f"📄 {len(entries)} quotes in {input_path}, {len(entries) - len(pending)} already priced, {len(pending)} to go")
+    if not pending:
+        return results_path
+
+    prefetch_quotes(pending)
+
+    tariffs = snapshot()
+    print(f"📦 Tariff snapshot: {len(tariffs)} sheets")
+
+    started = time.perf_counter()
+    succeeded = 0
+    finished = []
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(tariffs,)) as pool, \
+            open(results_path, "a", encoding="utf-8") as out:
+        futures = [pool.submit(price_entry, key, entry, pickup_charges_inr, summarize) for key, entry in pending]
+        try:
+            for n, future in enumerate(as_completed(futures), start=1):
+                record = future.result()
+                finished.append(record)
+                if len(finished) >= FLUSH_EVERY:
+                    flush(finished, out)
+
+                ok = record["Status"] == "Success"
+                succeeded += ok
+                icon = "✅" if ok else "❌"
+                print(f"{icon} [{n}/{len(pending)}] {record['Key']} in {record['Timing']['Total (s)']}s"
+                      + ("" if ok else f": {'; '.join(record['Errors'])[:200]}"))
+        finally:
+            # Keep what finished, also when the batch is interrupted
+            flush(finished, out)
+
+    elapsed = time.perf_counter() - started
+    print(f"🏁 {succeeded}/{len(pending)} priced in {elapsed:.1f}s ({len(pending) / elapsed:.2f} quotes/s) → {results_path}")
+    return results_path
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Price a batch of FBA quotations.")
+    parser.add_argument("input", help="Text file of Ag quote numbers, or JSONL of quote payloads")
+    parser.add_argument("--out", default="Logs/batch", help="Output directory (default: Logs/batch)")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument("--pickup-inr", type=float, default=0.0,
+                        help="Pickup charges (INR) for Door-to-Door quotes that do not carry their own")
+    parser.add_argument("--retry-failed", action="store_true", help="Price quotes that failed last time again")
+    parser.add_argument("--no-summary", action="store_true", help="Skip booking summarization")
+    args = parser.parse_args()
+
+    run_batch(args.input, args.out, args.workers, args.pickup_inr, args.retry_failed, not args.no_summary)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,96 +1,209 @@
+import copy
 import streamlit as st
 from datetime import datetime
-from data_fetch import fetch_quote_data
-from pricing_calculation import rates, summarization
-import pandas as pd
-import os
-import time
-
-LOG_FILE = r"Logs/success_rates.xlsx"
-
-def safe_int(val, default=1):
-    try:
-        return int(val)
-    except (ValueError, TypeError):
-        return default
-
-def safe_float(val, default=0.0):
-    try:
-        return float(val)
-    except (ValueError, TypeError):
-        return default
-
-def remove_ids(data):
-    if isinstance(data, dict):
-        return {k: remove_ids(v) for k, v in data.items() if k != "id"}
-    elif isinstance(data, list):
-        return [remove_ids(item) for item in data]
-    else:
-        return data
-    
-def log_rate_request(quote_id, console_type, service_modes, result, errors,time_taken):
-    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    status = "Error" if not result else "Success"
-    error_messages = "; ".join(errors) if errors else ""
-    service = ", ".join(service_modes) if len(service_modes) > 0 else ""
-    total_destinations = len(result) if result else 0
-
-    log_entry = {
-        "Timestamp": timestamp,
-        "Quote ID": quote_id,
-        "OverRide ConsoleType": console_type,
-        "OverRide ServiceModes": service,
-        "Status": status,
-        "Error Messages": error_messages,
-        "Total Destinations": total_destinations,
-        "Execution Time":time_taken
-    }
-
-    # Load or initialize log DataFrame
-    if os.path.exists(LOG_FILE):
-        df_logs = pd.read_excel(LOG_FILE)
-    else:
-        df_logs = pd.DataFrame(columns=[
-            "Timestamp", "Quote ID", "Status", "OverRide ConsoleType", "OverRide ServiceModes", "Error Messages", "Total Destinations"
-        ])
-
-    # Append new log entry and save
-    df_logs = pd.concat([df_logs, pd.DataFrame([log_entry])], ignore_index=True)
-    df_logs.to_excel(LOG_FILE, index=False)
-
-def quotations_backup(quote_id, result):
-    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    file_path = "Logs/quotations.xlsx"
-    data = []
-
-    for destination, consoles in result.items():
-        for console, details in consoles.items():
-            entry = details.copy()
-            entry['Agquote ID'] = quote_id
-            entry['Destination'] = destination
-            entry['Console Type'] = console
-            entry['Quoted Date/Time'] = timestamp
-            data.append(entry)
-
-    # New data as DataFrame
-    df_new = pd.DataFrame(data)
-
-    # Check if file exists
-    if os.path.exists(file_path):
+from cargo import normalize_cargo
+
+# Mongo, pricing and the pandas stack are imported inside the functions that
+# use them, so the empty quote form paints without loading them.
+
+CONSOLE_TYPES = ["not selected", "Own Console", "Coload", "both selected"]
+SERVICE_MODES = ["LTL", "FTL", "FTL53", "Drayage"]
+WHATIF_KEYS = ["whatif_console", "whatif_services", "whatif_fx", "whatif_pickup", "whatif_occ", "whatif_dcc"]
+
+
+def show_breakdowns(breakdowns, key):
+    titles = {"Own Console": ("🚛", "Own Console Breakdown"), "Coload": ("🚚", "Coload Breakdown")}
+    for console, grouped_results in breakdowns.items():
+        title_icon, title_text = titles[console]
+        st.markdown(f"### {title_icon} {title_text}")
+
+        for booking_name, (df_summary, df_details) in grouped_results.items():
+            st.markdown(f"### {booking_name}")
+            st.markdown(f"#### 📦 Summary Table")
+            with st.container(border=True):
+                st.data_editor(df_summary, use_container_width=True, disabled=True,
+                               key=f"{key}_{console}_{booking_name}_summary")
+
+            st.markdown(f"#### 📊 Detailed Breakdown")
+            with st.container(border=True):
+                st.data_editor(df_details, use_container_width=True, disabled=True,
+                               key=f"{key}_{console}_{booking_name}_details")
+
+
+def cargo_table(cargo_list, cargo_rows):
+    """Quote cargo lines as a frame for st.dataframe, with the totals rates() prices with."""
+    import pandas as pd
+    from quote_pricing import safe_int, safe_float
+
+    return pd.DataFrame({
+        "Package Type": [cargo.get("packageType", "") for cargo in cargo_list],
+        "Quantity": [safe_int(cargo.get("numPackages", 0)) for cargo in cargo_list],
+        "Weight": [safe_float(cargo.get("wtPerPackage", 0.0)) for cargo in cargo_list],
+        "L": [safe_float(cargo.get("length", 0.0)) for cargo in cargo_list],
+        "W": [safe_float(cargo.get("width", 0.0)) for cargo in cargo_list],
+        "H": [safe_float(cargo.get("height", 0.0)) for cargo in cargo_list],
+        "Total Weight": cargo_rows["weight"],
+        "Total Volume": cargo_rows["cbm"],
+    })
+
+
+# ----------------- Pricing Jobs -----------------
+def pricing_progress_panel(job_id):
+    from pricing_jobs import get_job
+
+    job = get_job(job_id)
+    if job is None:
+        return
+
+    if job["future"].done():
+        # Finished: rerun the page once to show the results
+        if st.session_state.get("pricing_polling"):
+            st.session_state.pricing_polling = False
+            st.rerun()
+        return
+
+    st.progress(job["progress"], text=f"⏳ {job['stage']}...")
+    st.caption("You can leave this tab; the rates will be here when you come back.")
+
+
+def show_pricing_result(job):
+    future = job["future"]
+    if future.exception():
+        st.error(f"❌ Rate calculation failed.\n\nDetails: `{future.exception()}`")
+        return
+
+    output = future.result()
+    result, errors, skipped_fba = output["result"], output["errors"], output["skipped_fba"]
+    minutes = int(output["elapsed"] // 60)
+    seconds = round(output["elapsed"] % 60, 2)
+    priced_at = datetime.fromtimestamp(job["submitted_at"]).strftime("%Y-%m-%d %H:%M")
+    st.success(f"✅ Done! Execution completed in {minutes} minutes, {seconds} seconds. (requested {priced_at})")
+
+    # ✅ Show errors if any
+    if errors:
+        st.warning("⚠️ Some issues occurred during rate calculation:")
+        for msg in errors:
+            st.markdown(f"- {msg}")
+
+    if result and not errors:
         try:
-            df_existing = pd.read_excel(file_path)
+            if len(skipped_fba) != 0:
+                st.warning(f"{', '.join(skipped_fba)} FBA locations are skipped")
+
+            st.success("✅ Rate calculation successful. Showing breakdown:")
+            show_breakdowns(output["breakdowns"], f"job_{job['id']}")
 
-            # Append new rows to remaining data
-            df_combined = pd.concat([df_existing, df_new], ignore_index=True)
         except Exception as e:
-            print("❌ Error reading existing file. Creating new one instead:", e)
-            df_combined = df_new
+            st.error(f"❌ An error occurred while displaying the breakdown.\n\nDetails: `{e}`")
     else:
-        df_combined = df_new
-
-    # Save back to the same file
-    df_combined.to_excel(file_path, index=False)
-    print("✅ Quotations updated in:", file_path)
+        if len(skipped_fba) != 0:
+            st.warning(f"{', '.join(skipped_fba)} FBA locations are skipped")
+        st.warning("⚠️ No valid rate results to display.")
+
+    # What-if starts from this run's inputs
+    if st.session_state.get("whatif_job") != job["id"]:
+        for key in WHATIF_KEYS:
+            st.session_state.pop(key, None)
+        inputs = job["inputs"]
+        st.session_state.whatif_job = job["id"]
+        # This session's own copy: what-if adds lanes to it
+        st.session_state.lane_cache = copy.deepcopy(job["lane_cache"])
+        st.session_state.whatif_quote = {
+            "quote_id": job["quote_id"],
+            "origin": inputs["origin"],
+            "multidest": inputs["multidest"],
+            "shipment_scope": inputs["shipment_scope"],
+            "is_occ": inputs["is_occ"],
+            "is_dcc": inputs["is_dcc"],
+            "pickup_charges_inr": inputs["pickup_charges_inr"],
+        }
+
+
+def pricing_job_section(quote_id):
+    """
+    Progress of this quote's Get Rates job, polled once a second while it runs,
+    then its results. Jobs are looked up by the IDs this session submitted,
+    per quote, so coming back to the tab picks up a run that is still going or
+    already finished, and never another user's run.
+    """
+    from pricing_jobs import get_job
+
+    job = get_job(st.session_state.get("pricing_jobs", {}).get(quote_id))
+    if job is None:
+        return
+
+    if not job["future"].done():
+        st.session_state.pricing_polling = True
+        st.fragment(pricing_progress_panel, run_every=1)(job["id"])
+        return
+    show_pricing_result(job)
+
+
+# ----------------- What-if -----------------
+@st.fragment
+def whatif_section():
+    """
+    Re-price the last Get Rates run with other options. Only this fragment
+    reruns, against the lane results kept in session, so no vendor is called
+    unless a service mode set is chosen that has not been priced yet.
+    """
+    from pricing_calculation import exchange_rate
+    from quote_pricing import reprice_quote, booking_breakdowns
+
+    base = st.session_state.whatif_quote
+
+    st.markdown("---")
+    st.markdown("### 🔁 What-if")
+
+    c1, c2, c3 = st.columns(3)
+    with c1:
+        console_type = st.selectbox("Console Type", CONSOLE_TYPES, key="whatif_console")
+    with c2:
+        service_modes = st.multiselect("Service Modes (blank = automatic)", SERVICE_MODES, key="whatif_services")
+    with c3:
+        fx_rate = st.number_input("Exchange Rate (USD to INR)", min_value=1.0, value=float(exchange_rate), step=0.5, key="whatif_fx")
+
+    c4, c5, c6 = st.columns(3)
+    with c4:
+        pickup_charges_inr = base["pickup_charges_inr"]
+        if base["shipment_scope"] == "Door-to-Door":
+            pickup_charges_inr = st.number_input("Pickup Charges (INR)", min_value=0.0, value=float(pickup_charges_inr),
+                                                 step=10.0, key="whatif_pickup")
+    with c5:
+        is_occ = st.toggle("OCC", value=base["is_occ"], key="whatif_occ")
+    with c6:
+        is_dcc = st.toggle("DCC", value=base["is_dcc"], key="whatif_dcc")
+
+    options = (console_type, service_modes, fx_rate, pickup_charges_inr, is_occ, is_dcc)
+    if options == ("not selected", [], float(exchange_rate), base["pickup_charges_inr"], base["is_occ"], base["is_dcc"]):
+        st.caption("Change an option above to re-price this quote.")
+        return
+
+    result, errors, skipped_fba, elapsed_time = reprice_quote(
+        base["quote_id"],
+        base["origin"],
+        base["multidest"],
+        base["shipment_scope"],
+        is_occ,
+        is_dcc,
+        pickup_charges_inr,
+        console_type,
+        service_modes,
+        st.session_state.lane_cache,
+        fx_rate
+    )
+    st.caption(f"⚡ Re-priced in {elapsed_time:.2f} seconds")
+
+    if errors:
+        st.warning("⚠️ Some issues occurred during rate calculation:")
+        for msg in errors:
+            st.markdown(f"- {msg}")
+    if skipped_fba:
+        st.warning(f"{', '.join(skipped_fba)} FBA locations are skipped")
+    if result:
+        show_breakdowns(booking_breakdowns(base["quote_id"], result, fx_rate, log=False), "whatif")
+    else:
+        st.warning("⚠️ No valid rate results to display.")
 
 
 def fba_quote_app():
@@ -106,10 +219,13 @@ def fba_quote_app():
 
     if quote_id != st.session_state.last_quote_input:
         st.session_state.form_data_loaded = False
+        st.session_state.pop("whatif_quote", None)
+        st.session_state.pop("whatif_job", None)
         st.session_state.last_quote_input = quote_id
         st.rerun()
 
     if quote_id and not st.session_state.form_data_loaded:
+        from data_fetch import fetch_quote_data
         try:
             quote_data, entityname = fetch_quote_data(quote_id)
 
@@ -179,46 +295,14 @@ def fba_quote_app():
 
             st.markdown(f"#### 📍 Destination {idx + 1}: `{dest}`")
 
-            total_weight_all = 0.0
-            total_volume_all = 0.0
-
-            for row_idx, cargo in enumerate(cargo_list):
-                weight_val = safe_float(cargo.get("wtPerPackage", 0.0))
-                volPerPackage = safe_float(cargo.get("volPerPackage", 0.0))
-                length_val = safe_float(cargo.get("length", 0.0))
-                width_val = safe_float(cargo.get("width", 0.0))
-                height_val = safe_float(cargo.get("height", 0.0))
-                quantity_val = safe_int(cargo.get("numPackages", 0))
-                pkg_type = cargo.get("packageType", "")
-
-                if volPerPackage == 0.0:
-                    volPerPackage = (length_val*width_val*height_val)/1000000
-
-                total_weight = weight_val * quantity_val
-                total_volume = volPerPackage * quantity_val
-
-                total_weight_all += total_weight
-                total_volume_all += total_volume
-
-                col1, col2, col3, col4, col5, col6 = st.columns([1.5, 1, 1.5, 1, 1, 1])
-                with col1:
-                    st.text_input("Package Type*", pkg_type, key=f"pkg_{idx}_{row_idx}", disabled=True)
-                with col2:
-                    st.number_input("Quantity*", min_value=1, value=quantity_val, key=f"qty_{idx}_{row_idx}", disabled=True)
-                with col3:
-                    st.number_input(f"Weight*", min_value=0.0, value=weight_val, key=f"wt_{idx}_{row_idx}", disabled=True)
-                with col4:
-                    st.number_input(f"L", min_value=0.0, value=length_val, key=f"l_{idx}_{row_idx}", disabled=True)
-                with col5:
-                    st.number_input(f"W", min_value=0.0, value=width_val, key=f"w_{idx}_{row_idx}", disabled=True)
-                with col6:
-                    st.number_input(f"H", min_value=0.0, value=height_val, key=f"h_{idx}_{row_idx}", disabled=True)
-
-                st.markdown(
-                    f"**Total Weight:** `{total_weight}` &nbsp;&nbsp;&nbsp;&nbsp;&nbsp; "
-                    f"**Total Volume:** `{total_volume}`",
-                    unsafe_allow_html=True
-                )
+            # Same weight / CBM rules rates() prices with
+            cargo_rows = normalize_cargo(cargo_list)
+            total_weight_all = float(cargo_rows["weight"].sum())
+            total_volume_all = float(cargo_rows["cbm"].sum())
+
+            # One read-only table per destination; only visible rows are drawn
+            st.dataframe(cargo_table(cargo_list, cargo_rows), use_container_width=True, hide_index=True,
+                         key=f"cargo_{idx}")
 
             st.markdown(
                 f"✅ **Grand Total Weight:** `{total_weight_all}` "
@@ -262,7 +346,6 @@ def fba_quote_app():
 
 
     if submit:
-        start_time = time.time()
         if not quote_id:
             st.warning("⚠️ Please enter a valid Ag Quote No. before requesting rates.")
         elif not st.session_state.form_data_loaded:
@@ -292,99 +375,28 @@ def fba_quote_app():
             origin = st.session_state.get("origin", "")
 
 
-            with st.spinner("✅ Getting rates based on provided inputs...",show_time = True):
-                
-                cleaned_data = remove_ids(st.session_state.multidest)
-
-                # ✅ Updated call with error handling
-                console_type = "not selected"
-                service_modes = []
-                dt_str = datetime.now().strftime("%Y%m%d%H%M%S")
-                unique_id = f"{quote_id}_{dt_str}"
-                result, errors, skipped_fba = rates(
-                    origin,
-                    cleaned_data,
-                    console_type,
-                    is_occ,
-                    is_dcc,
-                    des_val,
-                    shipment_scope,
-                    pickup_charges_inr,
-                    service_modes,
-                    grand_total_weight,
-                    grand_total_cbm,
-                    quote_id,
-                    unique_id
-                )
-
-                end_time = time.time()
-                elapsed_time = end_time - start_time
-
-                minutes = int(elapsed_time // 60)
-                seconds = round(elapsed_time % 60, 2)
-
-                st.success(f"✅ Done! Execution completed in {minutes} minutes, {seconds} seconds.")
-            # st.json(result)
-
-            # ✅ Show errors if any
-            if errors:
-                st.warning("⚠️ Some issues occurred during rate calculation:")
-                for msg in errors:
-                    st.markdown(f"- {msg}")
-
-            log_rate_request(quote_id, console_type, service_modes, result, errors,f"{minutes} minutes, {seconds} seconds")
-
-            if result and not errors:
-                try:
-                    
-                    quotations_backup(quote_id, result)  # 💾 Save backup
-
-                    if len(skipped_fba) != 0:
-                        st.warning(f"{', '.join(skipped_fba)} FBA locations are skipped")
-
-                    st.success("✅ Rate calculation successful. Showing breakdown:")
-
-                    own_console_dict = {}
-                    coload_dict = {}
-
-                    for location, consoles in result.items():
-                        if "Own Console" in consoles:
-                            own_console_dict[location] = {"Own Console": consoles["Own Console"]}
-                        if "Coload" in consoles:
-                            coload_dict[location] = {"Coload": consoles["Coload"]}
-
-                    # Function to display grouped bookings
-
-                    def display_grouped_results(grouped_data, title_icon, title_text, booking_num):
-                        if grouped_data:
-                            st.markdown(f"### {title_icon} {title_text}")
-                            grouped_results, booking_counter = summarization(grouped_data, quote_id, booking_num)
-
-                            for booking_name, (df_summary, df_details) in grouped_results.items():
-                                st.markdown(f"### {booking_name}")
-                                st.markdown(f"#### 📦 Summary Table")
-                                with st.container(border=True):
-                                    st.data_editor(df_summary, use_container_width=True, disabled=True)
-
-                                st.markdown(f"#### 📊 Detailed Breakdown")
-                                with st.container(border=True):
-                                    st.data_editor(df_details, use_container_width=True, disabled=True)
-
-                            return booking_counter
-                        return booking_num  # unchanged if no data
-
-
-                    booking_num = 1
-                    booking_num = display_grouped_results(own_console_dict, "🚛", "Own Console Breakdown", booking_num)
-                    booking_num = display_grouped_results(coload_dict, "🚚", "Coload Breakdown", booking_num)
+            # ✅ Priced in the background; progress and results show below
+            from pricing_jobs import submit_pricing
+            console_type = "not selected"
+            service_modes = []
+            job = submit_pricing(
+                quote_id,
+                origin,
+                st.session_state.multidest,
+                shipment_scope,
+                is_occ,
+                is_dcc,
+                pickup_charges_inr,
+                console_type,
+                service_modes
+            )
+            st.session_state.setdefault("pricing_jobs", {})[quote_id] = job["id"]
 
+    if quote_id and st.session_state.form_data_loaded:
+        pricing_job_section(quote_id)
 
-                except Exception as e:
-                    st.error(f"❌ An error occurred while displaying the breakdown.\n\nDetails: `{e}`")
-            else:
-                if len(skipped_fba) != 0:
-                    st.warning(f"{', '.join(skipped_fba)} FBA locations are skipped")
-                st.warning("⚠️ No valid rate results to display.")
+    if st.session_state.get("whatif_quote", {}).get("quote_id") == quote_id and st.session_state.get("lane_cache"):
+        whatif_section()
 
 
 
@@ -0,0 +1,118 @@
+import numpy as np
+
+# Loose cargo is palletized at this many CBM per pallet
+CBM_PER_PALLET = 1.8
+# cm³ → m³
+CBM_PER_CUBIC_CM = 1 / 1000000
+
+# Field names per cargo source
+QUOTE_FIELDS = {
+    "package": "packageType",
+    "qty": "numPackages",
+    "weight": "wtPerPackage",
+    "volume": "volPerPackage",
+    "length": "length",
+    "width": "width",
+    "height": "height",
+    "total_weight": "totalWeight",
+    "total_volume": "totalVolume",
+}
+TRANSPORT_FIELDS = {
+    "package": "package_type",
+    "qty": "qty",
+    "weight": "weight",
+    "length": "L",
+    "width": "W",
+    "height": "H",
+}
+
+PALLET_PACKAGES = {"pallet", "pallets"}
+# Fields that fail the row when present but not numeric; totals and per package
+# volume only fall back to the next rule
+REQUIRED_NUMERIC = ["qty", "weight", "volume", "length", "width", "height"]
+
+
+# ----------------- Normalization -----------------
+def _to_float(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return np.nan
+
+
+def _numeric_matrix(items, keys):
+    """
+    Cargo fields as one (rows × fields) float array: missing → 0, not numeric → NaN.
+    NumPy converts the whole table in one call; only a table with text in a
+    numeric field falls back to converting cell by cell.
+    """
+    keys = [key or "" for key in keys]  # fields a source does not have read as 0
+    count = len(items) * len(keys)
+    try:
+        values = np.fromiter((item.get(key, 0.0) for item in items for key in keys), float, count=count)
+    except (TypeError, ValueError):
+        values = np.fromiter((_to_float(item.get(key, 0.0)) for item in items for key in keys), float, count=count)
+    return values.reshape(len(items), len(keys))
+
+
+def loose_pallets(loose_cbm):
+    """Pallets needed for loose cargo (works on scalars and arrays)."""
+    return np.ceil(np.asarray(loose_cbm, dtype=float) / CBM_PER_PALLET).astype(int)
+
+
+def normalize_cargo(items, fields=QUOTE_FIELDS):
+    """
+    Per row arrays for a cargo list: qty, weight, cbm, is_pallet and valid.
+
+    weight = total weight if given, else qty × weight per package.
+    cbm    = total volume if given, else qty × volume per package if given,
+             else qty × L × W × H (cm).
+    Rows with a non-numeric quantity, weight or dimension are marked invalid
+    and count as zero.
+    """
+    items = list(items or [])
+    names = [name for name in QUOTE_FIELDS if name != "package"]
+    matrix = _numeric_matrix(items, [fields.get(name) for name in names])
+    packages = np.array([str(item.get(fields["package"], "")).strip().lower() for item in items], dtype=object)
+
+    valid = ~np.isnan(matrix[:, [names.index(name) for name in REQUIRED_NUMERIC]]).any(axis=1)
+    cols = dict(zip(names, np.nan_to_num(matrix, nan=0.0).T))
+
+    qty = np.trunc(cols["qty"])
+    weight = np.where(cols["total_weight"] != 0, cols["total_weight"], qty * cols["weight"])
+    dims_cbm = cols["length"] * cols["width"] * cols["height"] * CBM_PER_CUBIC_CM
+    cbm = np.where(
+        cols["total_volume"] != 0, cols["total_volume"],
+        qty * np.where(cols["volume"] != 0, cols["volume"], dims_cbm)
+    )
+
+    return {
+        "qty": np.where(valid, qty, 0),
+        "weight": np.where(valid, weight, 0.0),
+        "cbm": np.where(valid, cbm, 0.0),
+        "is_pallet": np.isin(packages, list(PALLET_PACKAGES)) & valid,
+        "valid": valid,
+    }
+
+
+def cargo_totals(items, fields=QUOTE_FIELDS):
+    """
+    Quantity, weight, CBM and pallet figures for a cargo list. Loose cargo is
+    palletized on its combined CBM. "Invalid Rows" lists 1-based rows that were
+    skipped because a number could not be read.
+    """
+    rows = normalize_cargo(items, fields)
+    loose_cbm = float(rows["cbm"][~rows["is_pallet"]].sum())
+    pallets = int(rows["qty"][rows["is_pallet"]].sum())
+    loose = int(loose_pallets(loose_cbm))
+
+    return {
+        "Qty": int(rows["qty"].sum()),
+        "Weight": float(rows["weight"].sum()),
+        "CBM": float(rows["cbm"].sum()),
+        "Pallets": pallets,
+        "Loose CBM": loose_cbm,
+        "Loose Pallets": loose,
+        "Total Pallets": pallets + loose,
+        "Invalid Rows": [int(i) + 1 for i in np.flatnonzero(~rows["valid"])],
+    }
@@ -1,72 +1,282 @@
+import copy
+import os
+import threading
+import time
+from collections import OrderedDict
 from pymongo import MongoClient
-import pandas as pd
 from datetime import datetime
-import os
+from log_store import append_records
 
-LOG_FILE = r"Logs/mongo_datafetch.xlsx"
+LOG_NAME = "mongo_datafetch"
 
-def log_fetch_result(quote_id, status, reason_or_summary):
+# Connection settings; the FBA_MONGO_* environment variables override them
+MONGO_URI = os.environ.get("FBA_MONGO_URI", "mongodb://65.1.22.99:27017/")
+DATABASE_NAME = os.environ.get("FBA_MONGO_DB", "agdb-prod2")
+MONGO_OPTIONS = {
+    "maxPoolSize": int(os.environ.get("FBA_MONGO_MAX_POOL", 20)),
+    "minPoolSize": int(os.environ.get("FBA_MONGO_MIN_POOL", 0)),
+    "maxIdleTimeMS": int(os.environ.get("FBA_MONGO_MAX_IDLE_MS", 300000)),
+    "serverSelectionTimeoutMS": int(os.environ.get("FBA_MONGO_SELECT_TIMEOUT_MS", 5000)),
+    "connectTimeoutMS": int(os.environ.get("FBA_MONGO_CONNECT_TIMEOUT_MS", 5000)),
+    "socketTimeoutMS": int(os.environ.get("FBA_MONGO_SOCKET_TIMEOUT_MS", 20000)),
+    "appname": "fba-pricing-tool",
+}
+
+QUOTES_PROJECTION = {
+    "quoteSummary.entityId": 1,
+    "quoteSummary.shipmentScope": 1,
+    "quoteData.origin": 1,
+    "quoteData.multidest": 1,
+    "quoteData.cargoReadinessDate": 1,
+    "quoteData.fba": 1,
+    "quoteData.fbaOCC": 1,
+    "quoteData.fbaDCC": 1
+}
+
+# Quote document cache: entries younger than QUOTE_CACHE_FRESH_S are served as is,
+# older ones are checked against the quote's version field (one tiny projection)
+# until QUOTE_CACHE_TTL_S, after which the quote is fetched again.
+QUOTE_CACHE_SIZE = int(os.environ.get("FBA_QUOTE_CACHE_SIZE", 256))
+QUOTE_CACHE_FRESH_S = int(os.environ.get("FBA_QUOTE_CACHE_FRESH_S", 30))
+QUOTE_CACHE_TTL_S = int(os.environ.get("FBA_QUOTE_CACHE_TTL_S", 900))
+QUOTE_VERSION_FIELD = os.environ.get("FBA_QUOTE_VERSION_FIELD", "updatedAt")
+
+_client_lock = threading.Lock()
+_client = None
+_client_pid = None
+
+_cache_lock = threading.Lock()
+_quote_cache = OrderedDict()  # quote ID -> (quote_doc, entity_name, version, fetched_at, checked_at)
+_cache_stats = {"hits": 0, "validated": 0, "stale": 0, "misses": 0, "evictions": 0}
+
+def fetch_log_entry(quote_id, status, reason_or_summary):
     timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    log_entry = {
+    return {
         "Timestamp": timestamp,
         "Quote ID": str(quote_id),
         "Status": status,  # "Success" or "Failed"
         "Message": reason_or_summary
     }
 
-    # Create or append log
-    if os.path.exists(LOG_FILE):
-        df = pd.read_excel(LOG_FILE)
+def log_fetch_result(quote_id, status, reason_or_summary):
+    append_records(LOG_NAME, fetch_log_entry(quote_id, status, reason_or_summary))
+
+# ----------------- MongoDB Client -----------------
+def get_client():
+    """
+    The process-wide pooled MongoClient, created on first use. pymongo clients
+    are thread safe and must not cross a fork, so each process (batch workers,
+    uvicorn workers) gets its own.
+    """
+    global _client, _client_pid
+    if _client is not None and _client_pid == os.getpid():
+        return _client
+    with _client_lock:
+        if _client is None or _client_pid != os.getpid():
+            _client = MongoClient(MONGO_URI, **MONGO_OPTIONS)
+            _client_pid = os.getpid()
+    return _client
+
+
+def get_db():
+    return get_client()[DATABASE_NAME]
+
+
+def close_client():
+    global _client, _client_pid
+    with _client_lock:
+        if _client is not None and _client_pid == os.getpid():
+            _client.close()
+        _client = None
+        _client_pid = None
+
+
+def mongo_health():
+    """Ping the server: status, round-trip time and the pool settings in use."""
+    started = time.perf_counter()
+    try:
+        get_client().admin.command("ping")
+        status, error = "ok", ""
+    except Exception as e:
+        status, error = "unavailable", str(e)
+    return {
+        "Status": status,
+        "Ping (ms)": round((time.perf_counter() - started) * 1000, 1),
+        "Database": DATABASE_NAME,
+        "Max Pool Size": MONGO_OPTIONS["maxPoolSize"],
+        "Server Selection Timeout (ms)": MONGO_OPTIONS["serverSelectionTimeoutMS"],
+        "Error": error,
+    }
+
+
+# ----------------- Quote Document Cache -----------------
+def _count(stat):
+    with _cache_lock:
+        _cache_stats[stat] += 1
+
+
+def _remember(_id, quote_doc, entity_name, version):
+    now = time.monotonic()
+    with _cache_lock:
+        _quote_cache[_id] = (copy.deepcopy(quote_doc), entity_name, version, now, now)
+        _quote_cache.move_to_end(_id)
+        while len(_quote_cache) > QUOTE_CACHE_SIZE:
+            _quote_cache.popitem(last=False)
+            _cache_stats["evictions"] += 1
+
+
+def _forget(_id):
+    with _cache_lock:
+        _quote_cache.pop(_id, None)
+
+
+def _cached_quote(_id):
+    """(quote_doc, entity_name) from the cache if still current, else None."""
+    with _cache_lock:
+        entry = _quote_cache.get(_id)
+        if entry is not None:
+            _quote_cache.move_to_end(_id)
+    if entry is None:
+        _count("misses")
+        return None
+
+    quote_doc, entity_name, version, fetched_at, checked_at = entry
+    now = time.monotonic()
+    if now - fetched_at > QUOTE_CACHE_TTL_S:
+        _forget(_id)
+        _count("stale")
+        return None
+
+    if now - checked_at > QUOTE_CACHE_FRESH_S:
+        # Without a version field there is nothing to compare, so fetch again
+        current = get_db()["Quotes"].find_one({"_id": _id}, {QUOTE_VERSION_FIELD: 1})
+        if version is None or not current or current.get(QUOTE_VERSION_FIELD) != version:
+            _forget(_id)
+            _count("stale")
+            return None
+        with _cache_lock:
+            if _id in _quote_cache:
+                _quote_cache[_id] = (quote_doc, entity_name, version, fetched_at, now)
+        _count("validated")
     else:
-        df = pd.DataFrame(columns=list(log_entry.keys()))
+        _count("hits")
 
-    df = pd.concat([df, pd.DataFrame([log_entry])], ignore_index=True)
-    df.to_excel(LOG_FILE, index=False)
+    return copy.deepcopy(quote_doc), entity_name
 
-# ----------------- MongoDB Fetch Function with Minimal Logging -----------------
-def fetch_quote_data(_id):
-    host = "65.1.22.99"
-    port = "27017"
-    database_name = "agdb-prod2"
-
-    client = MongoClient(f'mongodb://{host}:{port}/')
-    db = client[database_name]
-
-    Quotes_collection = db["Quotes"]
-    Entities_collection = db["SHEntities"]
-
-    Quotes_projection = {
-        "quoteSummary.entityId": 1,
-        "quoteSummary.shipmentScope": 1,
-        "quoteData.origin": 1,
-        "quoteData.multidest": 1,
-        "quoteData.cargoReadinessDate": 1,
-        "quoteData.fba": 1,
-        "quoteData.fbaOCC": 1,
-        "quoteData.fbaDCC": 1
+
+def quote_cache_stats():
+    """Cache size and counters; Hit Rate counts validated hits as hits."""
+    with _cache_lock:
+        stats = dict(_cache_stats)
+        size = len(_quote_cache)
+    lookups = stats["hits"] + stats["validated"] + stats["stale"] + stats["misses"]
+    return {
+        "Size": size,
+        "Max Size": QUOTE_CACHE_SIZE,
+        "Hits": stats["hits"],
+        "Validated Hits": stats["validated"],
+        "Stale": stats["stale"],
+        "Misses": stats["misses"],
+        "Evictions": stats["evictions"],
+        "Hit Rate": round((stats["hits"] + stats["validated"]) / lookups, 3) if lookups else None,
     }
 
-    try:
-        quote_doc = Quotes_collection.find_one({"_id": _id}, Quotes_projection)
-        if not quote_doc:
-            log_fetch_result(_id, "Failed", "Quote document not found in MongoDB.")
-            return None, None
 
-        entity_id = quote_doc.get("quoteSummary", {}).get("entityId")
-        if not entity_id:
-            log_fetch_result(_id, "Failed", "Missing entityId in quote document.")
-            return None, None
+def clear_quote_cache():
+    with _cache_lock:
+        _quote_cache.clear()
+
+
+# ----------------- MongoDB Fetch Function with Minimal Logging -----------------
+def quote_pipeline(match):
+    """Quotes matching a filter, projected, with the entity name joined from SHEntities."""
+    return [
+        {"$match": match},
+        {"$project": {**QUOTES_PROJECTION, "_version": f"${QUOTE_VERSION_FIELD}"}},
+        {"$lookup": {
+            "from": "SHEntities",
+            "localField": "quoteSummary.entityId",
+            "foreignField": "_id",
+            "as": "_entity",
+        }},
+        {"$addFields": {"_entityName": {"$arrayElemAt": ["$_entity.entityName", 0]}}},
+        {"$project": {"_entity": 0}},
+    ]
+
 
-        entity_doc = Entities_collection.find_one({"_id": entity_id}, {"entityName": 1})
-        entity_name = entity_doc.get("entityName") if entity_doc else None
+def _checked(_id, quote_doc):
+    # (quote_doc, entity_name, log entry) with the same checks and messages for single and bulk fetches
+    if not quote_doc:
+        return None, None, (_id, "Failed", "Quote document not found in MongoDB.")
 
-        result_summary = f"Origin: {quote_doc.get('quoteData', {}).get('origin', '')}; " \
-                         f"Shipment Scope: {quote_doc.get('quoteSummary', {}).get('shipmentScope', '')}; " \
-                         f"Entity: {entity_name or 'N/A'}"
+    entity_name = quote_doc.pop("_entityName", None)
+    entity_id = quote_doc.get("quoteSummary", {}).get("entityId")
+    if not entity_id:
+        return None, None, (_id, "Failed", "Missing entityId in quote document.")
 
-        log_fetch_result(_id, "Success", result_summary)
+    result_summary = f"Origin: {quote_doc.get('quoteData', {}).get('origin', '')}; " \
+                     f"Shipment Scope: {quote_doc.get('quoteSummary', {}).get('shipmentScope', '')}; " \
+                     f"Entity: {entity_name or 'N/A'}"
+    return quote_doc, entity_name, (_id, "Success", result_summary)
+
+
+def fetch_quote_data(_id):
+    try:
+        cached = _cached_quote(_id)
+        if cached:
+            return cached
+
+        # Quote and entity name in one round-trip on the pooled client
+        docs = list(get_db()["Quotes"].aggregate(quote_pipeline({"_id": _id}) + [{"$limit": 1}]))
+        quote_doc = docs[0] if docs else None
+        version = quote_doc.pop("_version", None) if quote_doc else None
+        quote_doc, entity_name, log = _checked(_id, quote_doc)
+        log_fetch_result(*log)
+        if quote_doc:
+            _remember(_id, quote_doc, entity_name, version)
         return quote_doc, entity_name
 
     except Exception as e:
         log_fetch_result(_id, "Failed", f"Exception: {str(e)}")
         return None, None
+
+
+BULK_PAGE_SIZE = 500
+
+
+def fetch_quotes_bulk(ids, page_size=BULK_PAGE_SIZE, db=None):
+    """
+    {quote ID: (quote_doc, entity_name)} for many quotes, with the same checks
+    as fetch_quote_data (failures map to (None, None)). Each page of IDs is one
+    $in + $lookup aggregation, so N quotes cost N / page_size round-trips.
+    Pass db to run against another database, e.g. a mongomock one in tests.
+    """
+    db = get_db() if db is None else db
+    ids = list(dict.fromkeys(ids))
+    found = {}
+    results = {}
+    logs = []
+
+    for start in range(0, len(ids), page_size):
+        page = ids[start:start + page_size]
+        try:
+            for doc in db["Quotes"].aggregate(quote_pipeline({"_id": {"$in": page}})):
+                found[doc["_id"]] = doc
+        except Exception as e:
+            for _id in page:
+                results[_id] = (None, None)
+                logs.append((_id, "Failed", f"Exception: {str(e)}"))
+            continue
+
+        for _id in page:
+            quote_doc = found.pop(_id, None)
+            version = quote_doc.pop("_version", None) if quote_doc else None
+            quote_doc, entity_name, log = _checked(_id, quote_doc)
+            results[_id] = (quote_doc, entity_name)
+            logs.append(log)
+            if quote_doc:
+                _remember(_id, quote_doc, entity_name, version)
+
+    if logs:
+        append_records(LOG_NAME, [fetch_log_entry(*log) for log in logs])
+    return results
@@ -1,175 +1,299 @@
 import streamlit as st
 from streamlit_option_menu import option_menu
-from search_quotes import search_quotations_app
+from startup_profile import load_module
 from pathlib import Path
 import pandas as pd
 import datetime as dt
 import os
+import shutil
 import time
 
 # ---------- FBA Tariff Validation Setup ----------
 FBA_FILE_PATH = "Data/FBA Rates.xlsx"
 
-def validate_fba_tariff(file_path):
-    EXPECTED_SHEETS = ["FBA Locations", "P2P", "Accessorials", "Palletization"]
+FBA_SHEETS = ["FBA Locations", "P2P", "Accessorials", "Palletization"]
 
-    EXPECTED_FBA_LOCATIONS = [
-        "FPOD ZIP", "FPOD CITY", "FPOD UNLOC", "FPOD STATE CODE", "FPOD CFS NAME",
-        "FBA Code", "FBA ZIP", "FBA CITY", "FBA STATE CODE", "Last 10 weeks",
-        "Last 1 Week", "Last 3 Week", "Pre-Determined Bucket", "Loadability",
-        "Consolidator", "FBA / Destn Coast"
-    ]
+EXPECTED_FBA_LOCATIONS = [
+    "FPOD ZIP", "FPOD CITY", "FPOD UNLOC", "FPOD STATE CODE", "FPOD CFS NAME",
+    "FBA Code", "FBA ZIP", "FBA CITY", "FBA STATE CODE", "Last 10 weeks",
+    "Last 1 Week", "Last 3 Week", "Pre-Determined Bucket", "Loadability",
+    "Consolidator", "FBA / Destn Coast"
+]
 
-    EXPECTED_P2P = [
-        "P2P Type", "Carrier SCAC", "POL Name", "POR/POL", "FPOD Name", "FPOD UNLOC", "FPOD Name",
-        "Origin charges per Container(INR)", "OIH", "Ocean Freight (USD)", "DIH", "Drayage & Devanning(USD)",
-        "Total cost (USD)", "Loadability", "Per CBM(USD)", "Valid From", "Valid To", "Notes"
-    ]
+EXPECTED_P2P = [
+    "P2P Type", "Carrier SCAC", "POL Name", "POR/POL", "FPOD Name", "FPOD UNLOC", "FPOD Name",
+    "Origin charges per Container(INR)", "OIH", "Ocean Freight (USD)", "DIH", "Drayage & Devanning(USD)",
+    "Total cost (USD)", "Loadability", "Per CBM(USD)", "Valid From", "Valid To", "Notes"
+]
+OWN_CONSOLE_NUMERIC = ["Origin charges per Container(INR)", "Ocean Freight (USD)",
+                       "Drayage & Devanning(USD)", "Total cost (USD)", "Loadability", "Per CBM(USD)"]
 
-    EXPECTED_ACCESSORIALS = ["Charge Head", "FPOD", "Location Unloc", "Currency", "Amount"]
-    EXPECTED_PALLETIZATION = ["Service Type", "FPOD", "FPOD UNLOC", "Currency", "Amount"]
+EXPECTED_ACCESSORIALS = ["Charge Head", "FPOD", "Location Unloc", "Currency", "Amount"]
+EXPECTED_PALLETIZATION = ["Service Type", "FPOD", "FPOD UNLOC", "Currency", "Amount"]
 
-    try:
-        xl = pd.ExcelFile(file_path)
+# Row numbers listed per problem before the rest are only counted
+ROW_LIST_LIMIT = 30
 
-        for sheet in EXPECTED_SHEETS:
-            if sheet not in xl.sheet_names:
-                return f"❌ Missing sheet: {sheet}"
+# Rows per frame when a sheet is streamed instead of read whole
+CHUNK_ROWS = 5000
 
-        df_fba = pd.read_excel(file_path, sheet_name="FBA Locations")
-        for col in EXPECTED_FBA_LOCATIONS:
-            if col not in df_fba.columns:
-                return f"❌ Missing column '{col}' in FBA Locations"
 
-        for col in EXPECTED_FBA_LOCATIONS[:10]:
-            if df_fba[col].isna().any() or df_fba[col].eq("").any():
-                return f"❌ Blank value found in column '{col}' of FBA Locations"
+# ---------- Validation Helpers ----------
+# problems maps each message to the [first, last] spreadsheet row ranges it
+# applies to ([] for file-level problems), so chunks of one sheet add to the
+# same line and memory grows with the number of ranges, not rows.
+def excel_rows(mask):
+    """Spreadsheet row numbers (header is row 1) where a boolean Series is True."""
+    return (mask.index[mask.to_numpy()] + 2).tolist()
 
-        for col in ["Last 10 weeks", "Last 1 Week", "Last 3 Week"]:
-            if not pd.api.types.is_numeric_dtype(df_fba[col]):
-                return f"❌ Column '{col}' must contain only numeric values in FBA Locations"
 
-        df_p2p = pd.read_excel(file_path, sheet_name="P2P")
-        for col in EXPECTED_P2P:
-            if col not in df_p2p.columns:
-                return f"❌ Missing column '{col}' in P2P"
+def row_ranges(ranges, limit=ROW_LIST_LIMIT):
+    """[[2, 4], [9, 9]] -> "2-4, 9", listing at most limit ranges."""
+    text = ", ".join(str(a) if a == b else f"{a}-{b}" for a, b in ranges[:limit])
+    if len(ranges) > limit:
+        text += f" and {len(ranges) - limit} more"
+    return text
 
-        for col in ["POL Name", "POR/POL", "FPOD Name", "FPOD UNLOC", "Per CBM(USD)", "Valid From", "Valid To"]:
-            if df_p2p[col].isna().any() or df_p2p[col].eq("").any():
-                return f"❌ Blank value found in column '{col}' of P2P"
-
-        if not df_p2p["P2P Type"].isin(["Own Console", "Coload"]).all():
-            return "❌ P2P Type must be either 'Own Console' or 'Coload'"
-
-        own_console = df_p2p[df_p2p["P2P Type"] == "Own Console"]
-        for col in ["Origin charges per Container(INR)", "Ocean Freight (USD)", 
-                    "Drayage & Devanning(USD)", "Total cost (USD)", "Loadability", "Per CBM(USD)"]:
-            if own_console[col].isna().any():
-                return f"❌ Missing value in '{col}' for Own Console rows"
-            if not pd.api.types.is_numeric_dtype(own_console[col]):
-                return f"❌ Column '{col}' must be numeric for Own Console rows"
-
-        coload = df_p2p[df_p2p["P2P Type"] == "Coload"]
-        if coload["Per CBM(USD)"].isna().any() or not pd.api.types.is_numeric_dtype(coload["Per CBM(USD)"]):
-            return "❌ 'Per CBM(USD)' must be numeric for Coload rows"
-
-        today = dt.datetime.today()
-        for i, row in df_p2p.iterrows():
-            try:
-                valid_from = pd.to_datetime(row["Valid From"])
-                valid_to = pd.to_datetime(row["Valid To"])
-                if not (valid_from <= today <= valid_to):
-                    return f"❌ Rates expired for row {i+2} in P2P"
-            except Exception:
-                return f"❌ Invalid date format in Valid From/Valid To at row {i+2}"
-
-        df_acc = pd.read_excel(file_path, sheet_name="Accessorials")
-        for col in EXPECTED_ACCESSORIALS:
-            if col not in df_acc.columns:
-                return f"❌ Missing column '{col}' in Accessorials"
-
-        if not df_acc["Currency"].eq("USD").all():
-            return "❌ All Currency values in Accessorials must be 'USD'"
-        if not pd.api.types.is_numeric_dtype(df_acc["Amount"]):
-            return "❌ 'Amount' in Accessorials must be numeric"
-
-        df_pal = pd.read_excel(file_path, sheet_name="Palletization")
-        for col in EXPECTED_PALLETIZATION:
-            if col not in df_pal.columns:
-                return f"❌ Missing column '{col}' in Palletization"
-
-        if not df_pal["Currency"].eq("USD").all():
-            return "❌ All Currency values in Palletization must be 'USD'"
-        if not pd.api.types.is_numeric_dtype(df_pal["Amount"]):
-            return "❌ 'Amount' in Palletization must be numeric"
 
+def add_problem(problems, message):
+    problems.setdefault(message, [])
+
+
+def add_rows(problems, mask, message):
+    # One problem line per rule, naming every offending row
+    rows = excel_rows(mask)
+    if not rows:
+        return
+    ranges = problems.setdefault(message, [])
+    for row in rows:
+        if ranges and row == ranges[-1][1] + 1:
+            ranges[-1][1] = row
+        else:
+            ranges.append([row, row])
+
+
+def blank(series):
+    return series.isna() | series.astype(str).str.strip().eq("")
+
+
+def not_numeric(series):
+    # Present but not a number
+    return series.notna() & pd.to_numeric(series, errors="coerce").isna()
+
+
+def missing_columns(problems, df, expected, sheet):
+    missing = [col for col in dict.fromkeys(expected) if col not in df.columns]
+    for col in missing:
+        add_problem(problems, f"Missing column '{col}' in {sheet}")
+    return bool(missing)
+
+
+def validation_result(problems):
+    if not problems:
         return "✅ File validation passed"
+    lines = [f"❌ {len(problems)} problem{'s' if len(problems) > 1 else ''} found, fix all of them and upload again:"]
+    for message, ranges in problems.items():
+        if ranges:
+            plural = "s" if len(ranges) > 1 or ranges[0][0] != ranges[0][1] else ""
+            message = f"{message} (row{plural} {row_ranges(ranges)})"
+        lines.append(f"- {message}")
+    return "\n".join(lines)
+
+
+def _column_names(header):
+    # Blank and repeated headers named the way pd.read_excel names them
+    names, seen = [], {}
+    for i, name in enumerate(header):
+        name = f"Unnamed: {i}" if name is None else str(name)
+        if name in seen:
+            seen[name] += 1
+            name = f"{name}.{seen[name]}"
+        else:
+            seen[name] = 0
+        names.append(name)
+    return names
+
+
+def sheet_chunks(file_path, sheet_name=None, chunk_rows=CHUNK_ROWS):
+    """
+    Stream a worksheet (the first one by default) in openpyxl read-only mode,
+    yielding (frame, total rows) per chunk_rows rows. Frames are indexed by
+    position in the sheet, so excel_rows() stays right, and blank rows at the
+    end are dropped like pd.read_excel does. The first frame is always
+    yielded, even for a sheet with only a header.
+    """
+    from openpyxl import load_workbook
+
+    wb = load_workbook(file_path, read_only=True, data_only=True)
+    try:
+        ws = wb[sheet_name] if sheet_name else wb.worksheets[0]
+        rows = ws.iter_rows(values_only=True)
+        columns = _column_names(next(rows, ()))
+        total = max((ws.max_row or 1) - 1, 0)  # from the sheet's dimension tag, may be an estimate
+
+        def frame(buffer, start):
+            buffer = [tuple(row[:len(columns)]) + (None,) * (len(columns) - len(row)) for row in buffer]
+            index = pd.RangeIndex(start, start + len(buffer))
+            return pd.DataFrame.from_records(buffer, columns=columns, index=index) if buffer \
+                else pd.DataFrame(columns=columns, index=index)
+
+        buffer, start, pending_blank, yielded = [], 0, 0, False
+        for row in rows:
+            if all(value is None for value in row):
+                pending_blank += 1
+                continue
+            buffer.extend([()] * pending_blank)
+            pending_blank = 0
+            buffer.append(row)
+            if len(buffer) >= chunk_rows:
+                yield frame(buffer, start), total
+                start += len(buffer)
+                buffer, yielded = [], True
+        if buffer or not yielded:
+            yield frame(buffer, start), total
+    finally:
+        wb.close()
+
+
+# ---------- FBA Tariff Validation ----------
+def fba_tariff_problems(sheets, today=None):
+    """Every rule violation in the four FBA tariff sheets ({sheet name: frame}), row numbers included."""
+    today = pd.Timestamp(today or dt.datetime.today())
+    problems = {}
+
+    for sheet in FBA_SHEETS:
+        if sheet not in sheets:
+            add_problem(problems, f"Missing sheet: {sheet}")
+
+    df_fba = sheets.get("FBA Locations")
+    if df_fba is not None and not missing_columns(problems, df_fba, EXPECTED_FBA_LOCATIONS, "FBA Locations"):
+        for col in EXPECTED_FBA_LOCATIONS[:10]:
+            add_rows(problems, blank(df_fba[col]), f"Blank value in column '{col}' of FBA Locations")
+        for col in ["Last 10 weeks", "Last 1 Week", "Last 3 Week"]:
+            add_rows(problems, not_numeric(df_fba[col]), f"Column '{col}' must contain only numeric values in FBA Locations")
 
-    except Exception as e:
-        return f"❌ Error reading file: {str(e)}"
-    
-# ---------- Last Mile Rates Validation ----------
-def validate_last_mile(file_path):
-    EXPECTED_LAST_MILE = [
-        "Date Modified", "FPOD ZIP", "FPOD CITY", "FPOD UNLOC", "FPOD STATE CODE", "FPOD CFS NAME",
-        "Origin Type", "FBA Code", "FBA ZIP", "FBA CITY", "FBA STATE CODE",
-        "Broker", "Delivery Type", "No. of pallets", "Rate", "Carrier Name",
-        "Valid From", "Valid To"
-    ]
+    df_p2p = sheets.get("P2P")
+    if df_p2p is not None and not missing_columns(problems, df_p2p, EXPECTED_P2P, "P2P"):
+        for col in ["POL Name", "POR/POL", "FPOD Name", "FPOD UNLOC", "Per CBM(USD)", "Valid From", "Valid To"]:
+            add_rows(problems, blank(df_p2p[col]), f"Blank value in column '{col}' of P2P")
+
+        add_rows(problems, ~df_p2p["P2P Type"].isin(["Own Console", "Coload"]),
+                 "P2P Type must be either 'Own Console' or 'Coload'")
+
+        own_console = df_p2p["P2P Type"] == "Own Console"
+        for col in OWN_CONSOLE_NUMERIC:
+            add_rows(problems, own_console & df_p2p[col].isna(), f"Missing value in '{col}' for Own Console rows")
+            add_rows(problems, own_console & not_numeric(df_p2p[col]), f"Column '{col}' must be numeric for Own Console rows")
+
+        coload = df_p2p["P2P Type"] == "Coload"
+        per_cbm = df_p2p["Per CBM(USD)"]
+        add_rows(problems, coload & (per_cbm.isna() | not_numeric(per_cbm)), "'Per CBM(USD)' must be numeric for Coload rows")
+
+        valid_from = pd.to_datetime(df_p2p["Valid From"], errors="coerce", format="mixed")
+        valid_to = pd.to_datetime(df_p2p["Valid To"], errors="coerce", format="mixed")
+        bad_date = (df_p2p["Valid From"].notna() & valid_from.isna()) | (df_p2p["Valid To"].notna() & valid_to.isna())
+        add_rows(problems, bad_date, "Invalid date format in Valid From/Valid To in P2P")
+        dated = valid_from.notna() & valid_to.notna()
+        add_rows(problems, dated & ~((valid_from <= today) & (today <= valid_to)), "Rates expired in P2P")
+
+    for sheet, expected in [("Accessorials", EXPECTED_ACCESSORIALS), ("Palletization", EXPECTED_PALLETIZATION)]:
+        df = sheets.get(sheet)
+        if df is None or missing_columns(problems, df, expected, sheet):
+            continue
+        add_rows(problems, ~df["Currency"].eq("USD"), f"All Currency values in {sheet} must be 'USD'")
+        add_rows(problems, not_numeric(df["Amount"]), f"'Amount' in {sheet} must be numeric")
+
+    return problems
 
-    VALID_DELIVERY_TYPES = ["FTL53", "FTL", "LTL", "Drayage"]
 
+def validate_fba_tariff(file_path, progress=None):
     try:
-        df = pd.read_excel(file_path)
+        # One open, each expected sheet parsed once. The tariff workbook stays
+        # small, so it is read whole rather than streamed.
+        if progress:
+            progress(0, 1, "Reading FBA tariff")
+        with pd.ExcelFile(file_path) as xl:
+            present = [sheet for sheet in FBA_SHEETS if sheet in xl.sheet_names]
+            sheets = pd.read_excel(xl, sheet_name=present) if present else {}
+        problems = fba_tariff_problems(sheets)
+        if progress:
+            progress(1, 1, "Checked FBA tariff")
+        return validation_result(problems)
 
+    except Exception as e:
+        return f"❌ Error reading file: {str(e)}"
+    
+# ---------- Last Mile Rates Validation ----------
+EXPECTED_LAST_MILE = [
+    "Date Modified", "FPOD ZIP", "FPOD CITY", "FPOD UNLOC", "FPOD STATE CODE", "FPOD CFS NAME",
+    "Origin Type", "FBA Code", "FBA ZIP", "FBA CITY", "FBA STATE CODE",
+    "Broker", "Delivery Type", "No. of pallets", "Rate", "Carrier Name",
+    "Valid From", "Valid To"
+]
+REQUIRED_LAST_MILE = [
+    "Date Modified", "FPOD ZIP", "FPOD CITY", "FPOD UNLOC", "FPOD STATE CODE",
+    "FPOD CFS NAME", "Origin Type", "FBA Code", "FBA ZIP", "FBA CITY", "FBA STATE CODE",
+    "Broker", "Delivery Type", "Rate", "Valid From", "Valid To"
+]
+VALID_DELIVERY_TYPES = ["FTL53", "FTL", "LTL", "Drayage"]
+NO_PALLET_TYPES = ["FTL53", "FTL", "Drayage"]
+
+
+def last_mile_problems(chunks, progress=None):
+    """
+    Every rule violation in the last mile rates sheet, from (frame, total rows)
+    chunks of consecutive rows such as sheet_chunks() yields. Every rule looks
+    at one row, so a chunk is checked and dropped before the next is read.
+    """
+    problems = {}
+    checked = 0
+    for i, (df, total) in enumerate(chunks):
         # 1) Check all required columns exist
-        for col in EXPECTED_LAST_MILE:
-            if col not in df.columns:
-                return f"❌ Missing column: {col}"
-
-        # 2) Mandatory columns should not be blank
-        required_cols = [
-            "Date Modified", "FPOD ZIP", "FPOD CITY", "FPOD UNLOC", "FPOD STATE CODE",
-            "FPOD CFS NAME", "Origin Type", "FBA Code", "FBA ZIP", "FBA CITY", "FBA STATE CODE",
-            "Broker", "Delivery Type", "Rate", "Valid From", "Valid To"
-        ]
-        for col in required_cols:
-            if df[col].isna().any() or df[col].eq("").any():
-                return f"❌ Blank values found in column '{col}'"
-
-        # 3a) Date columns must be in dd-mm-yyyy format
-        for col in ["Date Modified", "Valid From", "Valid To"]:
-            try:
-                df[col] = pd.to_datetime(df[col], format="%d-%m-%Y", errors="raise")
-            except Exception:
-                return f"❌ Column '{col}' must be in dd-mm-yyyy format (e.g., 01-08-2025)"
-
-        # 3b) Rate must be float
-        if not pd.api.types.is_float_dtype(df["Rate"]):
-            try:
-                df["Rate"] = df["Rate"].astype(float)
-            except Exception:
-                return "❌ 'Rate' column must contain numeric (float) values"
-
-        # 3c) Delivery Type must be valid
-        if not df["Delivery Type"].isin(VALID_DELIVERY_TYPES).all():
-            bad_values = df.loc[~df["Delivery Type"].isin(VALID_DELIVERY_TYPES), "Delivery Type"].unique()
-            return f"❌ Invalid Delivery Type(s): {', '.join(map(str, bad_values))}. Allowed: {', '.join(VALID_DELIVERY_TYPES)}"
-
-        # 4) Delivery Type vs No. of pallets logic
-        for i, row in df.iterrows():
-            if row["Delivery Type"] in ["FTL53", "FTL", "Drayage"]:
-                if pd.notna(row["No. of pallets"]) and str(row["No. of pallets"]).strip() != "":
-                    return f"❌ Row {i+2}: 'No. of pallets' must be blank for Delivery Type {row['Delivery Type']}"
-            elif row["Delivery Type"] == "LTL":
-                try:
-                    if pd.isna(row["No. of pallets"]) or str(row["No. of pallets"]).strip() == "":
-                        return f"❌ Row {i+2}: 'No. of pallets' must not be blank for LTL"
-                    int(row["No. of pallets"])
-                except Exception:
-                    return f"❌ Row {i+2}: 'No. of pallets' must be an integer for LTL"
-
-        return "✅ File validation passed"
+        if i == 0 and missing_columns(problems, df, EXPECTED_LAST_MILE, "the last mile sheet"):
+            return problems
+        check_last_mile_rows(problems, df)
+        checked += len(df)
+        if progress:
+            progress(checked, max(total, checked), f"Checked {checked:,} rows")
+    return problems
+
+
+def check_last_mile_rows(problems, df):
+    # 2) Mandatory columns should not be blank
+    for col in REQUIRED_LAST_MILE:
+        add_rows(problems, blank(df[col]), f"Blank values in column '{col}'")
+
+    # 3a) Date columns must be in dd-mm-yyyy format (cells Excel stores as dates pass)
+    for col in ["Date Modified", "Valid From", "Valid To"]:
+        parsed = pd.to_datetime(df[col], format="%d-%m-%Y", errors="coerce")
+        add_rows(problems, df[col].notna() & parsed.isna(),
+                 f"Column '{col}' must be in dd-mm-yyyy format (e.g., 01-08-2025)")
+
+    # 3b) Rate must be numeric
+    add_rows(problems, not_numeric(df["Rate"]), "'Rate' column must contain numeric (float) values")
+
+    # 3c) Delivery Type must be valid
+    delivery = df["Delivery Type"]
+    invalid_type = delivery.notna() & ~delivery.isin(VALID_DELIVERY_TYPES)
+    for bad_value in delivery[invalid_type].unique():
+        add_rows(problems, delivery == bad_value,
+                 f"Invalid Delivery Type '{bad_value}'. Allowed: {', '.join(VALID_DELIVERY_TYPES)}")
+
+    # 4) Delivery Type vs No. of pallets logic
+    pallets = df["No. of pallets"]
+    no_pallets = blank(pallets)
+    pallet_count = pd.to_numeric(pallets, errors="coerce")
+    for delivery_type in NO_PALLET_TYPES:
+        add_rows(problems, (delivery == delivery_type) & ~no_pallets,
+                 f"'No. of pallets' must be blank for Delivery Type {delivery_type}")
+    ltl = delivery == "LTL"
+    add_rows(problems, ltl & no_pallets, "'No. of pallets' must not be blank for LTL")
+    add_rows(problems, ltl & ~no_pallets & ~(pallet_count % 1 == 0), "'No. of pallets' must be an integer for LTL")
+
+
+def validate_last_mile(file_path, progress=None):
+    try:
+        return validation_result(last_mile_problems(sheet_chunks(file_path), progress))
 
     except Exception as e:
         return f"❌ Error reading file: {str(e)}"
@@ -213,25 +337,32 @@ def upload_row(label, file_path, validate_func=None):
     with col3:
         uploaded_file = st.file_uploader("Choose file", key=uploader_key, label_visibility="collapsed")
         if uploaded_file:
+            # Written once; a valid upload is then moved into place, not written again
             temp_path = f"temp_{Path(file_path).name}"
+            uploaded_file.seek(0)
             with open(temp_path, "wb") as f:
-                f.write(uploaded_file.getbuffer())
+                shutil.copyfileobj(uploaded_file, f)
 
             if validate_func:
-                result = validate_func(temp_path)
+                bar = st.progress(0.0, text="⏳ Validating...")
+
+                def progress(done, total, stage):
+                    bar.progress(min(done / total, 1.0) if total else 0.0, text=f"⏳ {stage}")
+
+                result = validate_func(temp_path, progress)
+                bar.empty()
                 if result.startswith("✅"):
-                    with open(file_path, "wb") as f:
-                        f.write(uploaded_file.getbuffer())
+                    os.replace(temp_path, file_path)
                     st.success("✅ Data Uploaded Successfully!!!")
                     time.sleep(1)
                     st.cache_data.clear()
                     st.session_state[f"reset_{uploader_key}"] = True
                     st.rerun()
                 else:
+                    os.remove(temp_path)
                     st.error(result)
             else:
-                with open(file_path, "wb") as f:
-                    f.write(uploaded_file.getbuffer())
+                os.replace(temp_path, file_path)
                 st.cache_data.clear()
                 st.session_state[f"reset_{uploader_key}"] = True
                 st.rerun()
@@ -242,8 +373,8 @@ def upload_row(label, file_path, validate_func=None):
 def data_management_app():
     selected = option_menu(
         menu_title=None,
-        options=["Uploads", "Search Quotation"],
-        icons=["upload", "search"],
+        options=["Uploads", "Search Quotation", "Log Explorer", "Vendor Performance"],
+        icons=["upload", "search", "table", "speedometer2"],
         orientation="horizontal",
         styles={
             "container": {"padding": "0!important", "background-color": "#d4d5d7"},
@@ -258,4 +389,8 @@ def data_management_app():
         upload_row("FBA Tariff", FBA_FILE_PATH, validate_func=validate_fba_tariff)
         upload_row("Last Mile Rates (No API)", "Data/Last Mile Rates (no api).xlsx", validate_func=validate_last_mile)
     elif selected == "Search Quotation":
-        search_quotations_app()
+        load_module("search_quotes").search_quotations_app()
+    elif selected == "Log Explorer":
+        load_module("log_explorer").log_explorer_app()
+    elif selected == "Vendor Performance":
+        load_module("vendor_dashboard").vendor_dashboard_app()
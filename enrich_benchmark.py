@@ -0,0 +1,125 @@
+"""
+Benchmark of the booking summary enrichment in the logs export.
+
+    python enrich_benchmark.py                       # 2k, 10k and 100k bookings
+    python enrich_benchmark.py --rows 5000 --repeat 3
+
+Builds synthetic bookings_summary / quotations logs shaped like the real ones
+(3 destinations per quote, an Own Console and a Coload quotation row per
+destination, some unmatched bookings and blank ZIPs), runs the old row-by-row
+lookup and search_quotes.enrich_summary() on the same frames, checks that
+both give the same table and prints the timings. The old lookup is quadratic,
+so 100k bookings takes a long time; --old-max skips it above a row count.
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from search_quotes import QUOTE_COLUMNS, enrich_summary
+
+DEFAULT_ROWS = [2000, 10000, 100000]
+
+
+# ----------------- Synthetic Logs -----------------
+def synthetic_logs(bookings, seed=0):
+    """(summary, quotes) with one summary row per booking, like read_log() returns them."""
+    rng = np.random.default_rng(seed)
+    quote = np.arange(bookings) // 3
+    fba_codes = np.array(["LGB8", "ONT8", "RDU4", "TEB9", "FTW1", "MQJ1"])
+    summary = pd.DataFrame({
+        "Quotation Number": [f"CMM{q:06d}" for q in quote],
+        "Unique ID": [f"CMM{q:06d}_20250801{q % 240000:06d}" for q in quote],
+        "FBA / Destn": fba_codes[(quote + np.arange(bookings) % 3) % len(fba_codes)],
+        "FPOD": rng.choice(["Los Angeles", "New York", "Charleston"], bookings),
+        "CBM": rng.uniform(1, 30, bookings).round(3),
+    })
+
+    # Two consoles per destination; the Own Console row comes first and wins
+    quotes = pd.concat([summary.assign(**{"Console Type": console}) for console in ["Own Console", "Coload"]])
+    quotes = quotes.sort_index(kind="stable").reset_index(drop=True)
+    quotes = quotes.rename(columns={"Quotation Number": "Agquote ID", "FBA / Destn": "FBA Code"})
+    n = len(quotes)
+    # ZIPs are stored as numbers, some blank: an object column of ints and None
+    blank = rng.random(n) < 0.05
+    for col in ["POD Zip", "FBA Zip Code"]:
+        quotes[col] = pd.Series(rng.integers(1000, 99999, n), dtype=object).where(~blank, None)
+    quotes["category"] = rng.choice(["HOT", "NON HOT"], n)
+    for col in QUOTE_COLUMNS[1:6]:
+        quotes[col] = rng.uniform(0, 3000, n).round(2)
+    # Rate dicts as the Excel log held them; the old lookup cannot write dicts with .at
+    for col in QUOTE_COLUMNS[6:]:
+        quotes[col] = [str({"Rate": rate, "Service Provider": "HeyPrimo"}) for rate in rng.uniform(100, 2000, n).round(2)]
+
+    # Bookings with no quotation row are left as they are
+    summary.loc[rng.random(bookings) < 0.05, "Unique ID"] += "_unmatched"
+    return summary, quotes
+
+
+# ----------------- Old Lookup -----------------
+def enrich_summary_loop(summary, quotes):
+    """The lookup logs() did before enrich_summary(): one full-frame filter per booking."""
+    summary = summary.copy()
+    for i, row in summary.iterrows():
+        matching_rows = quotes[
+            (quotes['Unique ID'] == row['Unique ID']) &
+            (quotes['Agquote ID'] == row['Quotation Number']) &
+            (quotes['FBA Code'] == row['FBA / Destn'])
+        ]
+
+        if not matching_rows.empty:
+            pod_zip = matching_rows['POD Zip'].values[0]
+            fba_zip = matching_rows['FBA Zip Code'].values[0]
+
+            summary.at[i, 'FBA Zip Code'] = str(fba_zip).zfill(5) if not pd.isna(fba_zip) else ""
+            summary.at[i, 'POD Zip'] = str(pod_zip).zfill(5) if not pd.isna(pod_zip) else ""
+
+            for col in QUOTE_COLUMNS:
+                summary.at[i, col] = matching_rows[col].values[0]
+    return summary
+
+
+def _comparable(df):
+    # Same columns and cells regardless of dtype
+    df = df.astype(object).where(df.notna(), None)
+    return df[sorted(df.columns)].reset_index(drop=True)
+
+
+def check_equal(old, new):
+    old, new = _comparable(old), _comparable(new)
+    pd.testing.assert_frame_equal(old, new, check_dtype=False)
+
+
+# ----------------- Benchmark -----------------
+def timed(func, *args, repeat=1):
+    best, result = None, None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func(*args)
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return result, best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Old vs keyed-merge booking summary enrichment.")
+    parser.add_argument("--rows", type=int, nargs="+", default=DEFAULT_ROWS, help="Bookings per run")
+    parser.add_argument("--repeat", type=int, default=1, help="Runs per size, best time kept (default: 1)")
+    parser.add_argument("--old-max", type=int, default=None, help="Skip the old lookup above this many bookings")
+    args = parser.parse_args()
+
+    for rows in args.rows:
+        summary, quotes = synthetic_logs(rows)
+        new, new_s = timed(enrich_summary, summary, quotes, repeat=args.repeat)
+        if args.old_max is not None and rows > args.old_max:
+            print(f"📦 {rows:>7,} bookings: new {new_s * 1000:8.1f} ms, old skipped")
+            continue
+        old, old_s = timed(enrich_summary_loop, summary, quotes, repeat=args.repeat)
+        check_equal(old, new)
+        print(f"📦 {rows:>7,} bookings: new {new_s * 1000:8.1f} ms, old {old_s:9.2f} s "
+              f"({old_s / new_s:,.0f}x), same output ✅")
+
+
+if __name__ == "__main__":
+    main()
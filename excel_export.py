@@ -0,0 +1,111 @@
+import os
+import tempfile
+from datetime import date, datetime
+
+import pandas as pd
+import xlsxwriter
+
+CHUNK_ROWS = 5000
+
+
+# ----------------- Workbook Helpers -----------------
+def open_workbook(path):
+    """
+    xlsxwriter in constant_memory mode flushes each row to disk once the next
+    row starts, so only one row per sheet is held in RAM. Rows therefore have
+    to be written strictly top to bottom, which is why frames are written
+    here row by row instead of through DataFrame.to_excel (column order).
+    """
+    return xlsxwriter.Workbook(path, {
+        "constant_memory": True,
+        "strings_to_urls": False,
+        "nan_inf_to_errors": True,
+    })
+
+
+def temp_export_path(prefix):
+    fd, path = tempfile.mkstemp(prefix=prefix, suffix=".xlsx")
+    os.close(fd)
+    return path
+
+
+def remove_export(path):
+    try:
+        os.remove(path)
+    except (OSError, TypeError):
+        pass
+
+
+def _cell(value):
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return value
+    if isinstance(value, (pd.Timestamp, datetime)):
+        return value.strftime("%Y-%m-%d %H:%M:%S")
+    if isinstance(value, date):
+        return value.isoformat()
+    return str(value)
+
+
+def write_frame(worksheet, start_row, df, header_format=None, header=True):
+    """Write a header and the rows of df from start_row down, in chunks. Returns the next free row."""
+    row = start_row
+    if header:
+        worksheet.write_row(row, 0, [str(c) for c in df.columns], header_format)
+        row += 1
+
+    for start in range(0, len(df), CHUNK_ROWS):
+        chunk = df.iloc[start:start + CHUNK_ROWS].astype(object)
+        chunk = chunk.where(chunk.notna(), None)
+        for values in chunk.itertuples(index=False, name=None):
+            worksheet.write_row(row, 0, [_cell(v) for v in values])
+            row += 1
+
+    return row
+
+
+# ----------------- Exports -----------------
+def export_pages(path, columns, pages):
+    """
+    Write sheets a page at a time. columns is {sheet name: header}; pages
+    yields {sheet name: DataFrame} and each frame goes below the rows already
+    on its sheet, so no sheet has to be built in memory first.
+    """
+    workbook = open_workbook(path)
+    header = workbook.add_format({"bold": True})
+    try:
+        sheets, next_row = {}, {}
+        for name, header_row in columns.items():
+            sheets[name] = workbook.add_worksheet(name)
+            sheets[name].write_row(0, 0, [str(c) for c in header_row], header)
+            next_row[name] = 1
+
+        for page in pages:
+            for name, df in page.items():
+                rows = df.reindex(columns=columns[name])
+                next_row[name] = write_frame(sheets[name], next_row[name], rows, header=False)
+    finally:
+        workbook.close()
+    return path
+
+
+def export_bookings(path, summary, breakdown):
+    """One sheet per Booking ID: summary table on top, detailed breakdown below."""
+    workbook = open_workbook(path)
+    header = workbook.add_format({"bold": True})
+
+    # Group both tables once instead of filtering per booking
+    breakdown_groups = dict(tuple(breakdown.groupby("Booking ID", sort=False))) if not breakdown.empty else {}
+    try:
+        for booking_id, booking_summary in summary.groupby("Booking ID", sort=False):
+            ws = workbook.add_worksheet(str(booking_id)[:31])
+
+            ws.write(0, 0, "📦 Summary Table")
+            write_frame(ws, 1, booking_summary, header)
+
+            start_row = len(booking_summary) + 4
+            ws.write(start_row - 1, 0, "📊 Detailed Breakdown")
+            booking_breakdown = breakdown_groups.get(booking_id, breakdown.iloc[0:0])
+            write_frame(ws, start_row, booking_breakdown, header)
+    finally:
+        workbook.close()
+    return path
@@ -1,25 +1,19 @@
 import requests
 import pandas as pd
+import time
 from datetime import datetime, date
-import os
 from math import ceil
+from log_store import append_records
+from tariff_cache import read_sheet
 
-LOG_FILE = r"Logs/exfreight_api_log.xlsx"
+LOG_NAME = "exfreight"
 
 def log_to_excel(log_data):
-    # Create log DataFrame
-    log_df = pd.DataFrame([log_data])
-
-    if os.path.exists(LOG_FILE):
-        existing_df = pd.read_excel(LOG_FILE)
-        final_df = pd.concat([existing_df, log_df], ignore_index=True)
-    else:
-        final_df = log_df
-
-    final_df.to_excel(LOG_FILE, index=False)
+    append_records(LOG_NAME, log_data)
 
 
 def api(origin, fba_code, destination, weight, qty,quote_id,unique_id,accessorialslist,fba):
+    started = time.perf_counter()
     timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
     today = datetime.today().date().strftime("%d-%m-%Y")
     log_data = {
@@ -79,6 +73,7 @@ def api(origin, fba_code, destination, weight, qty,quote_id,unique_id,accessoria
             log_data["Message"] = f"{response.status_code} - {response.text}"
             log_data['Source'] = ""
             log_data['Date'] = today
+            log_data['Latency (s)'] = round(time.perf_counter() - started, 3)
             log_to_excel(log_data)
             return {"error": f"API error: {response.status_code}", "message": response.text}
 
@@ -89,6 +84,7 @@ def api(origin, fba_code, destination, weight, qty,quote_id,unique_id,accessoria
             log_data["Message"] = "No routes returned by API"
             log_data['Source'] = ""
             log_data['Date'] = today
+            log_data['Latency (s)'] = round(time.perf_counter() - started, 3)
             log_to_excel(log_data)
             return {"error": "No routes returned by API", "raw_response": data}
 
@@ -118,6 +114,7 @@ def api(origin, fba_code, destination, weight, qty,quote_id,unique_id,accessoria
             log_data["Message"] = "No valid rate rows parsed"
             log_data['Source'] = ""
             log_data['Date'] = today
+            log_data['Latency (s)'] = round(time.perf_counter() - started, 3)
             log_to_excel(log_data)
             return {"error": "No valid rate rows parsed", "raw_response": data}
         
@@ -136,6 +133,7 @@ def api(origin, fba_code, destination, weight, qty,quote_id,unique_id,accessoria
         log_data["Message"] = "Success"
         log_data['Source'] = "API"
         log_data['Date'] = today
+        log_data['Latency (s)'] = round(time.perf_counter() - started, 3)
         log_to_excel(log_data)
 
         return {
@@ -150,13 +148,14 @@ def api(origin, fba_code, destination, weight, qty,quote_id,unique_id,accessoria
         log_data["Message"] = str(e)
         log_data['Source'] = ""
         log_data['Date'] = today
+        log_data['Latency (s)'] = round(time.perf_counter() - started, 3)
         log_to_excel(log_data)
         return {"error": "Exception occurred", "message": str(e)}
     
 def exfreight_api(origin, fba_code, destination, weight, qty, quote_id,unique_id,
                   accessorialslist=[{"category": "amazon_fba_delivery", "scope": "at_delivery"}, 
                                     {"category": "ocean_cfs_pickup", "scope": "at_pickup"}],fba = True):
-    df = pd.read_excel(r"Data/API Data/exfreight_output.xlsx")
+    df = read_sheet(r"Data/API Data/exfreight_output.xlsx")
     origin = str(origin).zfill(5)
     destination = str(destination).zfill(5)
     df['FPOD ZIP'] = df['FPOD ZIP'].astype(str).str.zfill(5)
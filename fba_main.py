@@ -1,8 +1,6 @@
 import streamlit as st
 from streamlit_option_menu import option_menu
-from calculator import fba_quote_app
-from data_management import data_management_app
-from US_lm_calculator import trans_cal
+from startup_profile import load_module
 # ----------------- Page Setup -----------------
 st.set_page_config(page_title="FBA Rates Calculator", layout="wide")
 
@@ -48,9 +46,9 @@ st.session_state.previous_tab = selected
 
 if selected == "FBA Quote":
     st.title("📦 FBA Quote Calculator")
-    fba_quote_app()
+    load_module("calculator").fba_quote_app()
 elif selected == "US Transport Rate Calculator":
-    trans_cal()
+    load_module("US_lm_calculator").trans_cal()
 
 elif selected == "Data Management":
     if not st.session_state.authenticated:
@@ -73,5 +71,5 @@ elif selected == "Data Management":
         if st.button("🚪 Logout"):
             st.session_state.authenticated = False
             st.rerun()
-        data_management_app()
+        load_module("data_management").data_management_app()
 
@@ -1,13 +1,15 @@
 import requests
 import json
 import pandas as pd
+import time
 from datetime import datetime
-import os
+from log_store import append_records
+from tariff_cache import read_sheet
 
-LOG_FILE = r"Logs/heyprimo_api_tracking.xlsx"
+LOG_NAME = "heyprimo"
 
 # ----------------- Logging Function -----------------
-def log_heyprimo_result(ori_city, ori_state, ori_zip, dest_city, dest_state, dest_zip, qty, status, message,quote_id,source,date,unique_id,fba_code,quote_type):
+def log_heyprimo_result(ori_city, ori_state, ori_zip, dest_city, dest_state, dest_zip, qty, status, message,quote_id,source,date,unique_id,fba_code,quote_type,latency=None):
     timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
     log_entry = {
         "Quote Type": quote_type,
@@ -25,16 +27,11 @@ def log_heyprimo_result(ori_city, ori_state, ori_zip, dest_city, dest_state, des
         "Status": status,
         "Message": message,
         "Source":source,
-        "Date":date
+        "Date":date,
+        "Latency (s)": latency
     }
 
-    if os.path.exists(LOG_FILE):
-        df = pd.read_excel(LOG_FILE)
-    else:
-        df = pd.DataFrame(columns=list(log_entry.keys()))
-
-    df = pd.concat([df, pd.DataFrame([log_entry])], ignore_index=True)
-    df.to_excel(LOG_FILE, index=False)
+    append_records(LOG_NAME, log_entry)
 
 # ----------------- Get API Token -----------------
 def get_access_token(username: str, password: str) -> str:
@@ -65,6 +62,7 @@ def fetch_shipping_rates(token: str, query_params: dict) -> dict:
 
 # ----------------- Process Single Row -----------------
 def api(row: dict, accessorials,fba):
+    started = time.perf_counter()
     try:
         ori_city = row['Origin City'].strip().upper()
         ori_state = row['Origin State Code'].strip().upper()
@@ -110,12 +108,12 @@ def api(row: dict, accessorials,fba):
         api_response = fetch_shipping_rates(token, query_params)
 
         if not api_response or "data" not in api_response or "results" not in api_response["data"]:
-            log_heyprimo_result(ori_city, ori_state, ori_zip, dest_city, dest_state, dest_zip, qty, "Failed", "No response or missing data/results",quote_id,"",today,unique_id,fba_code,"LTL")
+            log_heyprimo_result(ori_city, ori_state, ori_zip, dest_city, dest_state, dest_zip, qty, "Failed", "No response or missing data/results",quote_id,"",today,unique_id,fba_code,"LTL",latency=round(time.perf_counter() - started, 3))
             return None
 
         rates = api_response["data"]["results"]["rates"]
         if not rates:
-            log_heyprimo_result(ori_city, ori_state, ori_zip, dest_city, dest_state, dest_zip, qty, "Failed", "Empty rates list",quote_id,"",today,unique_id,fba_code,"LTL")
+            log_heyprimo_result(ori_city, ori_state, ori_zip, dest_city, dest_state, dest_zip, qty, "Failed", "Empty rates list",quote_id,"",today,unique_id,fba_code,"LTL",latency=round(time.perf_counter() - started, 3))
             return None
 
         data_list = []
@@ -141,7 +139,7 @@ def api(row: dict, accessorials,fba):
             filtered_df = df
 
         if filtered_df.empty:
-            log_heyprimo_result(ori_city, ori_state, ori_zip, dest_city, dest_state, dest_zip, qty, "Failed", "No rates matched preferred SCAC list",quote_id,"",today,unique_id,fba_code,"LTL")
+            log_heyprimo_result(ori_city, ori_state, ori_zip, dest_city, dest_state, dest_zip, qty, "Failed", "No rates matched preferred SCAC list",quote_id,"",today,unique_id,fba_code,"LTL",latency=round(time.perf_counter() - started, 3))
             return None
 
         best_rate = filtered_df.nsmallest(1, 'Total Cost').iloc[0]
@@ -152,17 +150,17 @@ def api(row: dict, accessorials,fba):
             "Date":today
         }
 
-        log_heyprimo_result(ori_city, ori_state, ori_zip, dest_city, dest_state, dest_zip, qty, "Success", f"Rate: {result['Lowest Rate']}, Carrier: {result['Carrier Name']}",quote_id,"API",today,unique_id,fba_code,"LTL")
+        log_heyprimo_result(ori_city, ori_state, ori_zip, dest_city, dest_state, dest_zip, qty, "Success", f"Rate: {result['Lowest Rate']}, Carrier: {result['Carrier Name']}",quote_id,"API",today,unique_id,fba_code,"LTL",latency=round(time.perf_counter() - started, 3))
         return result
 
     except Exception as e:
         log_heyprimo_result(row.get('Origin City', ''), row.get('Origin State Code', ''), row.get("Origin ZIP", ""), 
                             row.get('Destn City',''), row.get('Destn State Code', ''), row.get("FBA or Destination ZIP", ""), 
-                            row.get("Num Of Pallet", ""), "Failed", f"Exception: {str(e)}",quote_id,"",today,unique_id,fba_code,"LTL")
+                            row.get("Num Of Pallet", ""), "Failed", f"Exception: {str(e)}",quote_id,"",today,unique_id,fba_code,"LTL",latency=round(time.perf_counter() - started, 3))
         return None
 
 def heyprimo_api(row: dict, accessorials = ["APD", "CTO"],fba = True):
-    df = pd.read_excel(r"Data/API Data/Heyprimo_output.xlsx")
+    df = read_sheet(r"Data/API Data/Heyprimo_output.xlsx")
     fpod_city = row["Origin City"]
     fpod_st_code = row["Origin State Code"]
     fpod_zip = row["Origin ZIP"]
@@ -1,11 +1,13 @@
 import requests
 import pandas as pd
+import time
 from datetime import datetime, timedelta
-import os
+from log_store import append_records
+from tariff_cache import read_sheet
 
-LOG_FILE = r"Logs/jbhunt_api_tracking.xlsx"
+LOG_NAME = "jbhunt"
 
-def log_jbhunt_quote(origin_zip, fba_code, destination_zip, weight_lbs, status, message, quote_id, source, date,unique_id,rate_type):
+def log_jbhunt_quote(origin_zip, fba_code, destination_zip, weight_lbs, status, message, quote_id, source, date,unique_id,rate_type,latency=None):
     timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
     log_entry = {
         "Quotation Number": quote_id,
@@ -19,19 +21,15 @@ def log_jbhunt_quote(origin_zip, fba_code, destination_zip, weight_lbs, status,
         "Status": status,  # "Success" or "Failed"
         "Message": message,
         "Source": source,
-        'Date':date
+        'Date':date,
+        "Latency (s)": latency
     }
 
-    if os.path.exists(LOG_FILE):
-        df = pd.read_excel(LOG_FILE)
-    else:
-        df = pd.DataFrame(columns=list(log_entry.keys()))
-
-    df = pd.concat([df, pd.DataFrame([log_entry])], ignore_index=True)
-    df.to_excel(LOG_FILE, index=False)
+    append_records(LOG_NAME, log_entry)
 
 
 def get_jbhunt_quote_df(origin_zip, fba_code, destination_zip, weight_lbs,quote_id,today,unique_id,rate_type):
+    started = time.perf_counter()
     try:
         # === Step 1: Get Access Token ===
         auth_url = "https://sso.jbhunt.com/auth/realms/security360/protocol/openid-connect/token"
@@ -88,17 +86,22 @@ def get_jbhunt_quote_df(origin_zip, fba_code, destination_zip, weight_lbs,quote_
         return df
 
     except Exception as e:
-        log_jbhunt_quote(origin_zip, fba_code, destination_zip, weight_lbs, "Failed", str(e), quote_id, "",today,unique_id,rate_type)
+        log_jbhunt_quote(origin_zip, fba_code, destination_zip, weight_lbs, "Failed", str(e), quote_id, "",today,unique_id,rate_type,
+                         latency=round(time.perf_counter() - started, 3))
         return None
 
 
 
 def api(origin_zip, fba_code, destination_zip, weight_lbs, quote_id,unique_id,rate_type):
     today = datetime.today().date().strftime("%d-%m-%Y")
+    started = time.perf_counter()
     df = get_jbhunt_quote_df(origin_zip, fba_code, destination_zip, weight_lbs, quote_id,today,unique_id,rate_type)
+    latency = round(time.perf_counter() - started, 3)
 
     if df is None or df.empty or "rates" not in df.columns:
-        log_jbhunt_quote(origin_zip, fba_code, destination_zip, weight_lbs, "Failed", "No valid rates returned", quote_id, "",today,unique_id,rate_type)
+        # A failed request (df is None) was already logged with its error
+        if df is not None:
+            log_jbhunt_quote(origin_zip, fba_code, destination_zip, weight_lbs, "Failed", "No valid rates returned", quote_id, "",today,unique_id,rate_type,latency=latency)
         return {
             "Rate Type": rate_type,
             "Rate": 0,
@@ -111,7 +114,7 @@ def api(origin_zip, fba_code, destination_zip, weight_lbs, quote_id,unique_id,ra
     rates_list = df["rates"].iloc[0] if not df["rates"].isna().iloc[0] else []
 
     if not rates_list:
-        log_jbhunt_quote(origin_zip, fba_code, destination_zip, weight_lbs, "Failed", "Empty rates list", quote_id, "",today,unique_id,rate_type)
+        log_jbhunt_quote(origin_zip, fba_code, destination_zip, weight_lbs, "Failed", "Empty rates list", quote_id, "",today,unique_id,rate_type,latency=latency)
         return {
             "Rate Type": rate_type,
             "Rate": 0,
@@ -125,7 +128,7 @@ def api(origin_zip, fba_code, destination_zip, weight_lbs, quote_id,unique_id,ra
     rate = lowest_quote.get("totalCharge", {}).get("value")
     carrier = lowest_quote.get("scacCode", "Unknown")
 
-    log_jbhunt_quote(origin_zip, fba_code, destination_zip, weight_lbs, "Success", f"Rate: {float(rate) * 1.5}, Carrier: {carrier}", quote_id, "API",today,unique_id,rate_type)
+    log_jbhunt_quote(origin_zip, fba_code, destination_zip, weight_lbs, "Success", f"Rate: {float(rate) * 1.5}, Carrier: {carrier}", quote_id, "API",today,unique_id,rate_type,latency=latency)
 
     return {
         "Rate Type": rate_type,
@@ -137,7 +140,7 @@ def api(origin_zip, fba_code, destination_zip, weight_lbs, quote_id,unique_id,ra
     }
 
 def jbhunt_api(origin_zip, fba_code, destination_zip, weight, quote_id,unique_id,rate_type):
-    df = pd.read_excel(r"Data/API Data/jbhunt_output.xlsx")
+    df = read_sheet(r"Data/API Data/jbhunt_output.xlsx")
 
     origin_zip = str(origin_zip).zfill(5)
     destination_zip = str(destination_zip).zfill(5)
@@ -0,0 +1,29 @@
+import math
+from datetime import date, datetime
+
+import numpy as np
+import pandas as pd
+
+
+def jsonable(value):
+    """Pricing results carry numpy scalars, NaN and Timestamps; make them JSON safe."""
+    if isinstance(value, dict):
+        return {str(k): jsonable(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [jsonable(v) for v in value]
+    if isinstance(value, np.generic):
+        value = value.item()
+    if isinstance(value, float) and not math.isfinite(value):
+        return None
+    if value is pd.NaT:
+        return None
+    if isinstance(value, (pd.Timestamp, datetime)):
+        return value.strftime("%Y-%m-%d %H:%M:%S")
+    if isinstance(value, date):
+        return value.isoformat()
+    return value
+
+
+def frame_records(df):
+    """A DataFrame as a list of JSON safe row dicts, blanks as None."""
+    return jsonable(df.astype(object).where(df.notna(), None).to_dict("records"))
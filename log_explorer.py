@@ -0,0 +1,86 @@
+import streamlit as st
+import datetime as dt
+from log_store import QUERY_FIELDS, query_log
+
+LOG_LABELS = {
+    "quotations": "Quotations",
+    "bookings_summary": "Bookings (Summary)",
+    "bookings_breakdown": "Bookings (Breakdown)",
+    "heyprimo": "HeyPrimo API",
+    "exfreight": "Ex-Freight API",
+    "jbhunt": "J.B. Hunt API",
+    "success_rates": "Rate Requests",
+    "mongo_datafetch": "Quote Fetches",
+    "transport_rates": "US Transport Rates",
+}
+
+PAGE_SIZES = [50, 100, 250, 500]
+
+
+def _split(text):
+    return [v.strip() for v in text.split(",") if v.strip()]
+
+
+def log_explorer_app():
+    log = st.selectbox("Log", list(LOG_LABELS), format_func=LOG_LABELS.get)
+
+    c1, c2, c3 = st.columns(3)
+    with c1:
+        start = st.date_input("From", value=dt.date.today() - dt.timedelta(days=30))
+    with c2:
+        end = st.date_input("To", value=dt.date.today())
+    with c3:
+        page_size = st.selectbox("Rows per page", PAGE_SIZES, index=1)
+
+    c4, c5 = st.columns(2)
+    with c4:
+        quote_id = st.text_input("Quotation Number").strip()
+    with c5:
+        unique_id = st.text_input("Unique ID").strip()
+
+    # Filters this log supports (FBA Code, FPOD ZIP / Name, Vendor, Status), comma separated
+    filters = {}
+    fields = list(QUERY_FIELDS.get(log, {}))
+    if fields:
+        fcols = st.columns(len(fields))
+        for col, field in zip(fcols, fields):
+            with col:
+                filters[field] = _split(st.text_input(field, key=f"filter_{log}_{field}"))
+
+    columns = _split(st.text_input("Columns (comma separated, blank for all)", key=f"columns_{log}"))
+
+    query = {
+        "start": start,
+        "end": end,
+        "quote_id": quote_id or None,
+        "unique_id": unique_id or None,
+        "filters": filters,
+        "columns": columns or None,
+        "limit": page_size,
+    }
+
+    # Cursor stack per query so Previous / Next page through the same result
+    query_key = repr((log, sorted((k, repr(v)) for k, v in query.items())))
+    if st.session_state.get("log_query_key") != query_key:
+        st.session_state.log_query_key = query_key
+        st.session_state.log_cursors = [None]
+
+    cursors = st.session_state.log_cursors
+    try:
+        page, next_cursor = query_log(log, after=cursors[-1], **query)
+    except Exception as e:
+        st.error(f"❌ Query failed: {e}")
+        return
+
+    st.caption(f"Page {len(cursors)} · {len(page)} rows")
+    st.dataframe(page, use_container_width=True, hide_index=True)
+
+    p1, p2 = st.columns(2)
+    with p1:
+        if st.button("⬅️ Previous", disabled=len(cursors) == 1):
+            cursors.pop()
+            st.rerun()
+    with p2:
+        if st.button("Next ➡️", disabled=next_cursor is None):
+            cursors.append(next_cursor)
+            st.rerun()
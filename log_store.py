@@ -0,0 +1,640 @@
+import ast
+import json
+import os
+import re
+import sqlite3
+import threading
+from datetime import date, datetime
+
+import numpy as np
+import pandas as pd
+
+DB_PATH = r"Logs/logs.db"
+
+# Log name -> (legacy Excel file, sheet, quotation number column, timestamp column)
+LOGS = {
+    "mongo_datafetch": (r"Logs/mongo_datafetch.xlsx", 0, "Quote ID", "Timestamp"),
+    "success_rates": (r"Logs/success_rates.xlsx", 0, "Quote ID", "Timestamp"),
+    "quotations": (r"Logs/quotations.xlsx", 0, "Agquote ID", "Quoted Date/Time"),
+    "bookings_summary": (r"Logs/bookings_log.xlsx", "Summary", "Quotation Number", "Log Timestamp"),
+    "bookings_breakdown": (r"Logs/bookings_log.xlsx", "Breakdown", "Quotation Number", "Log Timestamp"),
+    "transport_rates": (r"Logs/transport_rates_log.xlsx", 0, None, "Timestamp"),
+    "heyprimo": (r"Logs/heyprimo_api_tracking.xlsx", 0, "Quotation Number", "Timestamp"),
+    "exfreight": (r"Logs/exfreight_api_log.xlsx", 0, "Quotation Number", "Timestamp"),
+    "jbhunt": (r"Logs/jbhunt_api_tracking.xlsx", 0, "Quotation Number", "Timestamp"),
+}
+
+# Common query filters -> payload field (or nested path) in each log. A field
+# means the same kind of value in every log that has it: "FPOD ZIP" is the
+# FPOD CFS ZIP (the origin of the last mile legs the vendors price), "FPOD
+# Name" the FPOD city name.
+QUERY_FIELDS = {
+    "quotations": {"FBA Code": "FBA Code", "FPOD ZIP": "POD Zip", "FPOD Name": "POD",
+                   "Vendor": ("Selected lm", "Service Provider")},
+    "bookings_summary": {"FBA Code": "FBA / Destn", "FPOD Name": "FPOD", "Vendor": "LM Broker"},
+    "bookings_breakdown": {},
+    "heyprimo": {"FBA Code": "FBA Code", "FPOD ZIP": "Origin ZIP", "Status": "Status"},
+    "exfreight": {"FBA Code": "FBA Code", "FPOD ZIP": "Origin", "Status": "Status"},
+    "jbhunt": {"FBA Code": "FBA Code", "FPOD ZIP": "Origin ZIP", "Status": "Status"},
+    "success_rates": {"Status": "Status"},
+    "mongo_datafetch": {"Status": "Status"},
+    "transport_rates": {},
+}
+
+# Columns holding rate dicts / lists. They are stored as JSON objects, older
+# Excel rows kept them as Python reprs and are parsed once on import.
+STRUCTURED_COLUMNS = {
+    "quotations": ["LTL", "FTL", "FTL53", "Drayage", "lowest lm", "Selected lm", "Service Modes"],
+    "transport_rates": ["CargoDetails", "Toggles", "LTL", "FTL", "FTL53", "Drayage"],
+}
+
+# Vendor tracking logs -> (vendor, origin ZIP column, destination ZIP column)
+VENDOR_LOGS = {
+    "heyprimo": ("HeyPrimo", "Origin ZIP", "Destination ZIP"),
+    "exfreight": ("Ex-Freight", "Origin", "Destination"),
+    "jbhunt": ("J.B. Hunt", "Origin ZIP", "Destination ZIP"),
+}
+
+SCHEMA_VERSION = 3
+
+TS_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS log_records (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    log TEXT NOT NULL,
+    logged_at TEXT NOT NULL,
+    quote_id TEXT,
+    unique_id TEXT,
+    payload TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_log_records_log ON log_records(log, id);
+CREATE INDEX IF NOT EXISTS idx_log_records_quote ON log_records(log, quote_id);
+CREATE INDEX IF NOT EXISTS idx_log_records_time ON log_records(log, logged_at);
+CREATE INDEX IF NOT EXISTS idx_log_records_unique ON log_records(log, unique_id);
+CREATE TABLE IF NOT EXISTS vendor_rollups (
+    vendor TEXT NOT NULL,
+    lane TEXT NOT NULL,
+    day TEXT NOT NULL,
+    requests INTEGER NOT NULL,
+    successes INTEGER NOT NULL,
+    failures INTEGER NOT NULL,
+    static_hits INTEGER NOT NULL,
+    live_calls INTEGER NOT NULL,
+    latency_total REAL NOT NULL,
+    latency_count INTEGER NOT NULL,
+    latency_max REAL NOT NULL,
+    PRIMARY KEY (vendor, lane, day)
+);
+CREATE INDEX IF NOT EXISTS idx_vendor_rollups_day ON vendor_rollups(day, vendor);
+CREATE TABLE IF NOT EXISTS legacy_imports (
+    log TEXT PRIMARY KEY,
+    imported_at TEXT NOT NULL,
+    row_count INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS quote_results (
+    key TEXT PRIMARY KEY,
+    quote_id TEXT,
+    created_at TEXT NOT NULL,
+    expires_at TEXT NOT NULL,
+    payload TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_quote_results_expiry ON quote_results(expires_at);
+"""
+
+_local = threading.local()
+_imported = set()
+
+
+# ----------------- Connection -----------------
+def _connect():
+    """
+    One SQLite connection per thread and process. WAL mode lets any number of
+    readers run alongside a single writer, and busy_timeout makes concurrent
+    writers (other Streamlit sessions or app processes) queue instead of fail.
+    """
+    conn = getattr(_local, "conn", None)
+    if conn is not None and getattr(_local, "pid", None) == os.getpid():
+        return conn
+
+    os.makedirs(os.path.dirname(DB_PATH), exist_ok=True)
+    conn = sqlite3.connect(DB_PATH, timeout=30, isolation_level=None, check_same_thread=False)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("PRAGMA busy_timeout=30000")
+    conn.executescript(SCHEMA)
+    _migrate(conn)
+
+    _local.conn = conn
+    _local.pid = os.getpid()
+    return conn
+
+
+def _to_cell(value):
+    # JSON-safe value: containers stay structured, numpy / pandas scalars become plain Python
+    if value is None:
+        return None
+    if isinstance(value, dict):
+        return {str(k): _to_cell(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple, set)):
+        return [_to_cell(v) for v in value]
+    if isinstance(value, np.generic):
+        value = value.item()
+    if isinstance(value, float) and np.isnan(value):
+        return None
+    if isinstance(value, (pd.Timestamp, datetime)):
+        return value.strftime("%Y-%m-%d %H:%M:%S")
+    if isinstance(value, date):
+        return value.isoformat()
+    if isinstance(value, (str, int, float, bool)):
+        return value
+    try:
+        if pd.isna(value):
+            return None
+    except (TypeError, ValueError):
+        pass
+    return str(value)
+
+
+def parse_structured(value):
+    """Turn a logged repr such as "{'Rate': 1.5, 'Date': Timestamp('2025-08-01')}" back into a dict / list."""
+    if not isinstance(value, str):
+        return value
+    text = value.strip()
+    if text in ["", "{}", "[]", "nan", "NaN", "None"]:
+        return {} if text != "[]" else []
+    text = re.sub(r"Timestamp\('([^']*)'\)", r"'\1'", text)
+    text = re.sub(r"\bnan\b", "None", text)
+    try:
+        return _to_cell(ast.literal_eval(text))
+    except (ValueError, SyntaxError):
+        pass
+    try:
+        return _to_cell(json.loads(text))
+    except ValueError:
+        return value
+
+
+def _structure(log, record):
+    for col in STRUCTURED_COLUMNS.get(log, []):
+        if col in record:
+            record[col] = parse_structured(record[col])
+    return record
+
+
+def _record_time(log, record, default):
+    # The record's own timestamp, so legacy rows keep their original time
+    value = record.get(LOGS[log][3])
+    if not value:
+        return default
+    try:
+        return pd.Timestamp(value).strftime(TS_FORMAT)
+    except (ValueError, TypeError):
+        return default
+
+
+def _record_row(log, record, logged_at):
+    quote_col = LOGS[log][2]
+    clean = _structure(log, {str(k): _to_cell(v) for k, v in record.items()})
+    logged_at = _record_time(log, clean, logged_at)
+    quote_id = clean.get(quote_col) if quote_col else None
+    if isinstance(quote_id, float) and quote_id.is_integer():
+        quote_id = int(quote_id)
+    unique_id = clean.get("Unique ID")
+    return (
+        log,
+        logged_at,
+        None if quote_id is None else str(quote_id),
+        None if unique_id is None else str(unique_id),
+        json.dumps(clean, ensure_ascii=False),
+    )
+
+
+# ----------------- Vendor Rollups -----------------
+def _zip(value):
+    text = "" if value is None else str(value).strip()
+    if text.endswith(".0"):
+        text = text[:-2]
+    return text.zfill(5) if text else "?"
+
+
+def _update_rollups(conn, log, rows):
+    """
+    Fold freshly written vendor log rows into the per vendor / lane / day
+    counters, inside the caller's transaction. Dashboards then read a few
+    rollup rows instead of scanning the vendor logs.
+    """
+    if log not in VENDOR_LOGS:
+        return
+    vendor, origin_col, dest_col = VENDOR_LOGS[log]
+
+    totals = {}
+    for _, logged_at, _, _, payload in rows:
+        record = json.loads(payload)
+        key = (vendor, f"{_zip(record.get(origin_col))} → {_zip(record.get(dest_col))}", logged_at[:10])
+        t = totals.setdefault(key, [0, 0, 0, 0, 0, 0.0, 0, 0.0])
+
+        success = record.get("Status") == "Success"
+        static = "STATIC" in str(record.get("Source") or "").upper()
+        latency = record.get("Latency (s)")
+
+        t[0] += 1
+        t[1] += success
+        t[2] += not success
+        t[3] += static
+        t[4] += not static
+        if isinstance(latency, (int, float)):
+            t[5] += latency
+            t[6] += 1
+            t[7] = max(t[7], latency)
+
+    conn.executemany(
+        """
+        INSERT INTO vendor_rollups (vendor, lane, day, requests, successes, failures, static_hits,
+                                    live_calls, latency_total, latency_count, latency_max)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ON CONFLICT(vendor, lane, day) DO UPDATE SET
+            requests = requests + excluded.requests,
+            successes = successes + excluded.successes,
+            failures = failures + excluded.failures,
+            static_hits = static_hits + excluded.static_hits,
+            live_calls = live_calls + excluded.live_calls,
+            latency_total = latency_total + excluded.latency_total,
+            latency_count = latency_count + excluded.latency_count,
+            latency_max = MAX(latency_max, excluded.latency_max)
+        """,
+        [key + tuple(t) for key, t in totals.items()]
+    )
+
+
+# ----------------- Migrations -----------------
+def _migrate(conn):
+    version = conn.execute("PRAGMA user_version").fetchone()[0]
+    if version >= SCHEMA_VERSION:
+        return
+
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        version = conn.execute("PRAGMA user_version").fetchone()[0]
+        if version < 1:
+            # Rows imported before rate columns were structured
+            for log in STRUCTURED_COLUMNS:
+                cur = conn.execute("SELECT id, payload FROM log_records WHERE log = ?", (log,))
+                updates = [
+                    (json.dumps(_structure(log, json.loads(payload)), ensure_ascii=False), row_id)
+                    for row_id, payload in cur.fetchall()
+                ]
+                conn.executemany("UPDATE log_records SET payload = ? WHERE id = ?", updates)
+        if version < 2:
+            # logged_at becomes the record's own timestamp (used by date range queries)
+            cur = conn.execute("SELECT id, log, logged_at, payload FROM log_records")
+            updates = [
+                (_record_time(log, json.loads(payload), logged_at), row_id)
+                for row_id, log, logged_at, payload in cur.fetchall() if log in LOGS
+            ]
+            conn.executemany("UPDATE log_records SET logged_at = ? WHERE id = ?", updates)
+        if version < 3:
+            # Build vendor rollups from everything logged so far
+            conn.execute("DELETE FROM vendor_rollups")
+            for log in VENDOR_LOGS:
+                cur = conn.execute(
+                    "SELECT log, logged_at, quote_id, unique_id, payload FROM log_records WHERE log = ?", (log,)
+                )
+                _update_rollups(conn, log, cur.fetchall())
+        conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+        conn.execute("COMMIT")
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+
+
+# ----------------- Legacy Excel Import -----------------
+class LegacyImportError(RuntimeError):
+    """An old Excel log exists but could not be read; the import is retried on the next use."""
+
+
+def _ensure_imported(conn, log):
+    """
+    Copy the rows of the old Excel log into the store the first time a log is
+    used. A file that cannot be read rolls the import back and raises
+    LegacyImportError. Nothing is marked as imported, so the next call tries again.
+    """
+    if log in _imported:
+        return
+
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        done = conn.execute("SELECT 1 FROM legacy_imports WHERE log = ?", (log,)).fetchone()
+        if not done:
+            file_path, sheet, _, _ = LOGS[log]
+            rows = []
+            if os.path.exists(file_path):
+                try:
+                    legacy = pd.read_excel(file_path, sheet_name=sheet)
+                except Exception as e:
+                    raise LegacyImportError(f"Could not import legacy log {file_path} ({sheet}): {e}") from e
+                rows = legacy.to_dict("records")
+
+            logged_at = datetime.now().strftime(TS_FORMAT)
+            rows = [_record_row(log, r, logged_at) for r in rows]
+            conn.executemany(
+                "INSERT INTO log_records (log, logged_at, quote_id, unique_id, payload) VALUES (?, ?, ?, ?, ?)",
+                rows
+            )
+            _update_rollups(conn, log, rows)
+            conn.execute(
+                "INSERT INTO legacy_imports (log, imported_at, row_count) VALUES (?, ?, ?)",
+                (log, logged_at, len(rows))
+            )
+        conn.execute("COMMIT")
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+
+    _imported.add(log)
+
+
+# ----------------- Public API -----------------
+def append_records(log, records):
+    """Append one or more dict records to a log in a single transaction."""
+    if log not in LOGS:
+        raise KeyError(f"Unknown log: {log}")
+    if isinstance(records, dict):
+        records = [records]
+    if not records:
+        return
+
+    conn = _connect()
+    try:
+        _ensure_imported(conn, log)
+    except LegacyImportError:
+        # New rows are never held back by an unreadable old file; the import
+        # is retried, and its error raised, on the next read of the log
+        pass
+
+    logged_at = datetime.now().strftime(TS_FORMAT)
+    rows = [_record_row(log, r, logged_at) for r in records]
+
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        conn.executemany(
+            "INSERT INTO log_records (log, logged_at, quote_id, unique_id, payload) VALUES (?, ?, ?, ?, ?)",
+            rows
+        )
+        _update_rollups(conn, log, rows)
+        conn.execute("COMMIT")
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+
+
+def append_frame(log, df):
+    append_records(log, df.to_dict("records"))
+
+
+def read_log(log, quote_id=None):
+    """Return a log as a DataFrame, optionally only the rows of one quotation number."""
+    if log not in LOGS:
+        raise KeyError(f"Unknown log: {log}")
+
+    conn = _connect()
+    _ensure_imported(conn, log)
+
+    if quote_id is None:
+        cur = conn.execute("SELECT payload FROM log_records WHERE log = ? ORDER BY id", (log,))
+    else:
+        cur = conn.execute(
+            "SELECT payload FROM log_records WHERE log = ? AND quote_id = ? ORDER BY id",
+            (log, str(quote_id))
+        )
+
+    return pd.DataFrame([json.loads(p) for (p,) in cur])
+
+
+def log_version(*logs):
+    """Cheap change marker for one or more logs: the newest record id of each."""
+    conn = _connect()
+    version = []
+    for log in logs:
+        if log not in LOGS:
+            raise KeyError(f"Unknown log: {log}")
+        _ensure_imported(conn, log)
+        (max_id,) = conn.execute("SELECT MAX(id) FROM log_records WHERE log = ?", (log,)).fetchone()
+        version.append((log, max_id or 0))
+    return tuple(version)
+
+
+def log_size(log):
+    """Number of records in a log."""
+    if log not in LOGS:
+        raise KeyError(f"Unknown log: {log}")
+
+    conn = _connect()
+    _ensure_imported(conn, log)
+    (count,) = conn.execute("SELECT COUNT(*) FROM log_records WHERE log = ?", (log,)).fetchone()
+    return count
+
+
+def log_columns(log):
+    """Payload columns of a log in the order read_log() gives them, without loading the rows."""
+    if log not in LOGS:
+        raise KeyError(f"Unknown log: {log}")
+
+    conn = _connect()
+    _ensure_imported(conn, log)
+    # First record holding each key, then the key's position in that record
+    # (SQLite takes the bare j.id from the row MIN() picked)
+    rows = conn.execute(
+        "SELECT j.key, MIN(r.id), j.id FROM log_records r, json_each(r.payload) j "
+        "WHERE r.log = ? GROUP BY j.key ORDER BY 2, 3",
+        (log,)
+    )
+    return [key for key, _, _ in rows]
+
+
+# ----------------- Query API -----------------
+def _json_path(field):
+    parts = field if isinstance(field, tuple) else (field,)
+    return "$" + "".join('."{}"'.format(str(p).replace('"', '\\"')) for p in parts)
+
+
+def _filter_values(values):
+    """
+    (texts, numbers) a filter matches. Filters typed in the explorer are
+    strings while ZIPs and other numbers are stored as JSON numbers, so a
+    numeric-looking value also matches as a number, and "07201" as "7201".
+    """
+    texts, numbers = [], []
+    for value in values:
+        text = str(value).strip()
+        texts.append(text)
+        try:
+            number = float(text)
+        except ValueError:
+            continue
+        numbers.append(number)
+        if number.is_integer():
+            texts.append(str(int(number)))
+    return list(dict.fromkeys(texts)), list(dict.fromkeys(numbers))
+
+
+def _as_time(value, end=False):
+    ts = pd.Timestamp(value)
+    if end and isinstance(value, date) and not isinstance(value, datetime):
+        # A plain date as the end of a range includes that whole day
+        ts = ts + pd.Timedelta(days=1) - pd.Timedelta(seconds=1)
+    return ts.strftime(TS_FORMAT)
+
+
+def query_log(log, start=None, end=None, quote_id=None, unique_id=None,
+              filters=None, columns=None, limit=500, after=None):
+    """
+    Filter a log in SQLite and return one page as (DataFrame, next cursor).
+
+    start / end       : date range on the record timestamp (dates are inclusive)
+    quote_id / unique_id : indexed lookups; unique_id may be a list of ids
+    filters           : {field: value or list of values}; field is a QUERY_FIELDS
+                        name such as "FBA Code" / "FPOD ZIP" / "Vendor" / "Status",
+                        a payload column, or a tuple path into a nested dict
+    columns           : payload columns to return (all when None)
+    after             : cursor returned by the previous page
+    """
+    if log not in LOGS:
+        raise KeyError(f"Unknown log: {log}")
+
+    conn = _connect()
+    _ensure_imported(conn, log)
+
+    where, params = ["log = ?"], [log]
+    if start is not None:
+        where.append("logged_at >= ?")
+        params.append(_as_time(start))
+    if end is not None:
+        where.append("logged_at <= ?")
+        params.append(_as_time(end, end=True))
+    if quote_id is not None:
+        where.append("quote_id = ?")
+        params.append(str(quote_id))
+    if unique_id is not None:
+        ids = list(unique_id) if isinstance(unique_id, (list, tuple, set)) else [unique_id]
+        where.append(f"unique_id IN ({', '.join('?' * len(ids))})")
+        params.extend(str(u) for u in ids)
+    if after is not None:
+        where.append("id > ?")
+        params.append(int(after))
+
+    aliases = QUERY_FIELDS.get(log, {})
+    for field, value in (filters or {}).items():
+        if value is None or (isinstance(value, (list, tuple, set)) and not value):
+            continue
+        path = _json_path(aliases.get(field, field))
+        texts, numbers = _filter_values(value if isinstance(value, (list, tuple, set)) else [value])
+        # SQLite never converts between text and numbers in IN, so compare each way
+        clauses = [f"CAST(json_extract(payload, ?) AS TEXT) IN ({', '.join('?' * len(texts))})"]
+        params.append(path)
+        params.extend(texts)
+        if numbers:
+            clauses.append(f"(json_type(payload, ?) IN ('integer', 'real') "
+                           f"AND json_extract(payload, ?) IN ({', '.join('?' * len(numbers))}))")
+            params.extend([path, path])
+            params.extend(numbers)
+        where.append(f"({' OR '.join(clauses)})")
+
+    if columns:
+        select = "json_object({})".format(", ".join("?, json_extract(payload, ?)" for _ in columns))
+        select_params = [p for c in columns for p in (str(c), _json_path(str(c)))]
+    else:
+        select, select_params = "payload", []
+
+    # Left to itself SQLite walks the whole log in id order to honour ORDER BY
+    # ... LIMIT; a quote / unique id lookup is much smaller, so sort its rows
+    order = "+id" if quote_id is not None or unique_id is not None else "id"
+    sql = f"SELECT id, {select} FROM log_records WHERE {' AND '.join(where)} ORDER BY {order} LIMIT ?"
+    rows = conn.execute(sql, select_params + params + [int(limit) + 1]).fetchall()
+
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    page = pd.DataFrame([json.loads(p) for _, p in rows], columns=list(columns) if columns else None)
+    next_cursor = rows[-1][0] if has_more and rows else None
+    return page, next_cursor
+
+
+def iter_log(log, page_size=5000, **query):
+    """Yield a filtered log page by page (see query_log) without loading all of it."""
+    after = None
+    while True:
+        page, after = query_log(log, limit=page_size, after=after, **query)
+        if not page.empty:
+            yield page
+        if after is None:
+            break
+
+
+def vendor_performance(start=None, end=None, by=("vendor",)):
+    """
+    Vendor hit / failure rates, static vs live share and latency from the
+    rollup table, grouped by any of "vendor", "lane", "day".
+    """
+    by = [c for c in by if c in ("vendor", "lane", "day")] or ["vendor"]
+    where, params = [], []
+    if start is not None:
+        where.append("day >= ?")
+        params.append(pd.Timestamp(start).strftime("%Y-%m-%d"))
+    if end is not None:
+        where.append("day <= ?")
+        params.append(pd.Timestamp(end).strftime("%Y-%m-%d"))
+
+    conn = _connect()
+    for log in VENDOR_LOGS:
+        _ensure_imported(conn, log)
+
+    groups = ", ".join(by)
+    sql = f"""
+        SELECT {groups}, SUM(requests), SUM(successes), SUM(failures), SUM(static_hits),
+               SUM(live_calls), SUM(latency_total), SUM(latency_count), MAX(latency_max)
+        FROM vendor_rollups {"WHERE " + " AND ".join(where) if where else ""}
+        GROUP BY {groups} ORDER BY {groups}
+    """
+    df = pd.DataFrame(conn.execute(sql, params).fetchall(), columns=[
+        *[c.title() for c in by], "Requests", "Successes", "Failures", "Static Hits",
+        "Live Calls", "latency_total", "latency_count", "Max Latency (s)"
+    ])
+
+    requests = df["Requests"].where(df["Requests"] > 0)
+    df["Hit Rate %"] = (df["Successes"] / requests * 100).round(1)
+    df["Failure Rate %"] = (df["Failures"] / requests * 100).round(1)
+    df["Static Share %"] = (df["Static Hits"] / requests * 100).round(1)
+    df["Avg Latency (s)"] = (df["latency_total"] / df["latency_count"].where(df["latency_count"] > 0)).round(3)
+    df["Max Latency (s)"] = df["Max Latency (s)"].where(df["latency_count"] > 0)
+    return df.drop(columns=["latency_total", "latency_count"])
+
+
+# ----------------- Quote Result Cache -----------------
+def get_quote_result(key):
+    """Cached pricing payload for a key, or None if missing or expired."""
+    now = datetime.now().strftime(TS_FORMAT)
+    row = _connect().execute(
+        "SELECT payload FROM quote_results WHERE key = ? AND expires_at > ?", (key, now)
+    ).fetchone()
+    return json.loads(row[0]) if row else None
+
+
+def put_quote_result(key, quote_id, payload, expires_at):
+    """Store a pricing payload until expires_at, dropping expired entries on the way."""
+    now = datetime.now().strftime(TS_FORMAT)
+    conn = _connect()
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        conn.execute("DELETE FROM quote_results WHERE expires_at <= ?", (now,))
+        conn.execute(
+            "INSERT OR REPLACE INTO quote_results (key, quote_id, created_at, expires_at, payload) VALUES (?, ?, ?, ?, ?)",
+            (key, str(quote_id), now, expires_at.strftime(TS_FORMAT), json.dumps(_to_cell(payload), ensure_ascii=False))
+        )
+        conn.execute("COMMIT")
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+
+
+def clear_quote_results():
+    _connect().execute("DELETE FROM quote_results")
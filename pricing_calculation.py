@@ -1,59 +1,105 @@
 import re
+import copy
+import numpy as np
 import pandas as pd
 from heyprimo import heyprimo_api
 from exfreight import exfreight_api
 from jbhunt import jbhunt_api
-from math import ceil
-import os
 from datetime import datetime
+from log_store import append_frame
+from cargo import cargo_totals
+from tariff_cache import FBA_RATES_PATH, LAST_MILE_PATH, derived_table, read_sheet
 
 exchange_rate=88
 
 
-def log_booking(booking_id, quotation_no, unique_id, output1, output2, log_file):
+def booking_metadata(booking_id, quotation_no, unique_id, timestamp=None):
+    """Columns added to every bookings log row."""
+    return {
+        "Booking ID": booking_id,
+        "Quotation Number": quotation_no,
+        "Unique ID": unique_id,
+        "Log Timestamp": timestamp or datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+    }
+
+
+def log_booking(booking_id, quotation_no, unique_id, output1, output2):
 
     # --- Add metadata ---
-    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    metadata = booking_metadata(booking_id, quotation_no, unique_id)
     summary_df = output1.copy()
     breakdown_df = output2.copy()
 
     for df in [summary_df, breakdown_df]:
-        df["Booking ID"] = booking_id
-        df["Quotation Number"] = quotation_no
-        df['Unique ID'] = unique_id
-        df["Log Timestamp"] = timestamp
+        for col, value in metadata.items():
+            df[col] = value
 
-    # --- Load existing log ---
-    if os.path.exists(log_file):
-        try:
-            existing_summary = pd.read_excel(log_file, sheet_name="Summary")
-        except Exception:
-            existing_summary = pd.DataFrame()
+    # --- Append both tables ---
+    append_frame("bookings_summary", summary_df)
+    append_frame("bookings_breakdown", breakdown_df)
 
-        try:
-            existing_breakdown = pd.read_excel(log_file, sheet_name="Breakdown")
-        except Exception:
-            existing_breakdown = pd.DataFrame()
+    print(f"✅ Booking {booking_id} for quotation {quotation_no} logged successfully.")
 
-        # Append fresh data
-        updated_summary = pd.concat([existing_summary, summary_df], ignore_index=True)
-        updated_breakdown = pd.concat([existing_breakdown, breakdown_df], ignore_index=True)
 
-    else:
-        # Start fresh log
-        updated_summary = summary_df
-        updated_breakdown = breakdown_df
 
-    # --- Save both sheets ---
-    with pd.ExcelWriter(log_file, engine="openpyxl") as writer:
-        updated_summary.to_excel(writer, sheet_name="Summary", index=False)
-        updated_breakdown.to_excel(writer, sheet_name="Breakdown", index=False)
+# ----- Summarization charge engine -----
+LM_MINIMUM_CHARGE = 120.0
 
-    print(f"✅ Booking {booking_id} for quotation {quotation_no} logged successfully.")
+# Last mile basis when the delivery type is not Drayage: these service mode
+# sets are quoted per CBM, anything else is a flat rate for the shipment.
+# Drayage is quoted per container and spread over its loadability.
+LM_PER_CBM_MODES = [frozenset({"FTL", "FTL53"}), frozenset({"FTL53"})]
+
+CHARGE_COLUMNS = [
+    "Charge Heads", "Basis", "Basis QTY", "Charge In $", "Exchange Rate (USD to INR)",
+    "Per CBM In $", "Charge in INR", "Per CBM in INR"
+]
+BOOKING_COLUMNS = [
+    "Origin Address", "POL", "P2P Type", "Consolidator", "FBA / Destn Coast", "FPOD",
+    "FBA / Destn", "FBA / Destn Address", "Category", "CBM", "#Pallets", "LM Delivery Type",
+    "LM Broker", "LM Carrier", "LM Rate"
+]
 
 
+def _charge_heads(booking, order, heads, basis, qty, charge, pcbm):
+    return pd.DataFrame({
+        "Booking": booking,
+        "Order": order,
+        "Charge Heads": heads,
+        "Basis": basis,
+        "Basis QTY": qty,
+        "Charge In $": charge,
+        "Per CBM In $": pcbm,
+    })
+
 
-def summarization(data, quote_id, booking_counter):
+def _lm_charges(lm):
+    """Last mile charge per FBA code, with the $120 minimum applied to every basis."""
+    lm_cbm = lm["CBM"].clip(lower=1)
+    rate = pd.to_numeric(lm["Rate"], errors="coerce")
+    drayage = lm["LM Delivery Type"] == "Drayage"
+    per_cbm = lm["Service Modes"].map(
+        lambda modes: isinstance(modes, (list, tuple, set)) and frozenset(modes) in LM_PER_CBM_MODES
+    ).astype(bool)
+
+    charge = np.select(
+        [drayage, per_cbm],
+        [rate / pd.to_numeric(lm["LM Loadability"], errors="coerce") * lm_cbm, rate * lm_cbm],
+        rate
+    )
+    charge = np.where(charge >= LM_MINIMUM_CHARGE, charge, np.where(charge != 0, LM_MINIMUM_CHARGE, 0.0))
+    pcbm = np.where(charge != 0, charge / lm_cbm, 0.0)
+    return lm_cbm, charge, pcbm
+
+
+def summarization(data, quote_id, booking_counter, fx_rate=None, log=True):
+    """
+    One booking per (FPOD, Category). Every booking's charge heads are built
+    in a single pass: aggregates per booking and per FBA code, one frame of
+    charge rows for all bookings, then INR columns, totals and rounding once.
+    log=False skips the bookings log (what-if re-pricing).
+    """
+    fx_rate = fx_rate or exchange_rate
     # Step 1: Flatten nested dict into rows
     rows = []
     for dest, modes in data.items():
@@ -87,209 +133,78 @@ def summarization(data, quote_id, booking_counter):
             })
 
     df_all = pd.DataFrame(rows)
-
     results = {}
-    # Create logs folder if it doesn't exist
-    os.makedirs("Logs", exist_ok=True)
-    log_file = "Logs/bookings_log.xlsx"
-
-    # Step 2: Group by FPOD and Category
-    for (fpod, category), df_group in df_all.groupby(["FPOD", "Category"]):
-        orows = []
-
-        unique_id = list(df_group['Unique ID'].unique())[0]
-        first_mile = df_group["1st Mile"].astype(float).max()
-        quote_tot_cbm = df_group["Quotation Total CBM"].astype(float).max()
-        first_mile_pcbm = float(first_mile) / float(quote_tot_cbm)
-        occ = df_group["OCC"].astype(float).max()
-        dcc = df_group["DCC"].astype(float).max()
-        tot_cbm = df_group["CBM"].sum()
-        tot_first_mile = float(first_mile_pcbm) * float(tot_cbm)
-        pallets = df_group["#Pallets"].sum()
-        pal_pp = df_group["Palletization Cost"].astype(float).max()
-        lm_delivery_type = list(df_group["LM Delivery Type"].unique())
-
-        # Step 3: P2P per FPOD (inside group)
-        P2P_dict = {}
-        for fpod_inner, group_inner in df_group.groupby("FPOD"):
-            total_cbm = group_inner["CBM"].sum()
-            total_doc = group_inner["Documentation"].max()
-            avg_p2p = group_inner["P2P"].max()
-            doc_per_cbm = total_doc / total_cbm if total_cbm else 0.0
-            total_p2p = avg_p2p + doc_per_cbm
-            P2P_dict[fpod_inner] = {"CBM": total_cbm, "Total P2P": total_p2p}
-
-        # Step 4: LM per FBA code
-        lm = {}
-        for _, row in df_group.iterrows():
-            fba_code = row["FBA / Destn"]
-            if fba_code not in lm:
-                lm[fba_code] = {"Rate": 0.0, "CBM": 0.0}
-            lm[fba_code]["Rate"] += float(row["LM Rate"])
-            lm[fba_code]["CBM"] += float(row["CBM"])
-            lm[fba_code]["LM Delivery Type"] = row["LM Delivery Type"]
-            lm[fba_code]['LM Loadability'] = row['LM Loadability']
-            lm[fba_code]["Service Modes"] = row["Service Modes"]
-
-        # Step 5: Charge Heads
-        orows.append({
-            "Charge Heads": "1St Mile",
-            "Basis": "As per Vendor",
-            "Basis QTY": "",
-            "Charge In $": tot_first_mile,
-            "Exchange Rate (USD to INR)": exchange_rate,
-            "Per CBM In $": first_mile_pcbm,
-            "Charge in INR": tot_first_mile * exchange_rate,
-            "Per CBM in INR": first_mile_pcbm * exchange_rate
-        })
-
-        occ_pcbm = float(occ) / float(tot_cbm)
-        orows.append({
-            "Charge Heads": "OCC",
-            "Basis": "Flat (Per Quote)",
-            "Basis QTY": "",
-            "Charge In $": occ,
-            "Exchange Rate (USD to INR)": exchange_rate,
-            "Per CBM In $": occ_pcbm,
-            "Charge in INR": occ * exchange_rate,
-            "Per CBM in INR": occ_pcbm * exchange_rate
-        })
-
-        dcc_pcbm = float(dcc) / float(tot_cbm)
-        orows.append({
-            "Charge Heads": "DCC",
-            "Basis": "Flat (Per Quote)",
-            "Basis QTY": "",
-            "Charge In $": dcc,
-            "Exchange Rate (USD to INR)": exchange_rate,
-            "Per CBM In $": dcc_pcbm,
-            "Charge in INR": dcc * exchange_rate,
-            "Per CBM in INR": dcc_pcbm * exchange_rate
-        })
-
-        for fpod_inner, value in P2P_dict.items():
-            cal_p2p = float(value['Total P2P']) * float(value['CBM'])
-            orows.append({
-                "Charge Heads": f"P2P({fpod_inner})",
-                "Basis": "Per CBM",
-                "Basis QTY": value['CBM'],
-                "Charge In $": cal_p2p,
-                "Exchange Rate (USD to INR)": exchange_rate,
-                "Per CBM In $": value['Total P2P'],
-                "Charge in INR": cal_p2p * exchange_rate,
-                "Per CBM in INR": float(value['Total P2P']) * exchange_rate
-            })
-
-        if "Drayage" not in lm_delivery_type:
-            pal_pcbm = float(pal_pp)/ float(tot_cbm)
-            orows.append({
-                "Charge Heads": "Palletization",
-                "Basis": "Per Pallet",
-                "Basis QTY": pallets,
-                "Charge In $": pal_pp,
-                "Exchange Rate (USD to INR)": exchange_rate,
-                "Per CBM In $": pal_pcbm,
-                "Charge in INR": pal_pp * exchange_rate,
-                "Per CBM in INR": float(pal_pcbm) * exchange_rate
-            })
-
-        for fba_code, value in lm.items():
-            lm_rate = value["Rate"]
-            lm_cbm = value["CBM"]
-            if lm_cbm < 1:
-                lm_cbm = 1
-            service_modes = value["Service Modes"]
-            if value["LM Delivery Type"] == "Drayage":
-                loadability = value['LM Loadability']
-                lm_pcbm = float(lm_rate) / float(loadability)
-                charge_lm = float(lm_pcbm) * float(lm_cbm)
-                if charge_lm >= 120.0:
-                    charge_lm = charge_lm
-                    lm_rate_pcbm = float(charge_lm) / float(lm_cbm)
-                else:
-                    if charge_lm != 0:
-                        charge_lm = 120.0
-                        lm_rate_pcbm = float(charge_lm) / float(lm_cbm)
-                    else:
-                        charge_lm = 0.0
-                        lm_rate_pcbm = 0.0
-            else:
-                if set(service_modes) == {"FTL", "FTL53"}:
-                    charge_lm = float(lm_rate) * float(lm_cbm)
-                    if charge_lm >= 120.0:
-                        charge_lm = charge_lm
-                        lm_rate_pcbm = float(charge_lm) / float(lm_cbm)
-                    else:
-                        if charge_lm != 0:
-                            charge_lm = 120.0
-                            lm_rate_pcbm = float(charge_lm) / float(lm_cbm)
-                        else:
-                            charge_lm = 0.0
-                            lm_rate_pcbm = 0.0
-                elif set(service_modes) == {"FTL53"}:
-                    
-                    charge_lm = float(lm_rate) * float(lm_cbm)
-                    if charge_lm >= 120.0:
-                        charge_lm = charge_lm
-                        lm_rate_pcbm = float(charge_lm) / float(lm_cbm)
-                    else:
-                        if charge_lm != 0:
-                            charge_lm = 120.0
-                            lm_rate_pcbm = float(charge_lm) / float(lm_cbm)
-                        else:
-                            charge_lm = 0.0
-                            lm_rate_pcbm = 0.0
-                else:
-                    
-                    charge_lm = lm_rate
-                    if charge_lm >= 120.0:
-                        charge_lm = charge_lm
-                        lm_rate_pcbm = float(charge_lm) / float(lm_cbm)
-                    else:
-                        if charge_lm != 0:
-                            charge_lm = 120.0
-                            lm_rate_pcbm = float(charge_lm) / float(lm_cbm)
-                        else:
-                            charge_lm = 0.0
-                            lm_rate_pcbm = 0.0
-
-            orows.append({
-                "Charge Heads": f"Last Mile({fba_code})",
-                "Basis": "Per CBM",
-                "Basis QTY": lm_cbm,
-                "Charge In $": charge_lm,
-                "Exchange Rate (USD to INR)": exchange_rate,
-                "Per CBM In $": lm_rate_pcbm,
-                "Charge in INR": charge_lm * exchange_rate,
-                "Per CBM in INR": float(lm_rate_pcbm) * exchange_rate
-            })
-
-        # Final total
-        output2 = pd.DataFrame(orows)
-        total_percbm = output2["Charge In $"].sum() / tot_cbm if tot_cbm else 0.0
-        total_charge = output2["Charge In $"].sum()
-        total_row = {
-            "Charge Heads": "Total",
-            "Basis": "Per CBM",
-            "Basis QTY": tot_cbm,
-            "Charge In $": total_charge ,
-            "Exchange Rate (USD to INR)": "",
-            "Per CBM In $": total_percbm,
-            "Charge in INR": total_charge * exchange_rate,
-            "Per CBM in INR": total_percbm * exchange_rate
-        }
-        output2 = pd.concat([output2, pd.DataFrame([total_row])], ignore_index=True)
-        output2 = output2.round(2)
-
-        # Clean output1
-        output1 = df_group[[
-            "Origin Address", "POL", "P2P Type", "Consolidator", "FBA / Destn Coast", "FPOD",
-            "FBA / Destn", "FBA / Destn Address", "Category", "CBM", "#Pallets", "LM Delivery Type",
-            "LM Broker", "LM Carrier", "LM Rate"
-        ]]
+    if df_all.empty:
+        return results, booking_counter
+
+    # Step 2: Bookings = (FPOD, Category) groups, numbered in sorted order
+    df_all["Booking"] = df_all.groupby(["FPOD", "Category"]).ngroup()
+    df_all = df_all[df_all["Booking"] >= 0]
+    for col in ["1st Mile", "Quotation Total CBM", "OCC", "DCC", "Palletization Cost"]:
+        df_all[col] = df_all[col].astype(float)
+
+    df_all["Is Drayage"] = df_all["LM Delivery Type"] == "Drayage"
+    g = df_all.groupby("Booking").agg(**{
+        "Unique ID": ("Unique ID", "first"),
+        "FPOD": ("FPOD", "first"),
+        "First Mile": ("1st Mile", "max"),
+        "Quote CBM": ("Quotation Total CBM", "max"),
+        "OCC": ("OCC", "max"),
+        "DCC": ("DCC", "max"),
+        "CBM": ("CBM", "sum"),
+        "Pallets": ("#Pallets", "sum"),
+        "Palletization": ("Palletization Cost", "max"),
+        "P2P": ("P2P", "max"),
+        "Documentation": ("Documentation", "max"),
+        "Has Drayage": ("Is Drayage", "any"),
+    }).reset_index()
+
+    # Step 3: LM per FBA code, in order of first appearance within the booking
+    lm_keys = ["Booking", "FBA / Destn"]
+    lm = df_all.assign(Rate=df_all["LM Rate"].astype(float), CBM=df_all["CBM"].astype(float))
+    lm = lm.groupby(lm_keys, sort=False)[["Rate", "CBM"]].sum().reset_index()
+    last = df_all.drop_duplicates(lm_keys, keep="last")[lm_keys + ["LM Delivery Type", "LM Loadability", "Service Modes"]]
+    lm = lm.merge(last, on=lm_keys, how="left")
+    lm_cbm, lm_charge, lm_pcbm = _lm_charges(lm)
+
+    # Step 4: Charge heads for all bookings
+    first_mile_pcbm = g["First Mile"] / g["Quote CBM"]
+    doc_pcbm = np.where(g["CBM"] != 0, g["Documentation"] / g["CBM"].where(g["CBM"] != 0, 1), 0.0)
+    total_p2p = g["P2P"] + doc_pcbm
+    pal = g[~g["Has Drayage"]]
+
+    charges = pd.concat([
+        _charge_heads(g["Booking"], 0, "1St Mile", "As per Vendor", "", first_mile_pcbm * g["CBM"], first_mile_pcbm),
+        _charge_heads(g["Booking"], 1, "OCC", "Flat (Per Quote)", "", g["OCC"], g["OCC"] / g["CBM"]),
+        _charge_heads(g["Booking"], 2, "DCC", "Flat (Per Quote)", "", g["DCC"], g["DCC"] / g["CBM"]),
+        _charge_heads(g["Booking"], 3, "P2P(" + g["FPOD"].astype(str) + ")", "Per CBM", g["CBM"], total_p2p * g["CBM"], total_p2p),
+        _charge_heads(pal["Booking"], 4, "Palletization", "Per Pallet", pal["Pallets"], pal["Palletization"], pal["Palletization"] / pal["CBM"]),
+        _charge_heads(lm["Booking"], 5, "Last Mile(" + lm["FBA / Destn"].astype(str) + ")", "Per CBM", lm_cbm, lm_charge, lm_pcbm),
+    ], ignore_index=True)
+    charges["Exchange Rate (USD to INR)"] = fx_rate
+
+    # Final total per booking
+    total_charge = charges.groupby("Booking")["Charge In $"].sum().reindex(g["Booking"]).to_numpy()
+    total_percbm = np.where(g["CBM"] != 0, total_charge / g["CBM"].where(g["CBM"] != 0, 1), 0.0)
+    totals = _charge_heads(g["Booking"], 6, "Total", "Per CBM", g["CBM"], total_charge, total_percbm)
+    totals["Exchange Rate (USD to INR)"] = ""
+
+    charges = pd.concat([charges, totals], ignore_index=True).sort_values(["Booking", "Order"], kind="stable")
+    charges["Charge in INR"] = charges["Charge In $"] * fx_rate
+    charges["Per CBM in INR"] = charges["Per CBM In $"] * fx_rate
+    money = ["Charge In $", "Per CBM In $", "Charge in INR", "Per CBM in INR"]
+    charges[money] = charges[money].astype(float).round(2)
+
+    # Step 5: One summary / breakdown pair per booking
+    charge_groups = dict(tuple(charges.groupby("Booking", sort=False)))
+    for booking, df_group in df_all.groupby("Booking"):
+        unique_id = g.at[booking, "Unique ID"]
+        output1 = df_group[BOOKING_COLUMNS]
+        output2 = charge_groups[booking][CHARGE_COLUMNS].reset_index(drop=True)
 
         # --- Booking Logging ---
-        log_booking(f"Booking {booking_counter}", quote_id, unique_id, output1, output2, log_file)
+        if log:
+            log_booking(f"Booking {booking_counter}", quote_id, unique_id, output1, output2)
 
         # -----------------------
 
@@ -302,7 +217,7 @@ def summarization(data, quote_id, booking_counter):
 
 def ltl_rate(fpod_city, fpod_st_code, fpod_zip, fba_code, fba_city, fba_st_code, fba_zip, qty, weight,quote_id,unique_id):
     # Read offline last mile rates
-    lm = pd.read_excel(r"Data/Last Mile Rates (no api).xlsx", "Last Mile Rates (no api)")
+    lm = read_sheet(LAST_MILE_PATH, "Last Mile Rates (no api)")
     lm = lm[lm['Delivery Type'] == "LTL"]
 
     # Step 1: Get API results
@@ -377,7 +292,7 @@ def ltl_rate(fpod_city, fpod_st_code, fpod_zip, fba_code, fba_city, fba_st_code,
         return None
     
 def ftl_rate(fpod_zip, fba_code, fba_zip, qty, quote_id,unique_id):
-    lm = pd.read_excel(r"Data/Last Mile Rates (no api).xlsx", "Last Mile Rates (no api)")
+    lm = read_sheet(LAST_MILE_PATH, "Last Mile Rates (no api)")
     today = pd.to_datetime(datetime.today().strftime("%d-%m-%Y"), format="%d-%m-%Y")
     lm["Valid From"] = pd.to_datetime(lm["Valid From"], format="%d-%m-%Y", errors="coerce")
     lm["Valid To"] = pd.to_datetime(lm["Valid To"], format="%d-%m-%Y", errors="coerce")
@@ -545,332 +460,420 @@ def rates_comparison(fpod_city, fpod_st_code, fpod_zip, fba_code, fba_city, fba_
     return ltl, ftl, ftl53, drayage, lowest, selected_lowest
 
 
-def classify_fba_code(fba_locations: pd.DataFrame, fba_code: str, quote_cbm: float, services) -> str:
+# ----------------- Tariff Lookup Tables -----------------
+def _band_services(last_3_weeks_avg):
+    # Default service modes for a NON HOT code by its last 3 week average (CBM)
+    try:
+        avg = float(last_3_weeks_avg)
+    except (TypeError, ValueError):
+        return None
+    if 15.0 < avg <= 35.0:
+        return ["FTL", "FTL53"]
+    if avg > 35.0:
+        return ["FTL53"]
+    return ["FTL", "FTL53", "LTL"]
+
+
+def fba_classification(fba_locations):
+    """
+    {FBA code: (hot, consolidator, coast, loadability, band services, last 3 week)}
+    from the first FBA Locations row of each code.
+    """
+    first = fba_locations.drop_duplicates(subset="FBA Code", keep="first")
+    hot = first["Pre-Determined Bucket"].fillna("").astype(str).str.upper() == "HOT"
+    return {
+        code: (is_hot, consolidator, coast, loadability, _band_services(last_3), last_3)
+        for code, is_hot, consolidator, coast, loadability, last_3 in zip(
+            first["FBA Code"], hot, first["Consolidator"], first["FBA / Destn Coast"],
+            first["Loadability"], first["Last 3 Week"]
+        )
+    }
 
-    # Filter the DataFrame to the relevant FBA code
-    sub_df = fba_locations[fba_locations["FBA Code"] == fba_code]
-    sub_df["Pre-Determined Bucket"] = sub_df["Pre-Determined Bucket"].fillna("").astype(str).str.upper()
-    Consolidator = sub_df["Consolidator"].values[0]
-    coast = sub_df["FBA / Destn Coast"].values[0]
-    Loadability = sub_df["Loadability"].values[0]
-    last_3_weeks_avg = sub_df['Last 3 Week'].values[0]
 
-    if sub_df.empty:
-        if services is None:
-            return "NON HOT", ["FTL", "FTL53", "LTL"], Consolidator, coast, 0.0
-        else:
-            return "NON HOT", services, Consolidator, coast, 0.0
+def fpod_rows(fba_locations):
+    """{FBA code: [FPOD row, ...]} with ZIP codes padded, in sheet order."""
+    lanes = {}
+    for row in fba_locations.to_dict("records"):
+        lanes.setdefault(row["FBA Code"], []).append({
+            "FPOD ZIP": str(row["FPOD ZIP"]).zfill(5),
+            "FPOD CITY": row["FPOD CITY"],
+            "FPOD UNLOC": row["FPOD UNLOC"],
+            "FPOD STATE CODE": row["FPOD STATE CODE"],
+            "FBA ZIP": str(row["FBA ZIP"]).zfill(5),
+            "FBA CITY": row["FBA CITY"],
+            "FBA STATE CODE": row["FBA STATE CODE"],
+        })
+    return lanes
+
+
+def p2p_table(p2p):
+    """P2P sheet with numeric charge columns, lower-cased type and per CBM variants."""
+    p2p = p2p.copy()
+    p2p["P2P Row"] = range(len(p2p))
+    p2p["P2P Type Key"] = p2p["P2P Type"].str.lower()
+    p2p["OC INR"] = pd.to_numeric(p2p["Origin charges per Container(INR)"], errors="coerce")
+    p2p["OF USD"] = pd.to_numeric(p2p["Ocean Freight (USD)"], errors="coerce")
+    p2p["Loadability Num"] = pd.to_numeric(p2p["Loadability"], errors="coerce")
+    p2p["Per CBM Coload"] = pd.to_numeric(p2p["Per CBM(USD)"], errors="coerce")
+    # Own Console drayage per CBM at the default exchange rate; what-if rates redo it
+    p2p["Per CBM Own Drayage"] = (p2p["OC INR"] / float(exchange_rate) + p2p["OF USD"]) / p2p["Loadability Num"]
+    return p2p
+
+
+def _charge_lookup(df, key_col, filter_col, filter_value):
+    # First Amount per location for one charge head, like .values[0] on a filter
+    sub = df[df[filter_col] == filter_value].drop_duplicates(subset=key_col, keep="first")
+    return pd.to_numeric(sub.set_index(key_col)["Amount"], errors="coerce")
+
+
+def build_tariff_tables(fba_locations, p2p, accessorials, palletization):
+    return {
+        "fba_classes": fba_classification(fba_locations),
+        "fpod_rows": fpod_rows(fba_locations),
+        "p2p": p2p_table(p2p),
+        "documentation": _charge_lookup(accessorials, "Location Unloc", "Charge Head", "Documentation"),
+        "occ": _charge_lookup(accessorials, "Location Unloc", "Charge Head", "OCC"),
+        "dcc": _charge_lookup(accessorials, "Location Unloc", "Charge Head", "DCC"),
+        "palletization": _charge_lookup(palletization, "FPOD UNLOC", "Service Type", "Palletization cost Per Pallet"),
+    }
 
-    # Check for Pre-Determined Bucket
-    pre_determined = sub_df["Pre-Determined Bucket"].values[0]
-    
-    if pd.notna(pre_determined) and str(pre_determined).strip() != "" and str(pre_determined) == "HOT":
+
+def tariff_tables():
+    """Lookup tables for rates(), built once per FBA Rates file version."""
+    return derived_table("pricing tables", FBA_RATES_PATH, lambda: build_tariff_tables(
+        read_sheet(FBA_RATES_PATH, 'FBA Locations'),
+        read_sheet(FBA_RATES_PATH, 'P2P'),
+        read_sheet(FBA_RATES_PATH, 'Accessorials'),
+        read_sheet(FBA_RATES_PATH, 'Palletization'),
+    ))
+
+
+def classify_fba_code(fba_classes, fba_code: str, quote_cbm: float, services):
+    """(category, service modes, consolidator, coast, LM loadability) for one FBA code."""
+    hot, Consolidator, coast, Loadability, band_services, last_3_weeks_avg = fba_classes[fba_code]
+
+    if hot:
         if services == []:
-            return str(pre_determined).strip().upper(), ["Drayage"], Consolidator, coast, float(Loadability)
+            return "HOT", ["Drayage"], Consolidator, coast, float(Loadability)
         else:
-            return str(pre_determined).strip().upper(), services, Consolidator, coast, float(Loadability)
-
+            return "HOT", services, Consolidator, coast, float(Loadability)
 
     if quote_cbm >= 50 :
         return "HOT", ["Drayage"], Consolidator, coast, quote_cbm
+    if band_services is None:
+        raise ValueError(f"Last 3 Week value {last_3_weeks_avg!r} is not a number")
+    if services == []:
+        return "NON HOT", list(band_services), Consolidator, coast, 0.0
     else:
-        if 15.0 < float(last_3_weeks_avg) <= 35.0:
-            if services == []:
-                return "NON HOT", ["FTL", "FTL53"], Consolidator, coast, 0.0
-            else:
-                return "NON HOT", services, Consolidator, coast, 0.0
-        elif float(last_3_weeks_avg) > 35.0:
-            if services == []:
-                return "NON HOT", ["FTL53"], Consolidator, coast, 0.0
-            else:
-                return "NON HOT", services, Consolidator, coast, 0.0
-        else:
-            if services == []:
-                return "NON HOT", ["FTL", "FTL53", "LTL"], Consolidator, coast, 0.0
-            else:
-                return "NON HOT", services, Consolidator, coast, 0.0
+        return "NON HOT", services, Consolidator, coast, 0.0
 
 
-def rates(origin, cleaned_data, console_selected, is_occ, is_dcc, des_val, shipment_scope, pickup_charges_inr, 
-          selected_service, grand_total_weight, grand_total_cbm, quote_id,unique_id):
-    
-    pickup_charges = 0.0
-    if shipment_scope == "Door-to-Door":
-        if pickup_charges_inr in [0.0, "0.0", "", None]:
-            return {}, ["Pickup charges are required for Door-to-Door shipment scope."], []
-        else:
-            pickup_charges = float(pickup_charges_inr) / float(exchange_rate)
+# FPODs that always ship Own Console when no console type is chosen
+OWN_CONSOLE_FPODS = ['USNYC', 'USCHS', 'USLAX', 'USJAX']
+SKIPPED_FBA_CODES = ['IUST', 'IUSL', 'PBI3', 'TMB8', 'SCK8']
 
-    # Load Excel sheets
-    try:
-        fba_locations = pd.read_excel(r"Data/FBA Rates.xlsx", 'FBA Locations')
-        p2p = pd.read_excel(r"Data/FBA Rates.xlsx", 'P2P')
-        accessorials = pd.read_excel(r"Data/FBA Rates.xlsx", 'Accessorials')
-        palletization = pd.read_excel(r"Data/FBA Rates.xlsx", 'Palletization')
-    except Exception as e:
-        return {}, [f"❌ Failed to load one or more Excel sheets: {e}"], []
 
-    results = {}
+def collect_lanes(cleaned_data, tables, selected_service, quote_id, unique_id, lane_cache=None, progress=None):
+    """
+    Stage 1 of rates(): cargo totals per destination, FBA classification and the
+    last mile vendor lookups for every FPOD serving it. Returns one lane dict
+    per (destination, FPOD) plus errors and skipped FBA codes. This is the only
+    stage that calls vendor APIs; with a lane_cache dict, each lane and service
+    mode set is looked up once and reused on later runs. progress, if given, is
+    called as progress(destinations done, destinations, stage).
+    """
+    lanes = []
     skipped_fba = []
     errors = []
 
-    for dest in cleaned_data:
+    for done, dest in enumerate(cleaned_data):
         destination_name = dest.get("destination", "")
+        if progress:
+            progress(done, len(cleaned_data), f"Fetching last mile rates for {destination_name}")
         cargo_details = dest.get("cargoDetails", [])
 
-        qty = 0
-        weight = 0.0
-        pallets = 0
-        loose_cbm = 0.0
-        total_cbm = 0.0
-
-        for item in cargo_details:
-            try:
-                package = item.get("packageType", "")
-                item_qty = int(item.get("numPackages", 0))
-                item_wtppack = float(item.get("wtPerPackage", 0.0))
-                item_volppack = float(item.get("volPerPackage", 0.0))
-                length = float(item.get("length", 0.0))
-                width = float(item.get("width", 0.0))
-                height = float(item.get("height", 0.0))
-                try:
-
-                    item_totweight = float(item.get("totalWeight", 0.0))
-                    if item_totweight == 0.0:
-                        item_weight = item_qty * item_wtppack
-                    else:
-                        item_weight = item_totweight
-                except (TypeError, ValueError):
-                    if item_wtppack == 0.0:
-                        item_weight = 0.0
-                    else:
-                        item_weight = item_qty * item_wtppack
-
-                try:
-                    item_tot = float(item.get("totalVolume", 0.0))
-                    if item_tot == 0.0:
-                        vol = (length*width*height)/1000000
-                        item_cbm = item_qty * vol
-                    else:
-                        item_cbm = item_tot
-                except (TypeError, ValueError):
-                    if item_volppack == 0.0:
-                        vol = (length*width*height)/1000000
-                        item_cbm = item_qty * vol
-                    else:
-                        item_cbm = item_qty * item_volppack
-                    
-                # print(package,item_cbm)
-                qty += item_qty
-                weight += item_weight
-                total_cbm += item_cbm
-
-                if package.lower() == "pallet":
-                    pallets += item_qty
-                else:
-                    loose_cbm += item_cbm
-            except Exception as e:
-                errors.append(f"❌ Error parsing cargo for {destination_name}: {e}")
-                continue
+        totals = cargo_totals(cargo_details)
+        for row_no in totals["Invalid Rows"]:
+            errors.append(f"❌ Error parsing cargo for {destination_name}: row {row_no} has a non-numeric value")
 
-        loose_as_pallets = ceil(loose_cbm / 1.8)
-        total_pallet_count = pallets + loose_as_pallets
+        qty = totals["Qty"]
+        weight = totals["Weight"]
+        total_cbm = totals["CBM"]
+        loose_as_pallets = totals["Loose Pallets"]
+        total_pallet_count = totals["Total Pallets"]
 
         fba_code = destination_name.split(" ")[0]
-        if fba_code in ['IUST', 'IUSL', 'PBI3', 'TMB8', 'SCK8' ]:
+        if fba_code in SKIPPED_FBA_CODES:
             skipped_fba.append(fba_code)
             continue
 
-        sub_fba_locations = fba_locations[fba_locations['FBA Code'] == fba_code]
+        fpods = tables["fpod_rows"].get(fba_code)
 
-        if sub_fba_locations.empty:
+        if not fpods:
             errors.append(f"⚠️ FBA Code {fba_code} not found in FBA Locations sheet.")
             continue
 
-
-        for i, row in sub_fba_locations.iterrows():
-            fpod_zip = str(row['FPOD ZIP']).zfill(5)
+        for row in fpods:
+            fpod_zip = row['FPOD ZIP']
             fpod_city = row['FPOD CITY']
             fpod_unloc = row['FPOD UNLOC']
             fpod_st_code = row['FPOD STATE CODE']
-            fba_zip = str(row['FBA ZIP']).zfill(5)
+            fba_zip = row['FBA ZIP']
             fba_city = row['FBA CITY']
             fba_st_code = row['FBA STATE CODE']
 
             try:
-                category, services, Consolidator, coast, lmloadability = classify_fba_code(fba_locations, fba_code, total_cbm, selected_service)
+                category, services, Consolidator, coast, lmloadability = classify_fba_code(tables["fba_classes"], fba_code, total_cbm, selected_service)
             except Exception as e:
                 category = "Unknown"
+                services = selected_service or []
                 Consolidator = ""
                 coast = ""
                 lmloadability = 0.0
                 errors.append(f"⚠️ Error classifying FBA code {fba_code}: {e}")
 
-            if console_selected == "not selected" and console_selected != "both selected":
-                
-                if fpod_unloc in ['USNYC', 'USCHS', 'USLAX', 'USJAX']:
-                    console_type = 'Own Console'
-                else:
-                    if 'Drayage' in services:
-                        console_type = 'Own Console'
-                    else:
-                        console_type = 'Coload'
-            else:   
-                console_type = console_selected
-
+            lane_key = (fpod_zip, fba_code, fba_zip, total_pallet_count, round(weight, 3), category, tuple(sorted(services or [])))
             try:
-                ltl, ftl, ftl53, drayage, lowest, selected_lowest = rates_comparison(
-                    fpod_city, fpod_st_code, fpod_zip, fba_code, 
-                    fba_city, fba_st_code, fba_zip,
-                    total_pallet_count, weight, category, services, quote_id, unique_id
-                )
+                if lane_cache is not None and lane_key in lane_cache:
+                    lane_rates = copy.deepcopy(lane_cache[lane_key])
+                else:
+                    lane_rates = rates_comparison(
+                        fpod_city, fpod_st_code, fpod_zip, fba_code, 
+                        fba_city, fba_st_code, fba_zip,
+                        total_pallet_count, weight, category, services, quote_id, unique_id
+                    )
+                    if lane_cache is not None:
+                        lane_cache[lane_key] = copy.deepcopy(lane_rates)
+                ltl, ftl, ftl53, drayage, lowest, selected_lowest = lane_rates
             except Exception as e:
                 errors.append(f"❌ Rate comparison failed for {destination_name} (FBA {fba_code}): {e}")
                 continue
-            
-            if console_type.lower() == "both selected":
-                sub_p2p = p2p[p2p['FPOD UNLOC'] == fpod_unloc]
-            else:
-                sub_p2p = p2p[
-                    (p2p['FPOD UNLOC'] == fpod_unloc) &
-                    (p2p['P2P Type'].str.lower() == console_type.lower())
-                ]
-
-            if sub_p2p.empty:
-                errors.append(f"⚠️ No P2P match found for FPOD {fpod_unloc}, console type: {console_type}")
-                continue
 
+            lanes.append({
+                "POD": fpod_city,
+                "POD Zip": fpod_zip,
+                "FPOD UNLOC": fpod_unloc,
+                "FBA Code": fba_code,
+                "FBA Address": destination_name,
+                "FBA Zip Code": fba_zip,
+                "Consolidator": Consolidator,
+                "coast": coast,
+                "Qty": qty,
+                "Total Weight": weight,
+                "Total CBM": total_cbm,
+                "Total Pallets": total_pallet_count,
+                "Loose Pallets": loose_as_pallets,
+                "category": category,
+                "Service Modes": services,
+                "LM Loadability": lmloadability,
+                "LTL": ltl,
+                "FTL": ftl,
+                "FTL53": ftl53,
+                "Drayage": drayage,
+                'lowest lm': lowest,
+                'Selected lm': selected_lowest,
+            })
+
+    if progress:
+        progress(len(cleaned_data), len(cleaned_data), "Applying tariffs")
+    return lanes, errors, skipped_fba
+
+
+def _rate_value(rate):
+    try:
+        return float(rate)
+    except (TypeError, ValueError):
+        return np.nan
+
+
+def price_lanes(lanes, tables, quote):
+    """
+    Stage 2 of rates(): pure tariff arithmetic, no vendor calls.
+
+    Builds the lane x P2P candidate frame with one merge against the prepared
+    tariff_tables() and computes P2P,
+    documentation, OCC, DCC, pickup, palletization, totals and per-CBM figures
+    as column operations. quote holds origin, console_selected, is_occ, is_dcc,
+    shipment_scope, pickup_charges_inr, pickup_charges, grand_total_weight,
+    grand_total_cbm, unique_id and optionally exchange_rate. Returns
+    (results, errors) shaped like rates().
+    """
+    results = {}
+    errors = []
+    if not lanes:
+        return results, errors
+
+    lanes_df = pd.DataFrame(lanes)
+    lanes_df["Lane"] = range(len(lanes_df))
+
+    # ---------- Console type per lane ----------
+    console_selected = quote["console_selected"]
+    is_drayage = lanes_df["Service Modes"].map(lambda s: "Drayage" in (s or [])).astype(bool)
+    if console_selected == "not selected":
+        own = lanes_df["FPOD UNLOC"].isin(OWN_CONSOLE_FPODS) | is_drayage
+        lanes_df["Console Type"] = np.where(own, "Own Console", "Coload")
+    else:
+        lanes_df["Console Type"] = console_selected
+    lanes_df["Is Drayage"] = is_drayage
+
+    # ---------- Lane x P2P candidates ----------
+    cand = lanes_df.merge(tables["p2p"], on="FPOD UNLOC", how="inner")
+    console_key = cand["Console Type"].str.lower()
+    cand = cand[(console_key == "both selected") | (cand["P2P Type Key"] == console_key)]
+    cand = cand.sort_values(["Lane", "P2P Row"], kind="stable").reset_index(drop=True)
+
+    for _, lane in lanes_df[~lanes_df["Lane"].isin(cand["Lane"])].iterrows():
+        errors.append(f"⚠️ No P2P match found for FPOD {lane['FPOD UNLOC']}, console type: {lane['Console Type']}")
+
+    shipment_scope = quote["shipment_scope"]
+    origin = quote["origin"]
+    if shipment_scope == "Port-to-Door":
+        try:
+            origin_unloc = re.search(r'\((.*?)\)', origin).group(1)
+        except Exception as e:
+            errors.append(f"⚠️ Failed to parse POL from origin string '{origin}': {e}")
+            return results, errors
+        cand = cand[cand["POR/POL"] == origin_unloc].reset_index(drop=True)
+
+    if cand.empty:
+        return results, errors
+
+    # ---------- Charge columns ----------
+    cbm = cand["Total CBM"].astype(float).clip(lower=1)
+    own_drayage = cand["Is Drayage"] & (cand["Console Type"] == "Own Console")
+    fx_rate = float(quote.get("exchange_rate", exchange_rate))
+    if fx_rate == float(exchange_rate):
+        own_percbm = cand["Per CBM Own Drayage"]
+    else:
+        own_percbm = (cand["OC INR"] / fx_rate + cand["OF USD"]) / cand["Loadability Num"]
+    percbm_p2p = np.where(own_drayage, own_percbm, cand["Per CBM Coload"])
+    total_p2p = percbm_p2p * cbm
+
+    pod_doc = cand["FPOD UNLOC"].map(tables["documentation"])
+    occ = cand["POR/POL"].map(tables["occ"])
+    dcc = cand["FPOD UNLOC"].map(tables["dcc"])
+    pal_cost = cand["FPOD UNLOC"].map(tables["palletization"])
+
+    # Missing tariff entries, reported per candidate in the old row order
+    for unloc, pol_unloc, no_doc, no_occ, no_dcc, no_pal in zip(
+        cand["FPOD UNLOC"], cand["POR/POL"], pod_doc.isna(), occ.isna(), dcc.isna(), pal_cost.isna()
+    ):
+        if no_doc:
+            errors.append(f"⚠️ Documentation charge missing for {unloc}")
+        if no_occ and quote["is_occ"]:
+            errors.append(f"⚠️ OCC charge missing for {pol_unloc}")
+        if no_dcc and quote["is_dcc"]:
+            errors.append(f"⚠️ DCC charge missing for {unloc}")
+        if no_pal:
+            errors.append(f"⚠️ Palletization Cost missing for {unloc}")
+
+    pod_doc = pod_doc.fillna(0.0)
+    occ = occ.fillna(0.0) if quote["is_occ"] else pd.Series(0.0, index=cand.index)
+    dcc = dcc.fillna(0.0) if quote["is_dcc"] else pd.Series(0.0, index=cand.index)
+    pal_cost = pal_cost.fillna(0.0)
+    palletization_cost = pal_cost * cand["Loose Pallets"]
+    doc_pcbm = pod_doc / cbm
+
+    last_mile = cand["Selected lm"].map(lambda lm: lm.get("Rate") if isinstance(lm, dict) else None)
+    lm_rate = last_mile.map(_rate_value)
+    # A candidate without a usable last mile rate is reported and left out,
+    # as the per-row loop did when float() on the rate failed
+    no_rate = lm_rate.isna()
+    for dest, rate in zip(cand.loc[no_rate, "FBA Address"], last_mile[no_rate]):
+        errors.append(f"❌ Error processing P2P row for {dest}: last mile rate {rate!r} is not a number")
+    pickup = quote["pickup_charges"] if shipment_scope == "Door-to-Door" else 0.0
+    gtotal = lm_rate + total_p2p + pod_doc + occ + dcc + pickup + palletization_cost
+    tot_pcbm = gtotal / cbm
+
+    priced = pd.DataFrame({
+        'Unique ID': quote["unique_id"],
+        "Shipment Scope": shipment_scope,
+        "Origin": origin,
+        "POL": cand["POL Name"],
+        "POD": cand["POD"],
+        "POD Zip": cand["POD Zip"],
+        "FBA Code": cand["FBA Code"],
+        "FBA Address": cand["FBA Address"],
+        "FBA Zip Code": cand["FBA Zip Code"],
+        "Consolidator": cand["Consolidator"],
+        "coast": cand["coast"],
+        "Qty": cand["Qty"],
+        "Total Weight": cand["Total Weight"],
+        "Quotation Total Weight": quote["grand_total_weight"],
+        "Total CBM": cbm,
+        "Quotation Total CBM": quote["grand_total_cbm"],
+        "Total Pallets": cand["Total Pallets"],
+        "category": cand["category"],
+        "Service Modes": cand["Service Modes"],
+        "LM Loadability": cand["LM Loadability"],
+        "LTL": cand["LTL"],
+        "FTL": cand["FTL"],
+        "FTL53": cand["FTL53"],
+        "Drayage": cand["Drayage"],
+        'lowest lm': cand["lowest lm"],
+        'Selected lm': cand["Selected lm"],
+        'Pick-Up Charges(INR)': quote["pickup_charges_inr"],
+        "Pick-Up Charges": quote["pickup_charges"],
+        "PER CBM P2P": percbm_p2p,
+        "PER CBM P2P & Doc": percbm_p2p + doc_pcbm,
+        "P2P Origin charges per Container(INR)": cand["Origin charges per Container(INR)"],
+        "P2P Ocean Freight (USD)": cand["Ocean Freight (USD)"],
+        "P2P Drayage & Devanning(USD)": cand["Drayage & Devanning(USD)"],
+        "P2P Total cost (USD)": cand["Total cost (USD)"],
+        "P2P Loadability": cand["Loadability"],
+        "P2P Charge": total_p2p,
+        "Destination Doc": pod_doc,
+        "OCC": occ,
+        "DCC": dcc,
+        "Documentation": pod_doc,
+        "Palletization (Per Pallet)": pal_cost,
+        "Palletization Cost": palletization_cost,
+        "Last Mile Rate": last_mile,
+        "Total Cost": gtotal,
+        "Total per cbm": tot_pcbm,
+    }, index=cand.index)
+
+    # Same P2P type for a destination: the last candidate wins, as before
+    priced = priced[~no_rate]
+    for console, record in zip(cand.loc[~no_rate, "P2P Type"], priced.to_dict("records")):
+        results.setdefault(record["FBA Address"], {})[console] = record
+
+    return results, errors
+
+
+def rates(origin, cleaned_data, console_selected, is_occ, is_dcc, des_val, shipment_scope, pickup_charges_inr, 
+          selected_service, grand_total_weight, grand_total_cbm, quote_id,unique_id, lane_cache=None, fx_rate=None,
+          progress=None):
+    
+    fx_rate = fx_rate or exchange_rate
+    pickup_charges = 0.0
+    if shipment_scope == "Door-to-Door":
+        if pickup_charges_inr in [0.0, "0.0", "", None]:
+            return {}, ["Pickup charges are required for Door-to-Door shipment scope."], []
+        else:
+            pickup_charges = float(pickup_charges_inr) / float(fx_rate)
+
+    # Load Excel sheets
+    try:
+        tables = tariff_tables()
+    except Exception as e:
+        return {}, [f"❌ Failed to load one or more Excel sheets: {e}"], []
+
+    lanes, errors, skipped_fba = collect_lanes(cleaned_data, tables, selected_service, quote_id, unique_id, lane_cache, progress)
+
+    quote = {
+        "origin": origin,
+        "console_selected": console_selected,
+        "is_occ": is_occ,
+        "is_dcc": is_dcc,
+        "shipment_scope": shipment_scope,
+        "pickup_charges_inr": pickup_charges_inr,
+        "pickup_charges": pickup_charges,
+        "grand_total_weight": grand_total_weight,
+        "grand_total_cbm": grand_total_cbm,
+        "unique_id": unique_id,
+        "exchange_rate": fx_rate,
+    }
+    results, price_errors = price_lanes(lanes, tables, quote)
 
-            for j, prow in sub_p2p.iterrows():
-                try:
-                    pol = prow['POL Name']
-                    pol_unloc = prow['POR/POL']
-                    oc_p2p_inr = prow['Origin charges per Container(INR)']
-                    of_p2p = prow['Ocean Freight (USD)']
-                    dd_p2p = prow['Drayage & Devanning(USD)']
-                    tcost_p2p = prow['Total cost (USD)']
-                    p2ploadability = prow['Loadability']
-                    
-
-
-                    if "Drayage" in services and console_type == 'Own Console':
-                        oc_p2p_usd = float(oc_p2p_inr)/float(exchange_rate)
-                        t_p2p = float(oc_p2p_usd)+float(of_p2p)
-                        percbm_p2p = t_p2p/p2ploadability
-                    else:
-                        percbm_p2p = prow['Per CBM(USD)']
-
-                    # print(total_cbm)
-                    if total_cbm >= 1:
-                        total_cbm = total_cbm
-                    else:
-                        total_cbm = 1
-                    
-                    total_p2p = percbm_p2p * total_cbm
-                    console = prow['P2P Type']
-
-                    if shipment_scope == "Port-to-Door":
-                        try:
-                            origin_unloc = re.search(r'\((.*?)\)', origin).group(1)
-                        except Exception as e:
-                            errors.append(f"⚠️ Failed to parse POL from origin string '{origin}': {e}")
-                            continue
-
-                        if pol_unloc != origin_unloc:
-                            continue
-
-                    try:
-                        pod_doc = accessorials[(accessorials["Location Unloc"] == fpod_unloc) &
-                                                (accessorials["Charge Head"] == "Documentation")]["Amount"].values[0]
-                        doc_pcbm = float(pod_doc)/float(total_cbm)
-                    except IndexError:
-                        errors.append(f"⚠️ Documentation charge missing for {fpod_unloc}")
-                        pod_doc = 0
-                        doc_pcbm = 0
-
-                    try:
-                        occ = accessorials[(accessorials["Location Unloc"] == pol_unloc) &
-                                                (accessorials["Charge Head"] == "OCC")]["Amount"].values[0] if is_occ else 0
-                    except IndexError:
-                        if is_occ:
-                            errors.append(f"⚠️ OCC charge missing for {pol_unloc}")
-                        occ = 0
-
-                    try:
-                        dcc = accessorials[(accessorials["Location Unloc"] == fpod_unloc) &
-                                                (accessorials["Charge Head"] == "DCC")]["Amount"].values[0] if is_dcc else 0
-                    except IndexError:
-                        if is_dcc:
-                            errors.append(f"⚠️ DCC charge missing for {fpod_unloc}")
-                        dcc = 0
-
-                    try:
-                        pal_cost = palletization[(palletization["FPOD UNLOC"] == fpod_unloc) &
-                                                (palletization["Service Type"] == "Palletization cost Per Pallet")]["Amount"].values[0]
-                        palletization_cost = float(pal_cost) * loose_as_pallets
-                    except IndexError:
-                        errors.append(f"⚠️ Palletization Cost missing for {fpod_unloc}")
-                        pal_cost = 0.0
-                        palletization_cost = 0.0
-
-                    if destination_name not in results:
-                        results[destination_name] = {}
-
-                    if shipment_scope == "Door-to-Door":
-                        gtotal = float(selected_lowest["Rate"]) + float(total_p2p) + float(pod_doc) + float(occ) + float(dcc) + float(pickup_charges) + float(palletization_cost)
-                    else:
-                        gtotal = float(selected_lowest["Rate"]) + float(total_p2p) + float(pod_doc) + float(occ) + float(dcc) + float(palletization_cost)
-
-                    tot_pcbm = gtotal / total_cbm if total_cbm else 0
-
-                    results[destination_name][console] = {
-                        'Unique ID':unique_id,
-                        "Shipment Scope":shipment_scope,
-                        "Origin": origin,
-                        "POL": pol,
-                        "POD": fpod_city,
-                        "POD Zip": fpod_zip,
-                        "FBA Code": fba_code,
-                        "FBA Address": destination_name,
-                        "FBA Zip Code": fba_zip,
-                        "Consolidator": Consolidator,
-                        "coast": coast,
-                        "Qty": qty,
-                        "Total Weight": weight,
-                        "Quotation Total Weight": grand_total_weight,
-                        "Total CBM": total_cbm,
-                        "Quotation Total CBM":grand_total_cbm, 
-                        "Total Pallets": total_pallet_count,
-                        "category": category,
-                        "Service Modes": services,
-                        "LM Loadability": lmloadability,
-                        "LTL": ltl,
-                        "FTL": ftl,
-                        "FTL53": ftl53,
-                        "Drayage": drayage,
-                        'lowest lm': lowest,
-                        'Selected lm': selected_lowest,
-                        'Pick-Up Charges(INR)':pickup_charges_inr,
-                        "Pick-Up Charges": pickup_charges,
-                        "PER CBM P2P": percbm_p2p,
-                        "PER CBM P2P & Doc": percbm_p2p + doc_pcbm,
-                        "P2P Origin charges per Container(INR)":oc_p2p_inr,
-                        "P2P Ocean Freight (USD)":of_p2p,
-                        "P2P Drayage & Devanning(USD)":dd_p2p,
-                        "P2P Total cost (USD)":tcost_p2p,
-                        "P2P Loadability": p2ploadability,
-                        "P2P Charge": total_p2p,
-                        "Destination Doc": float(pod_doc),
-                        "OCC": float(occ),
-                        "DCC": float(dcc),
-                        "Documentation": float(pod_doc),
-                        "Palletization (Per Pallet)": float(pal_cost),
-                        "Palletization Cost": + float(palletization_cost),
-                        "Last Mile Rate": selected_lowest["Rate"],
-                        "Total Cost": gtotal,
-                        "Total per cbm": tot_pcbm
-                    }
-                except Exception as e:
-                    errors.append(f"❌ Error processing P2P row for {destination_name}: {e}")
-
-    return results, errors, skipped_fba
+    return results, errors + price_errors, skipped_fba
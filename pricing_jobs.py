@@ -0,0 +1,103 @@
+import copy
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from quote_pricing import price_quote, booking_breakdowns
+
+# Get Rates runs here instead of on the Streamlit script thread, so a long
+# quote neither blocks the session nor is lost when the user switches tabs.
+# Jobs are kept for a while after they finish and found by job ID; each
+# session keeps the IDs it submitted.
+PRICING_WORKERS = 4
+JOB_RETENTION_S = 4 * 60 * 60
+
+_executor = ThreadPoolExecutor(max_workers=PRICING_WORKERS, thread_name_prefix="pricing")
+_lock = threading.Lock()
+_jobs = {}
+
+
+def _run_job(job):
+    def progress(done, total, stage):
+        job["progress"] = done / total if total else 1.0
+        job["stage"] = stage
+
+    job["stage"] = "Starting"
+    job["started_at"] = time.time()
+    try:
+        return _price_job(job, progress)
+    finally:
+        job["finished_at"] = time.time()
+
+
+def _price_job(job, progress):
+    inputs = job["inputs"]
+    result, errors, skipped_fba, elapsed = price_quote(
+        job["quote_id"],
+        inputs["origin"],
+        inputs["multidest"],
+        inputs["shipment_scope"],
+        inputs["is_occ"],
+        inputs["is_dcc"],
+        inputs["pickup_charges_inr"],
+        inputs["console_type"],
+        inputs["service_modes"],
+        job["lane_cache"],
+        progress
+    )
+
+    # Bookings are summarized (and logged) once here, not on every rerun
+    breakdowns = {}
+    if result and not errors:
+        job["stage"] = "Summarizing bookings"
+        breakdowns = booking_breakdowns(job["quote_id"], result)
+
+    job["progress"] = 1.0
+    job["stage"] = "Done"
+    return {
+        "result": result,
+        "errors": errors,
+        "skipped_fba": skipped_fba,
+        "elapsed": elapsed,
+        "breakdowns": breakdowns,
+    }
+
+
+def _prune():
+    cutoff = time.time() - JOB_RETENTION_S
+    for job_id in [job_id for job_id, job in _jobs.items() if job.get("finished_at", time.time()) < cutoff]:
+        del _jobs[job_id]
+
+
+def submit_pricing(quote_id, origin, multidest, shipment_scope, is_occ, is_dcc, pickup_charges_inr=0.0,
+                   console_type="not selected", service_modes=None):
+    """Queue price_quote() for a quotation and return its job."""
+    job = {
+        "id": uuid.uuid4().hex[:12],
+        "quote_id": quote_id,
+        "inputs": {
+            "origin": origin,
+            "multidest": copy.deepcopy(multidest),
+            "shipment_scope": shipment_scope,
+            "is_occ": is_occ,
+            "is_dcc": is_dcc,
+            "pickup_charges_inr": pickup_charges_inr,
+            "console_type": console_type,
+            "service_modes": list(service_modes or []),
+        },
+        "progress": 0.0,
+        "stage": "Queued",
+        "submitted_at": time.time(),
+        # Filled by the run, then reused by what-if
+        "lane_cache": {},
+    }
+    with _lock:
+        _prune()
+        job["future"] = _executor.submit(_run_job, job)
+        _jobs[job["id"]] = job
+    return job
+
+
+def get_job(job_id):
+    with _lock:
+        return _jobs.get(job_id)
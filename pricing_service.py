@@ -0,0 +1,179 @@
+"""
+Headless pricing service: the FBA Quote and US Transport Rate calculators over
+HTTP, without Streamlit reruns.
+
+    uvicorn pricing_service:app --host 0.0.0.0 --port 8000 --workers 4
+
+Endpoints are plain (sync) functions, so FastAPI runs them on its thread pool
+and requests are priced concurrently. Tariff sheets are parsed once per worker
+through tariff_cache and reloaded when Data Management uploads a new file.
+"""
+from contextlib import asynccontextmanager
+from typing import Any, Dict, List, Literal, Optional
+
+from fastapi import FastAPI, HTTPException
+from pydantic import BaseModel, ConfigDict, Field
+
+from data_fetch import close_client, fetch_quote_data, mongo_health, quote_cache_stats
+from json_safe import jsonable
+from quote_pricing import booking_breakdowns, booking_records, price_quote, quote_inputs
+from tariff_cache import PRICING_SHEETS, cache_info, read_sheet
+from US_lm_calculator import trans_rates
+
+
+@asynccontextmanager
+async def lifespan(app):
+    # Parse the tariff sheets before the first request instead of during it
+    for path, sheet in PRICING_SHEETS:
+        try:
+            read_sheet(path, sheet)
+        except Exception as e:
+            print(f"⚠️ Could not preload {sheet} from {path}: {e}")
+    yield
+    close_client()
+
+
+app = FastAPI(title="FBA Pricing Service", lifespan=lifespan)
+
+
+# ----------------- Schemas -----------------
+class CargoItem(BaseModel):
+    model_config = ConfigDict(extra="allow")
+
+    packageType: str = ""
+    numPackages: int = 0
+    wtPerPackage: float = 0.0
+    volPerPackage: float = 0.0
+    length: float = 0.0
+    width: float = 0.0
+    height: float = 0.0
+    totalWeight: Optional[float] = None
+    totalVolume: Optional[float] = None
+
+
+class Destination(BaseModel):
+    destination: str
+    cargoDetails: List[CargoItem] = []
+
+
+class PricingOptions(BaseModel):
+    pickup_charges_inr: float = 0.0
+    console_type: Literal["not selected", "Own Console", "Coload", "both selected"] = "not selected"
+    service_modes: List[Literal["LTL", "FTL", "FTL53", "Drayage"]] = []
+    summarize: bool = Field(True, description="Include the per booking summary and charge breakdown")
+
+
+class RatesRequest(PricingOptions):
+    quote_id: str = "API"
+    origin: str
+    multidest: List[Destination]
+    shipment_scope: Literal["Port-to-Door", "Door-to-Door"]
+    is_occ: bool = False
+    is_dcc: bool = False
+
+
+class Booking(BaseModel):
+    summary: List[Dict[str, Any]]
+    breakdown: List[Dict[str, Any]]
+
+
+class RatesResponse(BaseModel):
+    quote_id: str
+    result: Dict[str, Dict[str, Dict[str, Any]]]
+    errors: List[str]
+    skipped_fba: List[str]
+    elapsed_seconds: float
+    bookings: Dict[str, Dict[str, Booking]] = {}
+
+
+class TransCargoItem(BaseModel):
+    package_type: Literal["Loose Cartons", "Pallets"] = "Loose Cartons"
+    qty: int = 0
+    weight: float = 0.0
+    L: float = 0.0
+    W: float = 0.0
+    H: float = 0.0
+
+
+class TransTotals(BaseModel):
+    Weight: float = 0.0
+    VolumeCBM: float = 0.0
+
+
+class TransToggles(BaseModel):
+    FBA: bool = True
+    LiftgateRequired: bool = False
+    ResidentialDelivery: bool = False
+
+
+class TransRatesRequest(BaseModel):
+    Origin: str = Field(..., description="'zip, city, state, state code, country'")
+    Destination: str = Field(..., description="'zip, city, state, state code, country'")
+    DataType: Literal["CargoDetails", "Totals"]
+    CargoDetails: List[TransCargoItem] = []
+    Totals: TransTotals = TransTotals()
+    Toggles: TransToggles = TransToggles()
+
+
+class TransRatesResponse(BaseModel):
+    LTL: Optional[List[Dict[str, Any]]] = None
+    errors: List[str]
+
+
+# ----------------- Helpers -----------------
+def _pricing_response(quote_id, result, errors, skipped_fba, elapsed, summarize):
+    response = {
+        "quote_id": quote_id,
+        "result": jsonable(result),
+        "errors": errors,
+        "skipped_fba": skipped_fba,
+        "elapsed_seconds": round(elapsed, 3),
+        "bookings": {},
+    }
+    if summarize and result and not errors:
+        response["bookings"] = booking_records(booking_breakdowns(quote_id, result))
+    return response
+
+
+# ----------------- Endpoints -----------------
+@app.get("/health")
+def health():
+    return {"status": "ok", "mongo": mongo_health(), "quote_cache": quote_cache_stats(), "tariffs": jsonable(cache_info())}
+
+
+@app.post("/rates", response_model=RatesResponse)
+def rates_endpoint(request: RatesRequest):
+    if request.shipment_scope == "Door-to-Door" and not request.pickup_charges_inr:
+        raise HTTPException(422, "Pickup charges are required for Door-to-Door shipment scope.")
+
+    multidest = [d.model_dump(exclude_none=True) for d in request.multidest]
+    result, errors, skipped_fba, elapsed = price_quote(
+        request.quote_id, request.origin, multidest, request.shipment_scope, request.is_occ, request.is_dcc,
+        request.pickup_charges_inr, request.console_type, request.service_modes
+    )
+    return _pricing_response(request.quote_id, result, errors, skipped_fba, elapsed, request.summarize)
+
+
+@app.post("/quotes/{quote_id}/rates", response_model=RatesResponse)
+def quote_rates_endpoint(quote_id: str, options: PricingOptions = PricingOptions()):
+    quote_data, _ = fetch_quote_data(quote_id)
+    if not quote_data:
+        raise HTTPException(404, "❌ Quote not found or invalid ID.")
+    try:
+        inputs = quote_inputs(quote_data)
+    except ValueError as e:
+        raise HTTPException(422, str(e))
+
+    if inputs["shipment_scope"] == "Door-to-Door" and not options.pickup_charges_inr:
+        raise HTTPException(422, "Pickup charges are required for Door-to-Door shipment scope.")
+
+    result, errors, skipped_fba, elapsed = price_quote(
+        quote_id, inputs["origin"], inputs["multidest"], inputs["shipment_scope"], inputs["is_occ"],
+        inputs["is_dcc"], options.pickup_charges_inr, options.console_type, options.service_modes
+    )
+    return _pricing_response(quote_id, result, errors, skipped_fba, elapsed, options.summarize)
+
+
+@app.post("/trans-rates", response_model=TransRatesResponse)
+def trans_rates_endpoint(request: TransRatesRequest):
+    return jsonable(trans_rates(request.model_dump()))
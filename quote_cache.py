@@ -0,0 +1,67 @@
+import hashlib
+import json
+from datetime import datetime, timedelta
+
+from log_store import get_quote_result, put_quote_result
+from tariff_cache import PRICING_SHEETS, pricing_version
+
+# Longest a priced quote is reused. Offline rates are matched on today's date,
+# so entries never outlive the day they were priced on either.
+QUOTE_CACHE_TTL = timedelta(hours=6)
+
+
+def tariff_versions():
+    """(path, version) of every tariff and static rate file pricing reads."""
+    return [(path, pricing_version(path)) for path in sorted({path for path, _ in PRICING_SHEETS})]
+
+
+def quote_key(origin, multidest, shipment_scope, is_occ, is_dcc, pickup_charges_inr, console_type, service_modes):
+    """
+    Content hash of everything that decides a price: the quote inputs (multidest
+    without its row ids) plus the tariff file versions. Uploading any tariff
+    changes the key, so results priced on the old file are never served again.
+    """
+    payload = {
+        "origin": origin,
+        "multidest": multidest,
+        "shipment_scope": shipment_scope,
+        "is_occ": bool(is_occ),
+        "is_dcc": bool(is_dcc),
+        "pickup_charges_inr": float(pickup_charges_inr or 0.0),
+        "console_type": console_type,
+        "service_modes": sorted(service_modes or []),
+        "tariffs": tariff_versions(),
+    }
+    blob = json.dumps(payload, sort_keys=True, default=str, separators=(",", ":"))
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+
+def _expiry(now):
+    end_of_day = datetime.combine(now.date() + timedelta(days=1), datetime.min.time())
+    return min(now + QUOTE_CACHE_TTL, end_of_day)
+
+
+def cached_quote(key):
+    """(result, skipped_fba, lane_cache) of an earlier identical run, or None."""
+    try:
+        cached = get_quote_result(key)
+    except Exception as e:
+        print(f"⚠️ Quote cache read failed: {e}")
+        return None
+    if not cached:
+        return None
+
+    # Lane keys were tuples (the service modes a nested tuple) before going through JSON
+    lane_cache = {tuple(k[:-1]) + (tuple(k[-1]),): v for k, v in cached["lanes"]}
+    return cached["result"], cached["skipped_fba"], lane_cache
+
+
+def store_quote(key, quote_id, result, skipped_fba, lane_cache):
+    try:
+        put_quote_result(key, quote_id, {
+            "result": result,
+            "skipped_fba": skipped_fba,
+            "lanes": [[list(k), v] for k, v in lane_cache.items()],
+        }, _expiry(datetime.now()))
+    except Exception as e:
+        print(f"⚠️ Quote cache write failed: {e}")
@@ -0,0 +1,228 @@
+import time
+from datetime import datetime
+from pricing_calculation import rates, summarization
+from log_store import append_records
+from cargo import cargo_totals
+from quote_cache import cached_quote, quote_key, store_quote
+from json_safe import frame_records
+
+LOG_NAME = "success_rates"
+
+# ----------------- Helpers -----------------
+def safe_int(val, default=1):
+    try:
+        return int(val)
+    except (ValueError, TypeError):
+        return default
+
+def safe_float(val, default=0.0):
+    try:
+        return float(val)
+    except (ValueError, TypeError):
+        return default
+
+def remove_ids(data):
+    if isinstance(data, dict):
+        return {k: remove_ids(v) for k, v in data.items() if k != "id"}
+    elif isinstance(data, list):
+        return [remove_ids(item) for item in data]
+    else:
+        return data
+
+
+# ----------------- Logging -----------------
+def log_rate_request(quote_id, console_type, service_modes, result, errors,time_taken):
+    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    status = "Error" if not result else "Success"
+    error_messages = "; ".join(errors) if errors else ""
+    service = ", ".join(service_modes) if len(service_modes) > 0 else ""
+    total_destinations = len(result) if result else 0
+
+    log_entry = {
+        "Timestamp": timestamp,
+        "Quote ID": quote_id,
+        "OverRide ConsoleType": console_type,
+        "OverRide ServiceModes": service,
+        "Status": status,
+        "Error Messages": error_messages,
+        "Total Destinations": total_destinations,
+        "Execution Time":time_taken
+    }
+
+    append_records(LOG_NAME, log_entry)
+
+def quotations_backup(quote_id, result):
+    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    data = []
+
+    for destination, consoles in result.items():
+        for console, details in consoles.items():
+            entry = details.copy()
+            entry['Agquote ID'] = quote_id
+            entry['Destination'] = destination
+            entry['Console Type'] = console
+            entry['Quoted Date/Time'] = timestamp
+            data.append(entry)
+
+    append_records("quotations", data)
+    print(f"✅ {len(data)} quotation rows logged for {quote_id}")
+
+
+# ----------------- Quote Pricing -----------------
+def quote_totals(multidest):
+    """Quotation total weight and CBM, as shown on the FBA Quote form."""
+    totals = [cargo_totals(dest_entry.get("cargoDetails", [])) for dest_entry in multidest]
+    return sum(t["Weight"] for t in totals), sum(t["CBM"] for t in totals)
+
+
+def quote_inputs(quote_data):
+    """
+    Pricing inputs from a Quotes document. Raises ValueError with the message the
+    FBA Quote tab shows when the quotation cannot be priced.
+    """
+    if not quote_data:
+        raise ValueError("❌ Quote not found or invalid ID.")
+
+    quote_info = quote_data.get("quoteData", {})
+    quotesum_info = quote_data.get("quoteSummary", {})
+
+    if quote_info.get("fba", "").strip().lower() != "yes":
+        raise ValueError("🚫 The entered quotation is not marked as an FBA shipment.")
+
+    shipment_scope = quotesum_info.get("shipmentScope", "")
+    if shipment_scope not in ['Port-to-Door' , 'Door-to-Door']:
+        raise ValueError("🚫 Shipment Scope must be either 'Port to Door' or 'Door to Door'.")
+
+    return {
+        "origin": quote_info.get("origin", ""),
+        "multidest": quote_info.get("multidest", []),
+        "shipment_scope": shipment_scope,
+        "is_occ": quote_info.get("fbaOCC", "").lower() == "yes",
+        "is_dcc": quote_info.get("fbaDCC", "").lower() == "yes",
+    }
+
+
+def _rates(quote_id, origin, multidest, shipment_scope, is_occ, is_dcc, pickup_charges_inr, console_type,
+           service_modes, lane_cache, fx_rate, progress=None):
+    grand_total_weight, grand_total_cbm = quote_totals(multidest)
+    des_val = "Multiple" if len(multidest) > 1 else "Single"
+    dt_str = datetime.now().strftime("%Y%m%d%H%M%S")
+    unique_id = f"{quote_id}_{dt_str}"
+
+    result, errors, skipped_fba = rates(
+        origin,
+        remove_ids(multidest),
+        console_type,
+        is_occ,
+        is_dcc,
+        des_val,
+        shipment_scope,
+        pickup_charges_inr,
+        service_modes,
+        grand_total_weight,
+        grand_total_cbm,
+        quote_id,
+        unique_id,
+        lane_cache,
+        fx_rate,
+        progress
+    )
+    return result, errors, skipped_fba
+
+
+def price_quote(quote_id, origin, multidest, shipment_scope, is_occ, is_dcc, pickup_charges_inr=0.0,
+                console_type="not selected", service_modes=None, lane_cache=None, progress=None):
+    """
+    Run rates() for a quotation and log it the way the FBA Quote tab does.
+    Pass a lane_cache dict to keep the vendor results for reprice_quote().
+    An identical quote priced earlier against the same tariffs is served from
+    the quote result cache without calling the vendors. progress is passed on
+    to collect_lanes().
+    Returns (result, errors, skipped_fba, elapsed seconds).
+    """
+    start_time = time.time()
+    service_modes = service_modes or []
+    lane_cache = {} if lane_cache is None else lane_cache
+
+    key = quote_key(origin, remove_ids(multidest), shipment_scope, is_occ, is_dcc, pickup_charges_inr,
+                    console_type, service_modes)
+    cached = cached_quote(key)
+    if cached:
+        result, skipped_fba, cached_lanes = cached
+        errors = []
+        lane_cache.update(cached_lanes)
+        unique_id = f"{quote_id}_{datetime.now().strftime('%Y%m%d%H%M%S')}"
+        for consoles in result.values():
+            for details in consoles.values():
+                details["Unique ID"] = unique_id
+    else:
+        result, errors, skipped_fba = _rates(
+            quote_id, origin, multidest, shipment_scope, is_occ, is_dcc, pickup_charges_inr, console_type,
+            service_modes, lane_cache, None, progress
+        )
+        if result and not errors:
+            store_quote(key, quote_id, result, skipped_fba, lane_cache)
+
+    elapsed_time = time.time() - start_time
+    minutes = int(elapsed_time // 60)
+    seconds = round(elapsed_time % 60, 2)
+    time_taken = f"{minutes} minutes, {seconds} seconds" + (" (cached)" if cached else "")
+    log_rate_request(quote_id, console_type, service_modes, result, errors, time_taken)
+
+    if result and not errors:
+        quotations_backup(quote_id, result)
+
+    return result, errors, skipped_fba, elapsed_time
+
+
+def reprice_quote(quote_id, origin, multidest, shipment_scope, is_occ, is_dcc, pickup_charges_inr=0.0,
+                  console_type="not selected", service_modes=None, lane_cache=None, fx_rate=None):
+    """
+    What-if pricing: same as price_quote() but against the lane_cache filled by
+    an earlier run, so only the tariff arithmetic is redone (a service mode set
+    not seen before still calls the vendors once). Nothing is logged.
+    """
+    start_time = time.time()
+    result, errors, skipped_fba = _rates(
+        quote_id, origin, multidest, shipment_scope, is_occ, is_dcc, pickup_charges_inr, console_type,
+        service_modes or [], lane_cache, fx_rate
+    )
+    return result, errors, skipped_fba, time.time() - start_time
+
+
+def split_by_console(result):
+    """Own Console and Coload results, each keyed by destination."""
+    own_console_dict = {}
+    coload_dict = {}
+
+    for location, consoles in result.items():
+        if "Own Console" in consoles:
+            own_console_dict[location] = {"Own Console": consoles["Own Console"]}
+        if "Coload" in consoles:
+            coload_dict[location] = {"Coload": consoles["Coload"]}
+
+    return own_console_dict, coload_dict
+
+
+def booking_breakdowns(quote_id, result, fx_rate=None, log=True):
+    """
+    summarization() for Own Console then Coload, numbering bookings across both.
+    Returns {"Own Console": {booking: [summary, details]}, "Coload": {...}}.
+    """
+    breakdowns = {}
+    booking_num = 1
+    for console, grouped_data in zip(["Own Console", "Coload"], split_by_console(result)):
+        if grouped_data:
+            breakdowns[console], booking_num = summarization(grouped_data, quote_id, booking_num, fx_rate, log)
+    return breakdowns
+
+
+def booking_records(breakdowns):
+    """booking_breakdowns() as JSON: {console: {booking: {"summary": rows, "breakdown": rows}}}."""
+    return {
+        console: {
+            booking: {"summary": frame_records(summary), "breakdown": frame_records(details)}
+            for booking, (summary, details) in grouped.items()
+        }
+        for console, grouped in breakdowns.items()
+    }
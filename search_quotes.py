@@ -1,146 +1,301 @@
-import pandas as pd
-import ast, json
-import streamlit as st
-from io import BytesIO
-
 import pandas as pd
 import numpy as np
-import ast
-
-def logs():
-    # Read file
-    summary = pd.read_excel(r"Logs/bookings_log.xlsx", sheet_name="Summary")
-    breakdown = pd.read_excel(r"Logs/bookings_log.xlsx", sheet_name="Breakdown")
-    quotes = pd.read_excel(r"Logs/quotations.xlsx")
-
-    # Keep rows where 'Unique ID' is not empty or NaN
-    summary = summary[summary['Unique ID'].notna() & (summary['Unique ID'] != "")]
-    quotes = quotes[quotes['Unique ID'].notna() & (quotes['Unique ID'] != "")]
-
-    # Enrich summary with quotes data
-    for i, row in summary.iterrows():
-        unid = row['Unique ID']
-        quto_num = row['Quotation Number']
-        fba_code = row['FBA / Destn']
-
-        matching_rows = quotes[
-            (quotes['Unique ID'] == unid) &
-            (quotes['Agquote ID'] == quto_num) &
-            (quotes['FBA Code'] == fba_code)
-        ]
-
-        if not matching_rows.empty:
-            pod_zip = matching_rows['POD Zip'].values[0]
-            fba_zip = matching_rows['FBA Zip Code'].values[0]
-
-            summary.at[i, 'FBA Zip Code'] = str(fba_zip).zfill(5) if not pd.isna(fba_zip) else ""
-            summary.at[i, 'POD Zip'] = str(pod_zip).zfill(5) if not pd.isna(pod_zip) else ""
-
-            for col in [
-                "category",
-                "P2P Origin charges per Container(INR)",
-                "P2P Ocean Freight (USD)",
-                "P2P Drayage & Devanning(USD)",
-                "P2P Total cost (USD)",
-                "P2P Loadability",
-                "LTL",
-                "FTL",
-                "FTL53",
-                "Drayage"
-            ]:
-                summary.at[i, col] = matching_rows[col].values[0]
-
-    # ---------------- Lastmile Expansion ---------------- #
-    records = []
-
-    for _, row in summary.iterrows():
-        unid = row.get("Unique ID")
-        booking_id = row.get("Booking ID")
-        qno = row.get("Quotation Number")
-        fba_code = row.get("FBA / Destn")
-        origin_zip = str(row.get("POD Zip")).zfill(5) if pd.notna(row.get("POD Zip")) else ""
-        dest_zip = str(row.get("FBA Zip Code")).zfill(5) if pd.notna(row.get("FBA Zip Code")) else ""
-        log_ts = row.get("Log Timestamp")
-
-        for col in ["LTL", "FTL", "FTL53", "Drayage"]:
-            val = row.get(col)
-
-            # Convert string to dict safely
-            if isinstance(val, str):
-                s = val.strip()
-                if s in ["", "{}", "nan", "NaN", "None"]:
-                    val = {}
-                else:
-                    try:
-                        val = ast.literal_eval(s)
-                    except Exception:
-                        val = {}
-
-            if not val or not isinstance(val, dict):
-                continue
-
-            records.append({
-                "Unique ID": unid,
-                "Log Timestamp": log_ts,
-                "Booking ID": booking_id,
-                "Quotation Number": qno,
-                "FBA Code": fba_code,
-                "Origin ZIP": origin_zip,
-                "Destination ZIP": dest_zip,
-                "Source": val.get("Source"),
-                "Source Date": val.get("Date"),
-                "Vendor": val.get("Service Provider"),
-                "Carrier": val.get("Carrier Name"),
-                "LM Delivery Type": val.get("Rate Type"),
-                "Vendor Rate": val.get("Rate")
-            })
-
-    lastmile = pd.DataFrame(records)
+import streamlit as st
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from log_store import read_log, log_version, iter_log, log_columns, log_size
+from excel_export import export_pages, export_bookings, temp_export_path, remove_export
+
+EXPORT_LOGS = ("bookings_summary", "bookings_breakdown", "quotations")
+
+# Booking rows per page of the logs export
+EXPORT_PAGE_ROWS = 5000
+# Unique IDs per quotation lookup; SQLite caps the number of bound parameters
+LOOKUP_BATCH = 500
+
+# Log exports are built off the script thread and shared by all sessions,
+# one job per log version.
+_export_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="logs-export")
+_export_lock = threading.Lock()
+_export_jobs = {}
+
+# Booking summary keys and the matching quotation columns they join on
+JOIN_KEYS = {"Unique ID": "Unique ID", "Quotation Number": "Agquote ID", "FBA / Destn": "FBA Code"}
+
+QUOTE_COLUMNS = [
+    "category",
+    "P2P Origin charges per Container(INR)",
+    "P2P Ocean Freight (USD)",
+    "P2P Drayage & Devanning(USD)",
+    "P2P Total cost (USD)",
+    "P2P Loadability",
+    "LTL",
+    "FTL",
+    "FTL53",
+    "Drayage"
+]
+
+def zip5(series):
+    """Format a column of ZIP codes as 5-digit strings, blanks stay empty."""
+    text = series.astype(str).str.replace(r"\.0$", "", regex=True).str.zfill(5)
+    return text.where(series.notna(), "")
+
+def enrich_summary(summary, quotes):
+    """Attach zips, category, P2P and last mile columns from the quotation log to each booking row."""
+    lookup = quotes.reindex(columns=list(JOIN_KEYS.values()) + ["POD Zip", "FBA Zip Code"] + QUOTE_COLUMNS)
+    lookup = lookup.rename(columns={v: k for k, v in JOIN_KEYS.items()})
+    for key in JOIN_KEYS:
+        lookup[key] = lookup[key].astype(str)
+
+    # First quotation row wins when a key repeats
+    lookup = lookup.drop_duplicates(subset=list(JOIN_KEYS), keep="first")
+    lookup["POD Zip"] = zip5(lookup["POD Zip"])
+    lookup["FBA Zip Code"] = zip5(lookup["FBA Zip Code"])
+
+    left = summary.reindex(columns=list(JOIN_KEYS)).astype(str)
+    matched = left.merge(lookup, on=list(JOIN_KEYS), how="left", indicator=True)
+    found = (matched["_merge"] == "both").to_numpy()
+
+    summary = summary.copy()
+    for col in ["FBA Zip Code", "POD Zip"] + QUOTE_COLUMNS:
+        values = matched[col].to_numpy(dtype=object)
+        if col in summary.columns:
+            summary[col] = np.where(found, values, summary[col].to_numpy(dtype=object))
+        else:
+            summary[col] = np.where(found, values, np.nan)
+    return summary
+
+LM_MODES = ["LTL", "FTL", "FTL53", "Drayage"]
+
+# Rate dict key -> LastMile Table column
+LM_FIELDS = {
+    "Source": "Source",
+    "Date": "Source Date",
+    "Service Provider": "Vendor",
+    "Carrier Name": "Carrier",
+    "Rate Type": "LM Delivery Type",
+    "Rate": "Vendor Rate"
+}
+
+def rate_dict(value):
+    return value if isinstance(value, dict) else {}
+
+def expand_lastmile(summary):
+    """One row per booking row and last mile mode that has a rate dict."""
+    base = pd.DataFrame({
+        "Unique ID": summary.get("Unique ID"),
+        "Log Timestamp": summary.get("Log Timestamp"),
+        "Booking ID": summary.get("Booking ID"),
+        "Quotation Number": summary.get("Quotation Number"),
+        "FBA Code": summary.get("FBA / Destn"),
+        "Origin ZIP": zip5(summary["POD Zip"]) if "POD Zip" in summary else "",
+        "Destination ZIP": zip5(summary["FBA Zip Code"]) if "FBA Zip Code" in summary else "",
+    }, index=summary.index)
+
+    modes = summary.reindex(columns=LM_MODES)
+    long = modes.melt(var_name="Mode", value_name="Rate Data", ignore_index=False)
+    is_rate = long["Rate Data"].map(lambda v: isinstance(v, dict) and len(v) > 0)
+    long = long[is_rate.astype(bool)]
+    # Keep booking-row order, modes in LM_MODES order within a row
+    long = long.sort_index(kind="stable")
+
+    if long.empty:
+        return pd.DataFrame(columns=list(base.columns) + list(LM_FIELDS.values()))
+
+    rates = pd.json_normalize(long["Rate Data"].tolist())
+    rates = rates.reindex(columns=list(LM_FIELDS)).rename(columns=LM_FIELDS)
+    rows = base.loc[long.index].reset_index(drop=True)
+    return pd.concat([rows, rates], axis=1)
+
+def with_columns(df, columns):
+    """df with any of columns it lacks added blank; a log with no rows has no columns at all."""
+    return df.reindex(columns=list(df.columns) + [col for col in columns if col not in df.columns])
+
+def has_unique_id(df):
+    """Rows where 'Unique ID' is not empty or NaN."""
+    return df[df["Unique ID"].notna() & (df["Unique ID"] != "")]
+
+def matching_quotes(unique_ids):
+    """
+    The quotation rows of one page of bookings, looked up on the unique_id
+    index, with only the columns enrich_summary() uses. This keeps the
+    enrichment to one page of quotations instead of the whole log.
+    """
+    columns = list(JOIN_KEYS.values()) + ["POD Zip", "FBA Zip Code"] + QUOTE_COLUMNS
+    frames = []
+    for start in range(0, len(unique_ids), LOOKUP_BATCH):
+        batch = unique_ids[start:start + LOOKUP_BATCH]
+        frames.extend(iter_log("quotations", page_size=EXPORT_PAGE_ROWS, unique_id=batch, columns=columns))
+    return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=columns)
+
+def export_columns():
+    """(booking summary columns, {sheet: header}) for the logs export, from the keys found in the logs."""
+    summary = with_columns(pd.DataFrame(columns=log_columns("bookings_summary")),
+                           list(JOIN_KEYS) + ["Booking ID", "Log Timestamp"])
+    enriched = enrich_summary(summary, pd.DataFrame())
+    breakdown = with_columns(pd.DataFrame(columns=log_columns("bookings_breakdown")), ["Unique ID"])
+    return list(summary.columns), {
+        "Summary Table": list(enriched.drop(columns=LM_MODES, errors="ignore").columns),
+        "Charges Table": list(breakdown.columns),
+        "LastMile Table": list(expand_lastmile(enriched).columns),
+    }
+
+def log_pages(summary_columns, progress=None):
+    """
+    Yield the logs export a page of bookings at a time: each page enriched
+    from its quotations, with its last mile rows, then the charge rows of
+    every exported booking. Only the booking Unique IDs are kept across pages.
+    """
+    progress = progress or (lambda fraction, stage: None)
+    total = max(log_size("bookings_summary") + log_size("bookings_breakdown"), 1)
+    done = 0
+    unique_ids = set()
+
+    for page in iter_log("bookings_summary", page_size=EXPORT_PAGE_ROWS):
+        done += len(page)
+        summary = has_unique_id(page.reindex(columns=summary_columns))
+        ids = list(summary["Unique ID"].unique())
+        unique_ids.update(ids)
+
+        # Enrich summary with quotes data (one keyed merge per page)
+        summary = enrich_summary(summary, matching_quotes([str(i) for i in ids]))
+        lastmile = expand_lastmile(summary)
+        # 🔽 Drop unwanted columns from summary
+        summary = summary.drop(columns=LM_MODES, errors="ignore")
+
+        yield {"Summary Table": summary, "LastMile Table": lastmile}
+        progress(done / total, "Writing Summary Table")
 
     # ---------------- Charges Filtering ---------------- #
-    unique_ids = summary['Unique ID'].dropna().unique()
-    charges = breakdown[breakdown['Unique ID'].isin(unique_ids)]
-
-    # 🔽 Drop unwanted columns from summary
-    cols_to_drop = ["LTL","FTL","FTL53","Drayage"]  # change as per your case
-    summary = summary.drop(columns=cols_to_drop, errors="ignore")
-
-    return summary, lastmile, charges
-
-def create_logs_file():
-    """Run logs() and return an in-memory Excel file with 3 sheets."""
-    summary, lastmile, charges = logs()
-
-    output = BytesIO()
-    with pd.ExcelWriter(output, engine="xlsxwriter") as writer:
-        summary.to_excel(writer, sheet_name="Summary Table", index=False)
-        charges.to_excel(writer, sheet_name="Charges Table", index=False)
-        lastmile.to_excel(writer, sheet_name="LastMile Table", index=False)
-    output.seek(0)
-    return output
+    for page in iter_log("bookings_breakdown", page_size=EXPORT_PAGE_ROWS):
+        done += len(page)
+        charges = with_columns(page, ["Unique ID"])
+        yield {"Charges Table": charges[charges["Unique ID"].isin(unique_ids)]}
+        progress(done / total, "Writing Charges Table")
+
+def create_logs_file(path, progress=None):
+    """Page through the logs and write the 3 tables into an Excel file at path."""
+    progress = progress or (lambda fraction, stage: None)
+    progress(0.0, "Reading logs")
+    summary_columns, columns = export_columns()
+
+    export_pages(path, columns, log_pages(summary_columns, progress))
+    progress(1.0, "Done")
+    return path
+
+def _run_export(job):
+    def progress(fraction, stage):
+        job["progress"] = fraction
+        job["stage"] = stage
+    return create_logs_file(job["path"], progress)
+
+def start_logs_export(version):
+    """Return the export job for this log version, starting it if needed."""
+    with _export_lock:
+        job = _export_jobs.get(version)
+        failed = job is not None and job["future"].done() and job["future"].exception() is not None
+        if job is None or failed:
+            job = {"progress": 0.0, "stage": "Queued", "path": temp_export_path("logs_export_")}
+            job["future"] = _export_executor.submit(_run_export, job)
+            # Older exports are superseded; drop their files once built
+            for old in _export_jobs.values():
+                old["future"].add_done_callback(lambda _, path=old["path"]: remove_export(path))
+            _export_jobs.clear()
+            _export_jobs[version] = job
+        return job
+
+def logs_export_panel():
+    version = log_version(*EXPORT_LOGS)
+    job = _export_jobs.get(version)
+
+    if job is None:
+        if st.button("📦 Prepare Logs Export"):
+            start_logs_export(version)
+            st.rerun()
+        return
+
+    future = job["future"]
+    if not future.done():
+        st.progress(job["progress"], text=f"⏳ {job['stage']}...")
+        return
+
+    # Finished: switch the panel back to a static (non-polling) fragment
+    if st.session_state.get("logs_export_polling"):
+        st.session_state.logs_export_polling = False
+        st.rerun()
+
+    if future.exception():
+        st.error(f"❌ Logs export failed: {future.exception()}")
+        if st.button("🔁 Retry Logs Export"):
+            start_logs_export(version)
+            st.rerun()
+        return
+
+    with open(future.result(), "rb") as export_file:
+        if st.download_button(
+            label="📥 Download Logs Excel",
+            data=export_file,
+            file_name="logs_output.xlsx",
+            mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+        ):
+            st.success("✅ Logs file downloaded successfully!")
+
+def logs_export_section():
+    """Export stays idle until requested, then polls the background build once a second."""
+    job = _export_jobs.get(log_version(*EXPORT_LOGS))
+    running = job is not None and not job["future"].done()
+    if running:
+        st.session_state.logs_export_polling = True
+    st.fragment(logs_export_panel, run_every=1 if running else None)()
+
+def quote_records(quotation_number):
+    """
+    Quotation, booking summary and booking breakdown rows of one quotation.
+    Each read goes through the store's (log, quote number) index, which is
+    updated as rows are logged, so only the matching records are loaded.
+    """
+    quotes = read_log("quotations", quote_id=quotation_number)
+    summary = read_log("bookings_summary", quote_id=quotation_number)
+    breakdown = read_log("bookings_breakdown", quote_id=quotation_number)
+    return quotes, summary, breakdown
+
+def bookings_workbook(summary, breakdown):
+    """One sheet per booking, built in a temp file and returned as bytes."""
+    export_path = export_bookings(temp_export_path("bookings_"), summary, breakdown)
+    try:
+        with open(export_path, "rb") as export_file:
+            return export_file.read()
+    finally:
+        remove_export(export_path)
+
+def bookings_export_panel(quotation_number, summary, breakdown):
+    """Bookings workbook is built on request and kept per (quotation, log version) for the session."""
+    key = (quotation_number, log_version("bookings_summary", "bookings_breakdown"))
+    export = st.session_state.get("bookings_export")
+
+    if export is None or export["key"] != key:
+        if st.button("📦 Prepare Bookings Export"):
+            st.session_state.bookings_export = {"key": key, "data": bookings_workbook(summary, breakdown)}
+            st.rerun()
+        return
+
+    st.download_button(
+        label="📤 Export All Bookings to Excel",
+        data=export["data"],
+        file_name=f"Bookings_{quotation_number}.xlsx",
+        mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+    )
 
 def search_quotations_app():
 
-    # 🔘 Single button that runs logs() and downloads Excel
-    if st.download_button(
-        label="📥 Download Logs Excel",
-        data=create_logs_file(),
-        file_name="logs_output.xlsx",
-        mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-    ):
-        st.success("✅ Logs file downloaded successfully!")
+    # 🔘 Logs export is built on demand in the background, cached per log version
+    logs_export_section()
 
-    quotation_number = st.text_input("Enter Quotation Number", placeholder="e.g., 123456")
+    quotation_number = st.text_input("Enter Quotation Number", placeholder="e.g., 123456").strip()
 
     if quotation_number:
         try:
-            df = pd.read_excel(r"Logs/quotations.xlsx")
-
-            # Load booking logs from both sheets
-            summary_df = pd.read_excel(r"Logs/bookings_log.xlsx", sheet_name="Summary")
-            breakdown_df = pd.read_excel(r"Logs/bookings_log.xlsx", sheet_name="Breakdown")
-
-            filtered_df = df[df['Agquote ID'].astype(str) == quotation_number]
+            filtered_df, summary_df, breakdown_df = quote_records(quotation_number)
 
             if filtered_df.empty:
                 st.warning("⚠️ No records found for this quotation number.")
@@ -148,7 +303,7 @@ def search_quotations_app():
 
             # ---------------- Show Destinations ----------------
             for _, row in filtered_df.iterrows():
-                service_modes_list = ast.literal_eval(row['Service Modes'])
+                service_modes_list = row['Service Modes'] if isinstance(row['Service Modes'], list) else []
                 result = ", ".join(service_modes_list)
 
                 with st.expander(f"📍 FBA Code: {row['FBA Code']} ({str(row['FBA Zip Code']).zfill(5)})"):
@@ -158,97 +313,34 @@ def search_quotations_app():
                     st.markdown(f"""**Category:** {row['category']} | **Service Modes:** {result}""")
 
                     cols = st.columns(4)
-                    for idx, mode in enumerate(["LTL", "FTL", "FTL53", "Drayage"]):
-                        value = row[mode]
-                        if pd.isna(value) or str(value).strip().lower() in ["none", "nan", ""]:
-                            with cols[idx]:
-                                st.markdown(f"#### {mode} Rates")
+                    for idx, mode in enumerate(LM_MODES):
+                        value = rate_dict(row.get(mode))
+                        with cols[idx]:
+                            st.markdown(f"#### {mode} Rates")
+                            if value:
+                                st.dataframe(pd.DataFrame([value]).fillna(""), use_container_width=True)
+                            else:
                                 st.info("Not Available")
-                            continue
-                        if isinstance(value, str):
-                            try:
-                                value = ast.literal_eval(value)
-                            except:
-                                try:
-                                    value = json.loads(value)
-                                except:
-                                    continue
-                        if isinstance(value, dict) and value:
-                            clean_dict = {k: ("" if pd.isna(v) else v) for k, v in value.items()}
-                            with cols[idx]:
-                                st.markdown(f"#### {mode} Rates")
-                                st.dataframe(pd.DataFrame([clean_dict]), use_container_width=True)
-
-                    lowest_rate = row['Selected lm']
+
+                    lowest_rate = rate_dict(row.get('Selected lm'))
                     st.markdown("---")
                     st.subheader("🏆 Lowest Rate")
-                    if pd.isna(lowest_rate) or str(lowest_rate).strip().lower() in ['none', 'nan', '']:
-                        st.info("Not Available")
+                    if lowest_rate:
+                        st.dataframe(pd.DataFrame([lowest_rate]).fillna(""), use_container_width=True)
                     else:
-                        if isinstance(lowest_rate, str):
-                            try:
-                                lowest_rate = ast.literal_eval(lowest_rate)
-                            except:
-                                try:
-                                    lowest_rate = json.loads(lowest_rate)
-                                except:
-                                    continue
-                        if isinstance(lowest_rate, dict) and lowest_rate:
-                            clean_dict = {k: ("" if pd.isna(v) else v) for k, v in lowest_rate.items()}
-                            st.dataframe(pd.DataFrame([clean_dict]), use_container_width=True)
+                        st.info("Not Available")
 
             # ---------------- After All Destinations ----------------
-            bookings_for_quote = summary_df[summary_df['Quotation Number'].astype(str) == quotation_number]
-            
-            booking_count = len(list(bookings_for_quote['Booking ID'].unique()))
+            bookings_for_quote = summary_df
+            booking_count = bookings_for_quote['Booking ID'].nunique() if not bookings_for_quote.empty else 0
 
             if booking_count > 0:
                 st.markdown("---")
                 st.markdown(f"**📦 Number of Bookings for this Quotation:** `{booking_count}`")
 
-                # Direct single-click download
-                buffer = BytesIO()
-                with pd.ExcelWriter(buffer, engine='openpyxl') as writer:
-                    # ✅ Loop over unique booking IDs so we capture multiple rows for each
-                    for booking_id in bookings_for_quote['Booking ID'].unique():
-                        booking_num = booking_id.split(" ")[1]
-
-                        # ✅ Get all matching summary rows for this booking
-                        booking_summary = bookings_for_quote[
-                            (bookings_for_quote['Booking ID'] == booking_id) &
-                            (bookings_for_quote['Quotation Number'] == quotation_number)
-                        ]
-
-                        # ✅ Get all matching breakdown rows
-                        booking_breakdown = breakdown_df[
-                            (breakdown_df['Booking ID'] == booking_id) &
-                            (breakdown_df['Quotation Number'] == quotation_number)
-                        ]
-
-                        # Write summary table
-                        booking_summary.to_excel(writer, sheet_name=f"{booking_id}", index=False, startrow=1)
-
-                        # Write breakdown below summary
-                        start_row = len(booking_summary) + 4
-                        booking_breakdown.to_excel(writer, sheet_name=f"{booking_id}", index=False, startrow=start_row)
-
-                        # Add headers
-                        ws = writer.sheets[f"{booking_id}"]
-                        ws.cell(row=1, column=1).value = "📦 Summary Table"
-                        ws.cell(row=start_row, column=1).value = "📊 Detailed Breakdown"
-
-                # Finalize Excel data
-                buffer.seek(0)
-
-                st.download_button(
-                    label="📤 Export All Bookings to Excel",
-                    data=buffer,
-                    file_name=f"Bookings_{quotation_number}.xlsx",
-                    mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-                )
-
-
-        except FileNotFoundError:
-            st.error("`Logs/quotations.xlsx` or `Logs/booking_logs.xlsx` not found.")
+                bookings_export_panel(quotation_number, bookings_for_quote, breakdown_df)
+
+        except KeyError:
+            st.warning("⚠️ No quotations or bookings have been logged yet.")
         except Exception as e:
             st.error(f"Error reading data: {e}")
@@ -0,0 +1,97 @@
+"""
+Tab-scoped module loading and import-time profiling for the Streamlit app.
+
+    python startup_profile.py                      # all tab modules
+    python startup_profile.py calculator --top 25  # one module, more rows
+
+fba_main imports a tab's module only when that tab is first opened, through
+load_module(), which records how long each first import took. The command
+line breaks a module's cold import down by imported package using Python's
+-X importtime, so a heavy dependency creeping into a tab shows up at once.
+"""
+import argparse
+import importlib
+import subprocess
+import sys
+import threading
+import time
+
+TAB_MODULES = ["calculator", "US_lm_calculator", "data_management"]
+
+_lock = threading.Lock()
+_load_times = {}
+
+
+# ----------------- Lazy Loading -----------------
+def load_module(name):
+    """Import a module on first use, timing the import."""
+    module = sys.modules.get(name)
+    if module is not None:
+        return module
+
+    with _lock:
+        started = time.perf_counter()
+        module = importlib.import_module(name)
+        if name not in _load_times:
+            _load_times[name] = time.perf_counter() - started
+            print(f"⏱️ Loaded {name} in {_load_times[name]:.2f}s")
+    return module
+
+
+def load_times():
+    """{module: seconds} for modules loaded through load_module() in this process."""
+    with _lock:
+        return dict(_load_times)
+
+
+# ----------------- Import Profile -----------------
+def import_breakdown(module, baseline=("streamlit",)):
+    """
+    Cold import cost of a module in a fresh interpreter, one row per imported
+    package with self and cumulative milliseconds, slowest first. Packages the
+    baseline modules already pull in (the app always has Streamlit) are left out.
+    """
+    setup = "".join(f"import {name}; " for name in baseline)
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"{setup}import {module}"],
+        capture_output=True, text=True
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else f"import {module} failed")
+
+    rows = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = [part.strip() for part in line[len("import time:"):].split("|")]
+        rows.append({"Package": name, "Self (ms)": int(self_us) / 1000, "Cumulative (ms)": int(cumulative_us) / 1000})
+
+    # Rows are printed in completion order; everything after the last baseline
+    # top-level package belongs to the profiled module
+    start = 0
+    for i, row in enumerate(rows):
+        if row["Package"] in baseline:
+            start = i + 1
+    return sorted(rows[start:], key=lambda row: row["Cumulative (ms)"], reverse=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import-time breakdown of the app's tab modules.")
+    parser.add_argument("modules", nargs="*", default=TAB_MODULES, help="Modules to profile (default: all tabs)")
+    parser.add_argument("--top", type=int, default=15, help="Packages to list per module (default: 15)")
+    args = parser.parse_args()
+
+    for module in args.modules:
+        try:
+            rows = import_breakdown(module)
+        except RuntimeError as e:
+            print(f"❌ {module}: {e}")
+            continue
+        total = next((row["Cumulative (ms)"] for row in rows if row["Package"] == module), 0.0)
+        print(f"\n📦 {module}: {total:.0f} ms on top of Streamlit")
+        for row in rows[:args.top]:
+            print(f"  {row['Cumulative (ms)']:8.1f} ms cumulative {row['Self (ms)']:8.1f} ms self  {row['Package']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+import os
+import threading
+import pandas as pd
+
+FBA_RATES_PATH = r"Data/FBA Rates.xlsx"
+LAST_MILE_PATH = r"Data/Last Mile Rates (no api).xlsx"
+
+# Every sheet a quote can touch: tariff, last mile and vendor fallback rates
+PRICING_SHEETS = [
+    (FBA_RATES_PATH, "FBA Locations"),
+    (FBA_RATES_PATH, "P2P"),
+    (FBA_RATES_PATH, "Accessorials"),
+    (FBA_RATES_PATH, "Palletization"),
+    (LAST_MILE_PATH, "Last Mile Rates (no api)"),
+    (r"Data/API Data/Heyprimo_output.xlsx", 0),
+    (r"Data/API Data/exfreight_output.xlsx", 0),
+    (r"Data/API Data/jbhunt_output.xlsx", 0),
+]
+
+_lock = threading.Lock()
+_sheets = {}
+_derived = {}
+_frozen = False
+
+
+def file_version(path):
+    """(mtime, size) of a data file; changes whenever Data Management replaces it."""
+    stat = os.stat(path)
+    return stat.st_mtime_ns, stat.st_size
+
+
+def pricing_version(path):
+    """
+    Version of a data file that pricing in this process reads: the snapshot's
+    after load_snapshot(), else the file on disk (None if it does not exist).
+    """
+    if _frozen:
+        with _lock:
+            for (cached_path, _), (version, _) in _sheets.items():
+                if cached_path == path:
+                    return version
+    return file_version(path) if os.path.exists(path) else None
+
+
+def read_sheet(path, sheet=0):
+    """
+    pd.read_excel, kept in memory until the file on disk changes. Every Streamlit
+    session and service request in the process shares the parsed sheet; callers
+    get their own copy so filtering or adding columns never leaks between them.
+    """
+    key = (path, sheet)
+    if _frozen and key in _sheets:
+        return _sheets[key][1].copy()
+
+    version = file_version(path)
+    with _lock:
+        cached = _sheets.get(key)
+        if cached is None or cached[0] != version:
+            cached = (version, pd.read_excel(path, sheet))
+            _sheets[key] = cached
+
+    return cached[1].copy()
+
+
+def derived_table(name, path, build):
+    """
+    build() run once per version of path (or of each path in a tuple) and
+    shared by every caller, for lookup tables computed from the sheets (see
+    pricing_calculation.tariff_tables). The result is not copied, so callers
+    must only read it.
+    """
+    paths = path if isinstance(path, tuple) else (path,)
+    version = tuple(pricing_version(p) for p in paths)
+    cached = _derived.get(name)
+    if cached is None or cached[0] != version:
+        # Built outside the lock: build() reads its sheets through read_sheet()
+        cached = (version, build())
+        with _lock:
+            _derived[name] = cached
+    return cached[1]
+
+
+def cache_info():
+    """Which sheets are warm and at what file version."""
+    with _lock:
+        return [
+            {"Path": path, "Sheet": sheet, "Version": version, "Rows": len(df)}
+            for (path, sheet), (version, df) in _sheets.items()
+        ]
+
+
+def snapshot(sheets=PRICING_SHEETS):
+    """{(path, sheet): (version, frame)} for the given sheets that exist, loading any that are cold."""
+    sheets = [(path, sheet) for path, sheet in sheets if os.path.exists(path)]
+    for path, sheet in sheets:
+        read_sheet(path, sheet)
+    with _lock:
+        return {key: _sheets[key] for key in sheets}
+
+
+def load_snapshot(sheets):
+    """
+    Seed this process's cache from snapshot() and stop watching the files, so a
+    batch keeps pricing against one tariff version even if a new one is uploaded.
+    """
+    global _frozen
+    with _lock:
+        _sheets.update(sheets)
+        _frozen = True
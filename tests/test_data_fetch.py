@@ -0,0 +1,97 @@
+import collections
+
+import pytest
+
+mongomock = pytest.importorskip("mongomock")
+
+import data_fetch
+import log_store
+
+ENTITIES = [{"_id": "E1", "entityName": "Acme Imports"}, {"_id": "E2", "entityName": "Blue Freight"}]
+
+
+def quote(_id, entity_id="E1"):
+    summary = {"shipmentScope": "Port-to-Door"}
+    if entity_id:
+        summary["entityId"] = entity_id
+    return {"_id": _id, "quoteSummary": summary, "quoteData": {"origin": "INNSA", "fba": []}, "internalNotes": "x"}
+
+
+class CountingQuotes:
+    """Quotes collection that counts aggregate() calls and fails a page holding fail_id."""
+
+    def __init__(self, collection, fail_id=None):
+        self.collection = collection
+        self.fail_id = fail_id
+        self.pages = []
+
+    def aggregate(self, pipeline):
+        page = pipeline[0]["$match"]["_id"]["$in"]
+        self.pages.append(page)
+        if self.fail_id in page:
+            raise RuntimeError("connection reset")
+        return self.collection.aggregate(pipeline)
+
+
+class StandInDb:
+    def __init__(self, quotes, fail_id=None):
+        self.db = mongomock.MongoClient().db
+        self.db["Quotes"].insert_many(quotes)
+        self.db["SHEntities"].insert_many(ENTITIES)
+        self.quotes = CountingQuotes(self.db["Quotes"], fail_id)
+
+    def __getitem__(self, name):
+        return self.quotes if name == "Quotes" else self.db[name]
+
+
+@pytest.fixture(autouse=True)
+def store(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(log_store, "_local", log_store.threading.local())
+    monkeypatch.setattr(log_store, "_imported", set())
+    monkeypatch.setattr(data_fetch, "_quote_cache", collections.OrderedDict())
+
+
+def fetch_log():
+    return dict(zip(*log_store.read_log(data_fetch.LOG_NAME)[["Quote ID", "Status"]].T.values))
+
+
+def test_ids_are_fetched_in_pages_with_entity_names():
+    ids = [f"Q{i}" for i in range(5)]
+    db = StandInDb([quote(_id, "E2" if _id == "Q4" else "E1") for _id in ids])
+
+    results = data_fetch.fetch_quotes_bulk(ids + ["Q0"], page_size=2, db=db)
+
+    assert db.quotes.pages == [["Q0", "Q1"], ["Q2", "Q3"], ["Q4"]]
+    assert list(results) == ids
+    assert results["Q0"][1] == "Acme Imports"
+    assert results["Q4"][1] == "Blue Freight"
+    # Projected fields only, no join leftovers
+    assert set(results["Q0"][0]) == {"_id", "quoteSummary", "quoteData"}
+    assert fetch_log() == dict.fromkeys(ids, "Success")
+
+
+def test_missing_quotes_and_entity_ids_fail():
+    db = StandInDb([quote("Q1"), quote("Q2", entity_id=None)])
+
+    results = data_fetch.fetch_quotes_bulk(["Q1", "Q2", "Q3"], page_size=2, db=db)
+
+    assert results["Q1"][1] == "Acme Imports"
+    assert results["Q2"] == (None, None)
+    assert results["Q3"] == (None, None)
+    messages = log_store.read_log(data_fetch.LOG_NAME).set_index("Quote ID")["Message"]
+    assert messages["Q2"] == "Missing entityId in quote document."
+    assert messages["Q3"] == "Quote document not found in MongoDB."
+
+
+def test_a_failing_page_only_fails_its_own_ids():
+    ids = [f"Q{i}" for i in range(4)]
+    db = StandInDb([quote(_id) for _id in ids], fail_id="Q2")
+
+    results = data_fetch.fetch_quotes_bulk(ids, page_size=2, db=db)
+
+    assert [_id for _id, (doc, _) in results.items() if doc] == ["Q0", "Q1"]
+    assert results["Q2"] == results["Q3"] == (None, None)
+    assert fetch_log() == {"Q0": "Success", "Q1": "Success", "Q2": "Failed", "Q3": "Failed"}
+    messages = log_store.read_log(data_fetch.LOG_NAME).set_index("Quote ID")["Message"]
+    assert messages["Q3"] == "Exception: connection reset"
@@ -0,0 +1,84 @@
+import pandas as pd
+import pytest
+
+import log_store
+
+# One record per filterable log, shaped like what the app writes. ZIPs are
+# stored as numbers, the way the vendor modules and Excel imports leave them.
+RECORDS = {
+    "quotations": {"Agquote ID": "Q1", "FBA Code": "RDU4", "POD": "Charleston", "POD Zip": 29483},
+    "bookings_summary": {"Quotation Number": "Q1", "FBA / Destn": "RDU4", "FPOD": "Charleston"},
+    "heyprimo": {"Quotation Number": "Q1", "FBA Code": "RDU4", "Origin ZIP": 29483, "Status": "Success"},
+    "exfreight": {"Quotation Number": "Q1", "FBA Code": "RDU4", "Origin": 29483, "Status": "Success"},
+    "jbhunt": {"Quotation Number": "Q1", "FBA Code": "RDU4", "Origin ZIP": 7201, "Status": "Success"},
+}
+OTHER = {"FBA Code": "MQJ1", "FPOD ZIP": "90731", "FPOD Name": "Los Angeles"}
+MATCH = {"FBA Code": "RDU4", "FPOD ZIP": "29483", "FPOD Name": "Charleston"}
+
+
+@pytest.fixture(autouse=True)
+def store(tmp_path, monkeypatch):
+    # Fresh database with no legacy Excel logs next to it
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(log_store, "_local", log_store.threading.local())
+    monkeypatch.setattr(log_store, "_imported", set())
+    for log, record in RECORDS.items():
+        log_store.append_records(log, record)
+        other = dict(record)
+        for field, value in OTHER.items():
+            if field in log_store.QUERY_FIELDS[log]:
+                other[log_store.QUERY_FIELDS[log][field]] = value
+        log_store.append_records(log, other)
+
+
+@pytest.mark.parametrize("log", list(RECORDS))
+@pytest.mark.parametrize("field", ["FBA Code", "FPOD ZIP", "FPOD Name"])
+def test_filter_by_fba_code_and_fpod(log, field):
+    if field not in log_store.QUERY_FIELDS[log]:
+        pytest.skip(f"{log} has no {field}")
+    value = "07201" if log == "jbhunt" and field == "FPOD ZIP" else MATCH[field]
+
+    page, _ = log_store.query_log(log, filters={field: [value]})
+
+    assert len(page) == 1
+    assert page.iloc[0].to_dict() | RECORDS[log] == page.iloc[0].to_dict()
+
+
+def test_fpod_zip_matches_numbers_and_text():
+    for value in ["29483", 29483, "29483.0", " 29483 "]:
+        page, _ = log_store.query_log("heyprimo", filters={"FPOD ZIP": value})
+        assert len(page) == 1
+
+
+def test_fpod_fields_mean_the_same_in_every_log():
+    zip_logs = [log for log, fields in log_store.QUERY_FIELDS.items() if "FPOD ZIP" in fields]
+    assert sorted(zip_logs) == ["exfreight", "heyprimo", "jbhunt", "quotations"]
+    assert all("FPOD" not in fields for fields in log_store.QUERY_FIELDS.values())
+
+
+def test_unreadable_legacy_log_is_retried(tmp_path):
+    legacy = tmp_path / "Logs" / "success_rates.xlsx"
+    legacy.write_bytes(b"half written workbook")
+
+    with pytest.raises(log_store.LegacyImportError):
+        log_store.read_log("success_rates")
+    # New rows are still written while the old file cannot be read
+    log_store.append_records("success_rates", {"Quote ID": "Q2", "Status": "Success"})
+
+    pd.DataFrame([{"Timestamp": "2025-08-14 15:16:17", "Quote ID": "Q1", "Status": "Success"}]).to_excel(legacy, index=False)
+    assert sorted(log_store.read_log("success_rates")["Quote ID"]) == ["Q1", "Q2"]
+
+
+def test_unique_id_lookup_takes_a_list():
+    log_store.append_records("bookings_summary", [{"Unique ID": f"U{i}", "Quotation Number": "Q2"} for i in range(5)])
+
+    page, _ = log_store.query_log("bookings_summary", unique_id=["U3", "U1", "U9"])
+
+    assert list(page["Unique ID"]) == ["U1", "U3"]
+
+
+def test_log_columns_match_read_log():
+    log_store.append_records("quotations", {"Agquote ID": "Q2", "Late Column": 1, "FBA Code": "TEB9"})
+
+    assert log_store.log_columns("quotations") == list(log_store.read_log("quotations").columns)
+    assert log_store.log_size("quotations") == 3
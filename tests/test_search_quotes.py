@@ -0,0 +1,42 @@
+import pandas as pd
+import pytest
+
+import log_store
+import search_quotes
+
+LTL = {"Source": "API", "Service Provider": "HeyPrimo", "Rate": 410.5}
+
+
+@pytest.fixture(autouse=True)
+def store(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(log_store, "_local", log_store.threading.local())
+    monkeypatch.setattr(log_store, "_imported", set())
+    # Pages and lookups much smaller than the logs
+    monkeypatch.setattr(search_quotes, "EXPORT_PAGE_ROWS", 2)
+    monkeypatch.setattr(search_quotes, "LOOKUP_BATCH", 2)
+
+
+def test_logs_export_pages_through_the_logs(tmp_path):
+    ids = [f"Q{i}_U" for i in range(5)]
+    log_store.append_records("quotations", [
+        {"Agquote ID": f"Q{i}", "Unique ID": uid, "FBA Code": "RDU4", "POD Zip": 7201, "LTL": LTL}
+        for i, uid in enumerate(ids)
+    ])
+    log_store.append_records("bookings_summary", [
+        {"Quotation Number": f"Q{i}", "Unique ID": uid, "FBA / Destn": "RDU4", "Booking ID": f"B{i}"}
+        for i, uid in enumerate(ids)
+    ] + [{"Quotation Number": "Q9", "Unique ID": "", "FBA / Destn": "RDU4", "Booking ID": "B9"}])
+    log_store.append_records("bookings_breakdown", [
+        {"Unique ID": uid, "Charge Head": "LTL"} for uid in ids + ["Q7_U"]
+    ])
+
+    path = search_quotes.create_logs_file(str(tmp_path / "logs.xlsx"))
+    sheets = pd.read_excel(path, sheet_name=None, dtype=str)
+
+    assert list(sheets) == ["Summary Table", "Charges Table", "LastMile Table"]
+    assert list(sheets["Summary Table"]["Booking ID"]) == [f"B{i}" for i in range(5)]
+    assert set(sheets["Summary Table"]["POD Zip"]) == {"07201"}
+    assert "LTL" not in sheets["Summary Table"]
+    assert list(sheets["Charges Table"]["Unique ID"]) == ids
+    assert list(sheets["LastMile Table"]["Vendor Rate"]) == ["410.5"] * 5
@@ -0,0 +1,46 @@
+import streamlit as st
+import datetime as dt
+from log_store import vendor_performance
+
+
+def vendor_dashboard_app():
+    today = dt.date.today()
+
+    # ---------- Today at a glance ----------
+    st.markdown("#### 📅 Today")
+    today_df = vendor_performance(start=today, end=today)
+    if today_df.empty:
+        st.info("ℹ️ No vendor calls logged today.")
+    else:
+        cols = st.columns(len(today_df))
+        for col, (_, row) in zip(cols, today_df.iterrows()):
+            with col:
+                st.metric(row["Vendor"], f"{row['Hit Rate %']}% hit", f"{row['Failure Rate %']}% failed", delta_color="inverse")
+                latency = row["Avg Latency (s)"]
+                st.caption(
+                    f"{int(row['Requests'])} requests · {row['Static Share %']}% static · "
+                    f"avg live latency {'-' if latency != latency else f'{latency}s'}"
+                )
+
+    st.markdown("---")
+
+    # ---------- Range ----------
+    c1, c2 = st.columns(2)
+    with c1:
+        start = st.date_input("From", value=today - dt.timedelta(days=14), key="vendor_from")
+    with c2:
+        end = st.date_input("To", value=today, key="vendor_to")
+
+    st.markdown("#### 🏢 Per Vendor")
+    st.dataframe(vendor_performance(start, end, by=("vendor",)), use_container_width=True, hide_index=True)
+
+    st.markdown("#### 📈 Failure Rate per Day")
+    daily = vendor_performance(start, end, by=("vendor", "day"))
+    if not daily.empty:
+        st.line_chart(daily.pivot(index="Day", columns="Vendor", values="Failure Rate %"))
+    st.dataframe(daily, use_container_width=True, hide_index=True)
+
+    st.markdown("#### 🛣️ Per Lane")
+    lanes = vendor_performance(start, end, by=("vendor", "lane"))
+    lanes = lanes.sort_values(["Failure Rate %", "Requests"], ascending=False)
+    st.dataframe(lanes, use_container_width=True, hide_index=True)
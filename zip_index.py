@@ -0,0 +1,151 @@
+import os
+import threading
+from bisect import bisect_left
+from collections import OrderedDict
+import pandas as pd
+import requests
+from tariff_cache import FBA_RATES_PATH, derived_table, read_sheet
+
+# Full US ZIP list (columns: zip, city, state, state_code): active, non-military
+# ZIPs of the 50 states, DC and Puerto Rico, from the MIT-licensed zipcodes
+# package dataset. The index adds every FBA and FPOD ZIP in the FBA Locations
+# sheet, and still works from those alone if the file is missing.
+ZIP_DATA_PATH = r"Data/US Zip Codes.csv"
+COUNTRY = "United States"
+MAX_SUGGESTIONS = 10
+
+# Remote address lookup, asked only for terms with no local match at all
+# (a misspelt city, a non-US place). Short terms are never sent.
+REMOTE_FALLBACK = True
+REMOTE_MIN_LENGTH = 3
+REMOTE_URL = "https://office-dev.agraga.com/api/api/v1/location/fetchfulladdress2/{term},"
+REMOTE_TIMEOUT = 5
+REMOTE_MEMO_SIZE = 1024
+
+US_STATES = {
+    "AL": "Alabama", "AK": "Alaska", "AZ": "Arizona", "AR": "Arkansas", "CA": "California",
+    "CO": "Colorado", "CT": "Connecticut", "DE": "Delaware", "DC": "District of Columbia",
+    "FL": "Florida", "GA": "Georgia", "HI": "Hawaii", "ID": "Idaho", "IL": "Illinois",
+    "IN": "Indiana", "IA": "Iowa", "KS": "Kansas", "KY": "Kentucky", "LA": "Louisiana",
+    "ME": "Maine", "MD": "Maryland", "MA": "Massachusetts", "MI": "Michigan", "MN": "Minnesota",
+    "MS": "Mississippi", "MO": "Missouri", "MT": "Montana", "NE": "Nebraska", "NV": "Nevada",
+    "NH": "New Hampshire", "NJ": "New Jersey", "NM": "New Mexico", "NY": "New York",
+    "NC": "North Carolina", "ND": "North Dakota", "OH": "Ohio", "OK": "Oklahoma", "OR": "Oregon",
+    "PA": "Pennsylvania", "RI": "Rhode Island", "SC": "South Carolina", "SD": "South Dakota",
+    "TN": "Tennessee", "TX": "Texas", "UT": "Utah", "VT": "Vermont", "VA": "Virginia",
+    "WA": "Washington", "WV": "West Virginia", "WI": "Wisconsin", "WY": "Wyoming",
+    "PR": "Puerto Rico",
+}
+
+_remote_lock = threading.Lock()
+_remote_memo = OrderedDict()
+
+
+# ----------------- Index -----------------
+def address_label(zip_code, city, state, state_code, country=COUNTRY):
+    # Same "zip, city, state, state code, country" string the remote lookup returns
+    return f"{zip_code}, {city}, {state}, {state_code}, {country}"
+
+
+def _zip5(value):
+    text = str(value).strip()
+    if text.endswith(".0"):
+        text = text[:-2]
+    return text.zfill(5) if text.isdigit() else ""
+
+
+def _places():
+    """(zip, city, state code) rows from the ZIP list and the FBA Locations sheet."""
+    frames = []
+    if os.path.exists(ZIP_DATA_PATH):
+        zips = pd.read_csv(ZIP_DATA_PATH, dtype=str)
+        frames.append(zips.reindex(columns=["zip", "city", "state_code"]))
+    if os.path.exists(FBA_RATES_PATH):
+        fba = read_sheet(FBA_RATES_PATH, "FBA Locations")
+        for prefix in ("FBA", "FPOD"):
+            frames.append(pd.DataFrame({
+                "zip": fba[f"{prefix} ZIP"],
+                "city": fba[f"{prefix} CITY"],
+                "state_code": fba[f"{prefix} STATE CODE"],
+            }))
+    if not frames:
+        return pd.DataFrame(columns=["zip", "city", "state_code"])
+
+    places = pd.concat(frames, ignore_index=True).dropna()
+    places["zip"] = places["zip"].map(_zip5)
+    places["city"] = places["city"].astype(str).str.strip().str.title()
+    places["state_code"] = places["state_code"].astype(str).str.strip().str.upper()
+    places = places[places["zip"] != ""]
+    return places.drop_duplicates(subset=["zip", "city", "state_code"], keep="first")
+
+
+def build_index():
+    """
+    Sorted (key, label) arrays searched with bisect: one entry per ZIP and one
+    per lower-cased city name, so both "9075" and "los an" complete.
+    """
+    places = _places()
+    entries = []
+    for zip_code, city, state_code in zip(places["zip"], places["city"], places["state_code"]):
+        label = address_label(zip_code, city, US_STATES.get(state_code, state_code), state_code)
+        entries.append((zip_code, label))
+        entries.append((city.lower(), label))
+    entries.sort()
+    return [key for key, _ in entries], [label for _, label in entries]
+
+
+def zip_index():
+    """The index for the current ZIP list and FBA Locations versions."""
+    return derived_table("zip index", (ZIP_DATA_PATH, FBA_RATES_PATH), build_index)
+
+
+def search_local(term, limit=MAX_SUGGESTIONS):
+    keys, labels = zip_index()
+    prefix = term.strip().lower()
+    results = []
+    for i in range(bisect_left(keys, prefix), len(keys)):
+        if not keys[i].startswith(prefix) or len(results) >= limit:
+            break
+        if labels[i] not in results:
+            results.append(labels[i])
+    return results
+
+
+# ----------------- Remote Fallback -----------------
+def search_remote(term):
+    """Remote address lookup, remembered per term; [] when the service fails."""
+    with _remote_lock:
+        if term in _remote_memo:
+            _remote_memo.move_to_end(term)
+            return _remote_memo[term]
+
+    try:
+        response = requests.get(REMOTE_URL.format(term=term), timeout=REMOTE_TIMEOUT)
+        response.raise_for_status()
+        data = response.json()
+    except (requests.exceptions.RequestException, ValueError):
+        return []  # not remembered, so the next keystroke tries again
+
+    results = []
+    if isinstance(data, list):
+        for entry in data:
+            results.append(address_label(
+                entry.get('pin', term), entry.get('city', ''), entry.get('state', ''),
+                entry.get('stateCode', ''), entry.get('country', '')
+            ))
+
+    with _remote_lock:
+        _remote_memo[term] = results
+        while len(_remote_memo) > REMOTE_MEMO_SIZE:
+            _remote_memo.popitem(last=False)
+    return results
+
+
+def search_addresses(term):
+    """Autocomplete for the Origin / Destination pickers: local index, remote only for misses."""
+    if not term or not term.strip():
+        return []
+    results = search_local(term)
+    if not results and REMOTE_FALLBACK and len(term.strip()) >= REMOTE_MIN_LENGTH:
+        results = search_remote(term.strip())
+    return results